@@ -0,0 +1,102 @@
+"""
+Amostragem das curvas de acordo com o tamanho do gráfico em pixels.
+
+Em vez de um número fixo de pontos (np.linspace com 100 ou 200 pontos), as
+curvas recebem pontos onde o traçado se curva de forma visível na figura:
+uma reta do M.U. fica com dois pontos, uma parábola longa ou muito rápida
+ganha mais pontos perto do vértice. O critério é o desvio, em pixels, entre
+a curva e os segmentos desenhados.
+
+A escala (pixels por unidade em x e em y) vem dos eixos do Matplotlib
+(escala_eixos) ou do tamanho da figura (escala_figura).
+"""
+import numpy as np
+
+# Frações da figura ocupadas pelos eixos com os parâmetros padrão do Matplotlib
+# (figure.subplot.left/right/bottom/top = 0.125, 0.9, 0.11, 0.88)
+_FRACAO_EIXOS = (0.9 - 0.125, 0.88 - 0.11)
+
+
+def escala_figura(figsize, dpi, xlim, ylim):
+    """Pixels por unidade de dados (em x e em y) para uma figura com um único eixo padrão."""
+    largura = figsize[0] * dpi * _FRACAO_EIXOS[0]
+    altura = figsize[1] * dpi * _FRACAO_EIXOS[1]
+    return largura / abs(xlim[1] - xlim[0]), altura / abs(ylim[1] - ylim[0])
+
+
+def escala_eixos(ax):
+    """Pixels por unidade de dados (em x e em y) dos eixos do Matplotlib, já com os limites definidos."""
+    caixa = ax.get_window_extent()
+    x0, x1 = ax.get_xlim()
+    y0, y1 = ax.get_ylim()
+    return caixa.width / abs(x1 - x0), caixa.height / abs(y1 - y0)
+
+
+def _desvio(xa, ya, xb, yb, xm, ym):
+    """Distância do ponto m ao segmento ab (todos em pixels)."""
+    dx, dy = xb - xa, yb - ya
+    comprimento = np.hypot(dx, dy)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        distancia = np.abs(dx * (ym - ya) - dy * (xm - xa)) / comprimento
+    return np.where(comprimento > 0, distancia, np.hypot(xm - xa, ym - ya))
+
+
+def reduzir(x, y, escala, tolerancia_px=0.5):
+    """
+    Índices dos pontos de (x, y) que bastam para desenhar a curva na figura.
+
+    Algoritmo de Ramer-Douglas-Peucker em pixels: um ponto só é mantido se
+    removê-lo desloca o traçado mais que tolerancia_px. O primeiro e o último
+    pontos são sempre mantidos. Use os índices também nos outros arrays (t, vx...).
+    """
+    px = np.asarray(x, dtype=float) * escala[0]
+    py = np.asarray(y, dtype=float) * escala[1]
+    n = px.size
+    if n <= 2:
+        return np.arange(n)
+
+    manter = np.zeros(n, dtype=bool)
+    manter[[0, -1]] = True
+    pilha = [(0, n - 1)]
+    while pilha:
+        inicio, fim = pilha.pop()
+        if fim - inicio < 2:
+            continue
+        meio = slice(inicio + 1, fim)
+        desvio = _desvio(px[inicio], py[inicio], px[fim], py[fim], px[meio], py[meio])
+        k = int(np.argmax(desvio))
+        if desvio[k] > tolerancia_px:
+            k += inicio + 1
+            manter[k] = True
+            pilha += [(inicio, k), (k, fim)]
+    return np.nonzero(manter)[0]
+
+
+def amostrar_adaptativo(curva, t0, t1, escala, tolerancia_px=0.5, inicial=8, max_pontos=4096):
+    """
+    Tempos de amostragem de uma curva paramétrica para a figura.
+
+    curva(t) devolve (x, y) para um array de tempos. Partindo de uma grade com
+    `inicial` intervalos, cada intervalo é dividido ao meio enquanto o ponto
+    do meio se afastar mais que tolerancia_px do segmento; depois, os pontos
+    desnecessários (trechos retos) são retirados com reduzir().
+    """
+    t = np.linspace(t0, t1, inicial + 1)
+    if t1 == t0:
+        return t[:1]
+    x, y = curva(t)
+    ex, ey = escala
+
+    while t.size < max_pontos:
+        t_meio = 0.5 * (t[:-1] + t[1:])
+        x_meio, y_meio = curva(t_meio)
+        desvio = _desvio(x[:-1] * ex, y[:-1] * ey, x[1:] * ex, y[1:] * ey, x_meio * ex, y_meio * ey)
+        dividir = np.nonzero(desvio > tolerancia_px)[0]
+        if dividir.size == 0:
+            break
+        dividir = dividir[:max_pontos - t.size]
+        t = np.insert(t, dividir + 1, t_meio[dividir])
+        x = np.insert(x, dividir + 1, x_meio[dividir])
+        y = np.insert(y, dividir + 1, y_meio[dividir])
+
+    return t[reduzir(x, y, escala, tolerancia_px)]
@@ -0,0 +1,326 @@
+"""
+Renderização de animações com figura persistente.
+
+A figura, os eixos, a grade, os rótulos e os elementos fixos são desenhados
+uma única vez. A cada quadro, apenas os artistas móveis (ponto, trilha,
+vetores, textos) são redesenhados sobre o fundo guardado (técnica de "blitting").
+Assim o custo de um quadro deixa de ser a montagem de uma figura inteira.
+
+Uso típico em qualquer um dos simuladores:
+
+    cena = CenaAnimada(figsize=(10, 6))
+    cena.ax.set_xlim(0, 10)              # decorações estáticas
+    trilha = cena.linha('r--')           # artistas móveis
+    ponto = cena.linha('o', color='blue')
+    for i in range(n):
+        trilha.set_data(x[:i], y[:i])
+        ponto.set_data([x[i]], [y[i]])
+        placeholder.image(cena.quadro())
+"""
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+
+import matplotlib
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from codificacao import codificar_cena
+from instrumentacao import medir
+
+
+class CenaAnimada:
+    """
+    Figura persistente para animações quadro a quadro.
+
+    Não usa o pyplot: a figura tem seu próprio canvas Agg e não precisa ser
+    fechada com plt.close().
+    """
+
+    def __init__(self, figsize=(10, 6), dpi=100):
+        self.fig = Figure(figsize=figsize, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot()
+        self._moveis = []
+        self._fundo = None
+
+    # --- Criação dos artistas móveis ---
+    def adicionar(self, artista):
+        """Registra um artista já criado como móvel (redesenhado a cada quadro)."""
+        artista.set_animated(True)
+        self._moveis.append(artista)
+        return artista
+
+    def linha(self, *args, **kwargs):
+        """Cria uma linha (ou marcador) móvel vazia; atualize com set_data()."""
+        linha, = self.ax.plot([], [], *args, **kwargs)
+        return self.adicionar(linha)
+
+    def texto(self, x, y, s, **kwargs):
+        """Cria um texto móvel; atualize com set_position() e set_text()."""
+        return self.adicionar(self.ax.text(x, y, s, **kwargs))
+
+    def vetores(self, escala_plot_x, escala_plot_y):
+        """Cria o conjunto de vetores de velocidade (V, Vx, Vy) móvel."""
+        vetores = VetoresVelocidade(self.ax, escala_plot_x, escala_plot_y)
+        for artista in vetores.artistas:
+            self.adicionar(artista)
+        return vetores
+
+    # --- Renderização ---
+    def invalidar_fundo(self):
+        """Força o redesenho do fundo (use após mudar limites ou elementos fixos)."""
+        self._fundo = None
+
+    def quadro(self):
+        """
+        Renderiza o quadro atual e devolve a imagem RGBA (array uint8 H x W x 4).
+
+        Na primeira chamada a figura inteira é desenhada e o fundo (sem os
+        artistas móveis) é guardado; nas seguintes, só os móveis são desenhados.
+        """
+        with medir("desenho"):
+            if self._fundo is None:
+                self.canvas.draw()
+                self._fundo = self.canvas.copy_from_bbox(self.fig.bbox)
+            else:
+                self.canvas.restore_region(self._fundo)
+
+            for artista in self._moveis:
+                if artista.get_visible():
+                    artista.axes.draw_artist(artista)
+
+            return np.array(self.canvas.buffer_rgba())
+
+    def quadro_png(self, armazem=None, chave=None):
+        """
+        Quadro atual já codificado em PNG (o st.image envia os bytes sem recodificar).
+
+        Com um armazém em disco (cache_disco.py) e a chave do quadro, um quadro
+        renderizado antes, por esta ou por outra sessão, é reaproveitado.
+        """
+        if armazem is None:
+            return codificar_png(self.quadro())
+        return armazem.obter_ou_gerar(chave, lambda: codificar_png(self.quadro()))
+
+    def quadro_codificado(self, codificacao, armazem=None, chave=None):
+        """
+        Quadro atual no formato, resolução e orçamento de bytes de uma Codificacao (codificacao.py).
+
+        A chave do armazém deve incluir codificacao.opcoes() e o dpi da cena.
+        """
+        if armazem is None:
+            return codificar_cena(self, codificacao)
+        return armazem.obter_ou_gerar(chave, lambda: codificar_cena(self, codificacao))
+
+    def quadros(self, desenhar, n_quadros):
+        """Gera os quadros 0..n-1: desenhar(i) posiciona os artistas móveis antes de cada quadro."""
+        for i in range(n_quadros):
+            desenhar(i)
+            yield self.quadro()
+
+    def exportar(self, desenhar, n_quadros, fps, formato="GIF"):
+        """Renderiza os n quadros e os codifica em um único arquivo (ver exportar_animacao)."""
+        # O último quadro (trilha completa) serve de referência para a paleta do GIF
+        desenhar(n_quadros - 1)
+        referencia = self.quadro()
+        # A etapa "video" inclui o desenho dos quadros, que são gerados durante a codificação
+        with medir("video"):
+            return exportar_animacao(self.quadros(desenhar, n_quadros), fps, formato, referencia)
+
+
+class TrilhaIncremental:
+    """
+    Trilha percorrida, lida de um buffer com a trajetória inteira calculada uma vez.
+
+    A cada quadro, mostrar() exibe os pontos do buffer até o tempo atual e a
+    posição atual, sem recalcular a trajetória: o custo por quadro não cresce
+    com o número de quadros já desenhados.
+    """
+
+    def __init__(self, linha, t, x, y):
+        self.linha = linha
+        self._t = np.asarray(t, dtype=float)
+        n = self._t.size
+        # Uma posição extra no fim: o ponto atual ocupa a posição seguinte ao último ponto exibido
+        self._x = np.empty(n + 1)
+        self._y = np.empty(n + 1)
+        self._x[:n] = x
+        self._y[:n] = y
+        self._x_original = self._x.copy()
+        self._y_original = self._y.copy()
+        self._atual = n
+
+    def mostrar(self, t_atual, x_atual, y_atual):
+        """Mostra os pontos com t < t_atual seguidos da posição (x_atual, y_atual)."""
+        # Devolve ao buffer o ponto que o quadro anterior sobrescreveu
+        self._x[self._atual] = self._x_original[self._atual]
+        self._y[self._atual] = self._y_original[self._atual]
+
+        k = int(np.searchsorted(self._t, t_atual, side="left"))
+        self._x[k] = x_atual
+        self._y[k] = y_atual
+        self._atual = k
+        self.linha.set_data(self._x[:k + 1], self._y[:k + 1])
+
+
+class VetoresVelocidade:
+    """
+    Vetor de velocidade resultante e suas componentes Vx e Vy, com rótulos.
+
+    Os artistas são criados uma vez e reposicionados com atualizar().
+    """
+
+    def __init__(self, ax, escala_plot_x, escala_plot_y):
+        # A escala do vetor é uma proporção do tamanho total do gráfico
+        # Fator de 0.08 para reduzir o tamanho dos vetores, deixando a visualização mais limpa
+        vetor_length = 0.08 * max(escala_plot_x, escala_plot_y, 1)
+        estilo = dict(head_width=0.03 * vetor_length, head_length=0.05 * vetor_length)
+
+        # Vetor de velocidade resultante e componentes X e Y
+        self.seta_v = ax.arrow(0, 0, 0, 0, fc='blue', ec='blue', label='Vetor de Velocidade', **estilo)
+        self.seta_vx = ax.arrow(0, 0, 0, 0, fc='red', ec='red', ls='--', label='Componente Vx', **estilo)
+        self.seta_vy = ax.arrow(0, 0, 0, 0, fc='green', ec='green', ls='--', label='Componente Vy', **estilo)
+
+        # Textos dos vetores
+        self.texto_v = ax.text(0, 0, 'V', color='blue', fontsize=12)
+        self.texto_vx = ax.text(0, 0, 'Vx', color='red', fontsize=12)
+        self.texto_vy = ax.text(0, 0, 'Vy', color='green', fontsize=12)
+
+        self.artistas = [self.seta_v, self.seta_vx, self.seta_vy,
+                         self.texto_v, self.texto_vx, self.texto_vy]
+
+    def atualizar(self, pos_x, pos_y, vx, vy):
+        self.seta_v.set_data(x=pos_x, y=pos_y, dx=vx, dy=vy)
+        self.seta_vx.set_data(x=pos_x, y=pos_y, dx=vx, dy=0)
+        self.seta_vy.set_data(x=pos_x, y=pos_y, dx=0, dy=vy)
+
+        self.texto_v.set_position((pos_x + vx, pos_y + vy))
+        self.texto_vx.set_position((pos_x + vx, pos_y))
+        self.texto_vy.set_position((pos_x, pos_y + vy))
+
+
+def codificar_png(quadro):
+    """Codifica um quadro RGBA em PNG, com compressão rápida."""
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    with medir("png"):
+        Image.fromarray(quadro).save(buffer, format="PNG", compress_level=1)
+    return buffer.getvalue()
+
+
+# --- Exportação da animação inteira em um único arquivo ---
+# Em vez de enviar cada quadro ao navegador, os quadros são codificados uma vez
+# em um GIF/APNG (via Pillow, que já acompanha o Matplotlib) ou MP4/WebM (via ffmpeg).
+FORMATOS_ANIMACAO = {
+    "GIF": "image/gif",
+    "APNG": "image/png",
+    "MP4": "video/mp4",
+    "WebM": "video/webm",
+}
+
+_CODECS_FFMPEG = {
+    "MP4": ["-c:v", "libx264", "-pix_fmt", "yuv420p", "-movflags", "+faststart"],
+    "WebM": ["-c:v", "libvpx-vp9", "-pix_fmt", "yuv420p", "-b:v", "0", "-crf", "35"],
+}
+
+
+def _caminho_ffmpeg():
+    return shutil.which(matplotlib.rcParams["animation.ffmpeg_path"])
+
+
+def formatos_disponiveis():
+    """Formatos de exportação suportados neste servidor (MP4 e WebM exigem o ffmpeg)."""
+    formatos = ["GIF", "APNG"]
+    if _caminho_ffmpeg():
+        formatos += ["MP4", "WebM"]
+    return formatos
+
+
+def exportar_animacao(quadros, fps, formato="GIF", referencia=None):
+    """
+    Codifica uma sequência de quadros RGBA (por exemplo, CenaAnimada.quadros())
+    em um único arquivo de animação e devolve os bytes do arquivo.
+
+    No GIF e no APNG, a paleta de cores é calculada uma única vez a partir do
+    primeiro quadro e do quadro de referência opcional (de preferência o último).
+    """
+    if formato in ("GIF", "APNG"):
+        return _exportar_pillow(quadros, fps, formato, referencia)
+    if formato in _CODECS_FFMPEG:
+        return _exportar_ffmpeg(quadros, fps, formato)
+    raise ValueError(f"Formato de animação desconhecido: {formato}")
+
+
+def _exportar_pillow(quadros, fps, formato, referencia):
+    from PIL import Image
+
+    quadros = iter(quadros)
+    primeiro = next(quadros)
+
+    # Paleta única para todos os quadros: quantizar cada quadro do zero é lento
+    amostra = primeiro if referencia is None else np.concatenate([primeiro, referencia])
+    paleta = Image.fromarray(amostra).convert("RGB").quantize(colors=256, method=Image.Quantize.MEDIANCUT)
+
+    def quantizar(quadro):
+        return Image.fromarray(quadro).convert("RGB").quantize(palette=paleta, dither=Image.Dither.NONE)
+
+    imagens = (quantizar(quadro) for quadro in quadros)
+    duracao = 1000 / fps
+    if formato == "GIF":
+        # Navegadores não respeitam quadros de GIF mais curtos que 20 ms
+        duracao = max(duracao, 20)
+        opcoes = dict(format="GIF", optimize=False)
+    else:
+        # O Pillow percorre os quadros do APNG duas vezes
+        imagens = list(imagens)
+        opcoes = dict(format="PNG")
+
+    buffer = io.BytesIO()
+    quantizar(primeiro).save(buffer, save_all=True, append_images=imagens,
+                             duration=duracao, loop=0, **opcoes)
+    return buffer.getvalue()
+
+
+def _exportar_ffmpeg(quadros, fps, formato):
+    ffmpeg = _caminho_ffmpeg()
+    if ffmpeg is None:
+        raise RuntimeError(f"O formato {formato} exige o ffmpeg instalado no servidor.")
+
+    quadros = iter(quadros)
+    primeiro = next(quadros)
+    altura, largura = primeiro.shape[:2]
+
+    with tempfile.TemporaryDirectory() as pasta:
+        saida = os.path.join(pasta, "animacao." + formato.lower())
+        comando = [
+            ffmpeg, "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{largura}x{altura}", "-r", f"{fps}",
+            "-i", "-",
+            # Os codecs exigem dimensões pares
+            "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+            *_CODECS_FFMPEG[formato], saida,
+        ]
+        processo = subprocess.Popen(comando, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+        processo.stdin.write(primeiro.tobytes())
+        for quadro in quadros:
+            processo.stdin.write(quadro.tobytes())
+        processo.stdin.close()
+        erro = processo.stderr.read().decode(errors="replace")
+        if processo.wait() != 0:
+            raise RuntimeError(f"Falha ao codificar a animação com o ffmpeg: {erro}")
+
+        with open(saida, "rb") as arquivo:
+            return arquivo.read()
+
+
+def exibir_animacao(placeholder, dados, formato):
+    """Mostra no placeholder do Streamlit a animação exportada por exportar_animacao()."""
+    if formato in ("MP4", "WebM"):
+        placeholder.video(dados, format=FORMATOS_ANIMACAO[formato], autoplay=True, muted=True)
+    else:
+        placeholder.image(dados, width="stretch")
@@ -0,0 +1,86 @@
+"""
+Animação executada no navegador.
+
+Os arrays da trajetória (tempo, posições, velocidades e contadores) são
+enviados uma única vez ao navegador, que desenha e anima tudo localmente em
+um <canvas>, como o index.html faz com o p5.js. O servidor não renderiza
+nenhum quadro: o custo por aluno deixa de depender do número de quadros.
+
+Uso típico:
+
+    animacao_navegador(
+        t,
+        [serie(x, y, rotulo='Projétil', cor='red', tracejada=True)],
+        xlim=(0, 100), ylim=(0, 50),
+        metricas=[metrica('Tempo (s)', t)],
+    )
+"""
+import base64
+import json
+import os
+from string import Template
+
+import numpy as np
+
+_MODELO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "animacao_navegador.html")
+
+
+def _empacotar(valores, float32=True):
+    """Converte um array para float32 em base64 (compacto) ou para lista JSON."""
+    valores = np.asarray(valores, dtype=np.float32 if float32 else float)
+    if float32:
+        return base64.b64encode(valores.tobytes()).decode("ascii")
+    return valores.tolist()
+
+
+def serie(x, y, rotulo=None, cor="blue", tracejada=False, alpha=1.0, espessura=2, cor_ponto=None):
+    """Uma trajetória animada: a trilha é desenhada até o quadro atual, com um ponto na posição atual."""
+    return dict(x=x, y=y, rotulo=rotulo, cor=cor, tracejada=tracejada, alpha=alpha,
+                espessura=espessura, cor_ponto=cor_ponto)
+
+
+def metrica(rotulo, valores, unidade="", casas=2):
+    """Um contador atualizado a cada quadro (equivalente ao st.metric)."""
+    return dict(rotulo=rotulo, valores=valores, unidade=unidade, casas=casas)
+
+
+def animacao_navegador(t, series, xlim, ylim, titulo="", xlabel="", ylabel="",
+                       metricas=(), vetores=None, pontos_fixos=(), intervalo=0.05,
+                       altura=450, float32=True):
+    """
+    Envia a animação ao navegador como um componente HTML.
+
+    t: tempos dos quadros; todas as séries, vetores e métricas têm o mesmo tamanho de t.
+    vetores: dict(vx=..., vy=..., serie=0) com as componentes de velocidade desenhadas
+        sobre a série indicada (os mesmos V, Vx e Vy de draw_vectors).
+    pontos_fixos: lista de dict(x=..., y=..., cor=...) desenhados em todos os quadros.
+    intervalo: segundos entre quadros (o valor do slider "Velocidade da Animação").
+    """
+    import streamlit as st
+
+    dados = dict(
+        t=_empacotar(t, float32),
+        series=[dict(s, x=_empacotar(s["x"], float32), y=_empacotar(s["y"], float32)) for s in series],
+        vetores=None if vetores is None else dict(
+            vx=_empacotar(vetores["vx"], float32),
+            vy=_empacotar(vetores["vy"], float32),
+            serie=vetores.get("serie", 0),
+        ),
+        metricas=[dict(m, valores=_empacotar(m["valores"], float32)) for m in metricas],
+        pontos_fixos=[dict(p, x=float(p["x"]), y=float(p["y"])) for p in pontos_fixos],
+        eixos=dict(xlim=[float(v) for v in xlim], ylim=[float(v) for v in ylim],
+                   titulo=titulo, xlabel=xlabel, ylabel=ylabel),
+        intervalo=float(intervalo),
+        altura=altura,
+    )
+
+    with open(_MODELO, encoding="utf-8") as arquivo:
+        modelo = Template(arquivo.read())
+    html = modelo.safe_substitute(dados=json.dumps(dados))
+
+    # Altura extra para a barra de controles
+    if hasattr(st, "iframe"):
+        st.iframe(html, height=altura + 50)
+    else:
+        import streamlit.components.v1 as components
+        components.html(html, height=altura + 50)
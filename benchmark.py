@@ -0,0 +1,367 @@
+"""
+Medição de desempenho dos simuladores.
+
+Mede, para uma matriz fixa de parâmetros:
+  - calculo: as fórmulas do núcleo de física (projétil com e sem arrasto,
+    M.U., M.U.V. e encontro) e os estudos em lote (varredura, alvos,
+    Monte Carlo e sistemas de blocos), sem Streamlit;
+  - quadro: um quadro da animação com figura persistente, um quadro
+    montado do zero e a serialização PNG que o st.pyplot() faz;
+  - rerun: a execução completa de cada script pelo AppTest do Streamlit,
+    com e sem o botão da animação (o botão monta a cena e mostra o primeiro
+    quadro da reprodução; as pausas do time.sleep são zeradas).
+
+Os caches são esvaziados antes de cada repetição, para medir o custo real.
+Roda sem internet em qualquer Linux com as dependências do requirements.txt.
+
+Uso:
+    python benchmark.py                                   # tudo, salva em benchmark.json
+    python benchmark.py --grupos calculo quadro           # só alguns grupos
+    python benchmark.py --saida novo.json --referencia benchmark.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# O armazém em disco (cache_disco.py) vai para uma pasta temporária, para não
+# reaproveitar quadros renderizados antes da medição
+os.environ.setdefault("CINEMATICA_CACHE_DIR", tempfile.mkdtemp(prefix="cinematica-benchmark-"))
+
+import numpy as np
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, PASTA)
+
+GRUPOS = ("calculo", "quadro", "rerun")
+
+# --- Matriz fixa de parâmetros ---
+# Projétil: (v0 em m/s, ângulo em graus, g em m/s², altura inicial, altura de impacto)
+PROJETEIS = [
+    (50.0, 45.0, 9.8, 0.0, 0.0),
+    (20.0, 30.0, 9.8, 10.0, 0.0),
+    (80.0, 60.0, 1.62, 0.0, 5.0),
+    (10.0, 0.0, 9.8, 50.0, 0.0),
+    (30.0, 80.0, 24.79, 0.0, 40.0),
+]
+# Arrasto: (coeficiente de arrasto, área da seção em m², massa em kg)
+ARRASTO = (0.47, 0.01, 0.5)
+# Encontro: (s0_1, v_1, a_1, s0_2, v_2, a_2, t_max)
+ENCONTROS = [
+    (0.0, 5.0, 0.0, 50.0, -5.0, 0.0, 15.0),
+    (0.0, 5.0, 1.0, 50.0, -5.0, 0.0, 15.0),
+    (-20.0, 2.0, 1.5, 30.0, 0.0, -0.5, 30.0),
+]
+LOTE = 100_000
+N_MOVEIS = 500
+# Varredura ângulo × velocidade: pontos por eixo (sem arrasto e com arrasto)
+VARREDURA = 1000
+VARREDURA_ARRASTO = 100
+# Problema inverso: alvos resolvidos em uma chamada (sem arrasto e com arrasto)
+ALVOS = 1000
+ALVOS_ARRASTO = 100
+# Monte Carlo: amostras do lançamento com incerteza em v0, ângulo e g
+MONTE_CARLO = 1_000_000
+# Dinâmica: cenários de um sistema bloco na rampa + corpo pendurado integrados juntos
+BLOCOS_LOTE = 10_000
+APPS = [
+    "simulador_projetil_web.py",
+    "mu_grafico_web.py",
+    "muv_grafico_web.py",
+    "encontro_todos_mov_web.py",
+    "simulador_dinamica.py",
+]
+
+
+# --- Medição ---
+def medir(funcao, repeticoes, preparar=None):
+    """Executa funcao() repeticoes vezes (mais uma de aquecimento) e devolve os tempos em ms."""
+    if preparar:
+        preparar()
+    funcao()
+    tempos = []
+    for _ in range(repeticoes):
+        if preparar:
+            preparar()
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return tempos
+
+
+def resumo(tempos):
+    return dict(
+        mediana_ms=statistics.median(tempos),
+        min_ms=min(tempos),
+        media_ms=statistics.fmean(tempos),
+        repeticoes=len(tempos),
+    )
+
+
+def limpar_caches():
+    from cache import CACHE_CALCULOS, CACHE_FIGURAS
+    from cache_disco import ARMAZEM
+
+    CACHE_CALCULOS.limpar()
+    CACHE_FIGURAS.limpar()
+    ARMAZEM.limpar()
+
+
+# --- Grupos de medições ---
+def medicoes_calculo():
+    from fisica import blocos, encontro, mu, muv
+    from fisica.alvo import angulos_para_alvo
+    from fisica.arrasto import calcular_trajetoria_arrasto, coeficiente_quadratico
+    from fisica.montecarlo import Normal, simular
+    from fisica.projetil import calcular_trajetoria_lote, pontos_trajetoria, velocidades
+    from fisica.varredura import varrer
+
+    def projetil():
+        # O mesmo trabalho de calcular_trajetoria() no simulador
+        for v0, ang, g, h0, h_imp in PROJETEIS:
+            ang = np.radians(ang)
+            resultado = calcular_trajetoria_lote(v0, ang, g, h0, h_imp)
+            x, y, t = pontos_trajetoria(v0, ang, g, h0, float(resultado["t_voo"]), num=200)
+            velocidades(v0, ang, g, t)
+
+    def projetil_arrasto():
+        cd, area, massa = ARRASTO
+        k = coeficiente_quadratico(cd, area)
+        for v0, ang, g, h0, h_imp in PROJETEIS:
+            calcular_trajetoria_arrasto(v0, np.radians(ang), g, h0, h_imp, k, massa, num=200)
+
+    gerador = np.random.default_rng(0)
+    lote = dict(
+        v0=gerador.uniform(1, 100, LOTE), ang=gerador.uniform(0, np.pi / 2, LOTE),
+        g=9.8, h0=gerador.uniform(0, 50, LOTE), h_impacto=0.0,
+    )
+
+    def formulas_mu_muv():
+        for s0_1, v_1, a_1, _, _, _, t_max in ENCONTROS:
+            mu.trajetoria(s0_1, v_1, t_max, 101)
+            muv.trajetoria(s0_1, v_1, a_1, t_max, 101)
+
+    def formulas_encontro():
+        for parametros in ENCONTROS:
+            encontro.tempos_encontro(*parametros[:6])
+            encontro.posicoes(*parametros, 101)
+
+    # Tráfego: todos os pares de N_MOVEIS móveis
+    s0, v, a = gerador.uniform(-50, 50, N_MOVEIS), gerador.uniform(-20, 20, N_MOVEIS), gerador.uniform(-2, 2, N_MOVEIS)
+
+    def varredura(n, arrasto):
+        angulos = np.radians(np.linspace(0, 90, n))[:, None]
+        v0 = np.linspace(1, 100, n)[None, :]
+        if arrasto:
+            cd, area, massa = ARRASTO
+            return lambda: varrer(v0, angulos, 9.8, 0.0, 0.0, coeficiente_quadratico(cd, area), massa, "quadratico")
+        return lambda: varrer(v0, angulos, 9.8, 0.0, 0.0)
+
+    # Gabarito de uma lista de exercícios: os dois ângulos para cada alvo
+    x_alvos, y_alvos = gerador.uniform(5, 200, ALVOS), gerador.uniform(-10, 40, ALVOS)
+
+    def alvos(n, arrasto):
+        if arrasto:
+            cd, area, massa = ARRASTO
+            return lambda: angulos_para_alvo(x_alvos[:n], y_alvos[:n], 50.0, 9.8, 0.0,
+                                             coeficiente_quadratico(cd, area), massa, "quadratico")
+        return lambda: angulos_para_alvo(x_alvos[:n], y_alvos[:n], 50.0, 9.8, 0.0)
+
+    # Sistema da página de dinâmica: bloco na rampa e corpo pendurado, força em rampa
+    def sistema_blocos(n):
+        massas = np.c_[gerador.uniform(1, 50, n), gerador.uniform(1, 50, n)]
+        mu_c = gerador.uniform(0, 0.8, n)
+        mu_e = np.c_[mu_c + 0.1, np.zeros(n)]
+        forca = blocos.forca_variavel("rampa", gerador.uniform(0, 400, n), 2.0)
+        return lambda: blocos.simular(massas, np.radians([30.0, -90.0]), mu_e, np.c_[mu_c, np.zeros(n)], forca,
+                                      100.0, t_max=20.0)
+
+    incertezas = dict(v0=Normal(50.0, 1.0), ang=Normal(np.radians(45), 0.02), g=Normal(9.8, 0.05), h0=0.0, h_impacto=0.0)
+
+    return {
+        "calculo/projetil": (projetil, 50),
+        "calculo/projetil_arrasto": (projetil_arrasto, 10),
+        f"calculo/projetil_lote_{LOTE}": (lambda: calcular_trajetoria_lote(**lote), 10),
+        "calculo/mu_muv": (formulas_mu_muv, 200),
+        "calculo/encontro": (formulas_encontro, 200),
+        f"calculo/encontro_{N_MOVEIS}_moveis": (lambda: encontro.encontros(s0, v, a, 30.0), 10),
+        f"calculo/varredura_{VARREDURA}x{VARREDURA}": (varredura(VARREDURA, False), 5),
+        f"calculo/varredura_arrasto_{VARREDURA_ARRASTO}x{VARREDURA_ARRASTO}": (varredura(VARREDURA_ARRASTO, True), 3),
+        f"calculo/alvos_{ALVOS}": (alvos(ALVOS, False), 50),
+        f"calculo/alvos_arrasto_{ALVOS_ARRASTO}": (alvos(ALVOS_ARRASTO, True), 3),
+        "calculo/blocos": (sistema_blocos(1), 20),
+        f"calculo/blocos_lote_{BLOCOS_LOTE}": (sistema_blocos(BLOCOS_LOTE), 3),
+        f"calculo/montecarlo_{MONTE_CARLO}": (lambda: simular("projetil", incertezas, MONTE_CARLO, semente=0), 5),
+    }
+
+
+def _figura_projetil(fig, ax, x, y, i):
+    ax.plot(x, y, 'r--', alpha=0.5)
+    ax.plot(x[i], y[i], 'o', color='blue', markersize=8)
+    ax.set_xlim(0, x.max() * 1.1)
+    ax.set_ylim(0, y.max() * 1.1)
+    ax.set_title("Animação da Trajetória")
+    ax.set_xlabel("Distância Horizontal (m)")
+    ax.set_ylabel("Altura (m)")
+    ax.grid(True, linestyle='--', alpha=0.7)
+
+
+def medicoes_quadro():
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    from animacao import CenaAnimada, codificar_png
+    from fisica.projetil import pontos_trajetoria
+
+    x, y, t = pontos_trajetoria(50.0, np.radians(45.0), 9.8, 0.0, 7.2, num=200)
+
+    cena = CenaAnimada(figsize=(10, 6))
+    _figura_projetil(cena.fig, cena.ax, x, y, 0)
+    trilha = cena.linha('r--', alpha=0.5)
+    ponto = cena.linha('o', color='blue', markersize=8)
+    vetores = cena.vetores(x.max(), y.max())
+    contador = iter(range(10**9))
+
+    def quadro_persistente():
+        i = next(contador) % len(x)
+        trilha.set_data(x[:i], y[:i])
+        ponto.set_data([x[i]], [y[i]])
+        vetores.atualizar(x[i], y[i], 35.0, 35.0 - 9.8 * t[i])
+        return cena.quadro()
+
+    def quadro_do_zero():
+        # Como os scripts faziam antes da CenaAnimada: uma figura nova por quadro
+        fig = Figure(figsize=(10, 6))
+        FigureCanvasAgg(fig)
+        _figura_projetil(fig, fig.add_subplot(), x, y, 100)
+        fig.canvas.draw()
+        return np.asarray(fig.canvas.buffer_rgba())
+
+    def serializacao_pyplot():
+        # O que o st.pyplot() faz com a figura: savefig em PNG, dpi 200, bbox justo
+        fig = Figure(figsize=(10, 6))
+        _figura_projetil(fig, fig.add_subplot(), x, y, 100)
+        fig.savefig(io.BytesIO(), format="png", dpi=200, bbox_inches="tight")
+
+    quadro = quadro_persistente()
+    return {
+        "quadro/persistente": (quadro_persistente, 50),
+        "quadro/do_zero": (quadro_do_zero, 20),
+        "quadro/serializacao_pyplot": (serializacao_pyplot, 10),
+        "quadro/codificar_png": (lambda: codificar_png(quadro), 20),
+    }
+
+
+def medicoes_rerun():
+    import logging
+
+    from streamlit.testing.v1 import AppTest
+
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    def rerun(app, clicar):
+        def executar():
+            teste = AppTest.from_file(os.path.join(PASTA, app), default_timeout=600).run()
+            if clicar:
+                teste.button[0].click().run()
+            if teste.exception:
+                raise RuntimeError(f"{app}: {teste.exception[0].message}")
+        return executar
+
+    medicoes = {}
+    for app in APPS:
+        nome = os.path.splitext(app)[0]
+        medicoes[f"rerun/{nome}"] = (rerun(app, False), 5)
+        # A tela inicial do laboratório de dinâmica não tem botão de animação
+        if app != "simulador_dinamica.py":
+            medicoes[f"rerun/{nome}/animacao"] = (rerun(app, True), 3)
+    return medicoes
+
+
+MEDICOES = dict(calculo=medicoes_calculo, quadro=medicoes_quadro, rerun=medicoes_rerun)
+
+
+# --- Execução e comparação ---
+def executar(grupos, repeticoes=None, filtro=None):
+    resultados = {}
+    dormir = time.sleep
+    time.sleep = lambda segundos: None   # as pausas entre quadros não entram na medição
+    try:
+        for grupo in grupos:
+            for nome, (funcao, n) in MEDICOES[grupo]().items():
+                if filtro and filtro not in nome:
+                    continue
+                tempos = medir(funcao, repeticoes or n, preparar=limpar_caches)
+                resultados[nome] = resumo(tempos)
+                print(f"{nome:45s} {resultados[nome]['mediana_ms']:10.2f} ms")
+    finally:
+        time.sleep = dormir
+    return resultados
+
+
+def ambiente():
+    import matplotlib
+    import streamlit
+
+    return dict(
+        python=platform.python_version(),
+        numpy=np.__version__,
+        matplotlib=matplotlib.__version__,
+        streamlit=streamlit.__version__,
+        sistema=platform.platform(),
+        processador=platform.processor() or platform.machine(),
+    )
+
+
+def comparar(resultados, referencia, tolerancia):
+    """Mostra a razão atual/referência das medianas e devolve os nomes que pioraram além da tolerância."""
+    piores = []
+    print(f"\n{'medição':45s} {'referência':>12s} {'atual':>12s} {'razão':>8s}")
+    for nome, atual in resultados.items():
+        if nome not in referencia:
+            continue
+        antes = referencia[nome]["mediana_ms"]
+        razao = atual["mediana_ms"] / antes if antes else float("inf")
+        marca = ""
+        if razao > 1 + tolerancia:
+            piores.append(nome)
+            marca = "  << regressão"
+        print(f"{nome:45s} {antes:10.2f}ms {atual['mediana_ms']:10.2f}ms {razao:8.2f}{marca}")
+    return piores
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede o desempenho dos simuladores.")
+    parser.add_argument("--grupos", nargs="+", choices=GRUPOS, default=list(GRUPOS))
+    parser.add_argument("--filtro", help="mede só os nomes que contêm este texto")
+    parser.add_argument("--repeticoes", type=int, help="repetições de cada medição (padrão: depende da medição)")
+    parser.add_argument("--saida", default="benchmark.json", help="arquivo JSON com os resultados")
+    parser.add_argument("--referencia", help="JSON de uma execução anterior, para comparação")
+    parser.add_argument("--tolerancia", type=float, default=0.25,
+                        help="piora relativa aceita antes de acusar regressão (padrão: 0.25)")
+    args = parser.parse_args(argv)
+
+    resultados = executar(args.grupos, args.repeticoes, args.filtro)
+    with open(args.saida, "w", encoding="utf-8") as arquivo:
+        json.dump(dict(data=datetime.now().isoformat(timespec="seconds"), ambiente=ambiente(),
+                       resultados=resultados), arquivo, indent=2, ensure_ascii=False)
+    print(f"\nResultados salvos em {args.saida}")
+
+    if args.referencia:
+        with open(args.referencia, encoding="utf-8") as arquivo:
+            referencia = json.load(arquivo)["resultados"]
+        piores = comparar(resultados, referencia, args.tolerancia)
+        if piores:
+            print(f"\n{len(piores)} regressão(ões) acima de {args.tolerancia:.0%}.")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Cache em memória para os cálculos e gráficos dos simuladores.
+
+O Streamlit executa o script inteiro de novo a cada mudança em um controle.
+Os caches deste módulo ficam no processo do servidor (compartilhados entre
+reruns e entre sessões), com tamanho limitado, descarte do item menos usado
+recentemente (LRU) e contadores de acertos e falhas.
+
+Os arrays guardados são marcados como somente leitura, pois o mesmo objeto
+é entregue a todas as sessões.
+"""
+import functools
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from instrumentacao import INSTRUMENTACAO, medir
+
+
+class CacheLRU:
+    """Dicionário com tamanho máximo que descarta o item usado há mais tempo."""
+
+    def __init__(self, tamanho_max=256, nome=""):
+        self.tamanho_max = tamanho_max
+        self.nome = nome
+        self.acertos = 0
+        self.falhas = 0
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+
+    def obter(self, chave, calcular):
+        """Devolve o valor da chave; se não existir, chama calcular() e guarda o resultado."""
+        with self._trava:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return self._itens[chave]
+            self.falhas += 1
+
+        # O cálculo é feito fora da trava para não bloquear as outras sessões;
+        # a duração entra como uma etapa da execução atual (instrumentacao.py)
+        with medir(self.nome):
+            valor = _congelar(calcular())
+
+        with self._trava:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho_max:
+                self._itens.popitem(last=False)
+        return valor
+
+    def limpar(self):
+        with self._trava:
+            self._itens.clear()
+            self.acertos = 0
+            self.falhas = 0
+
+    def estatisticas(self):
+        """Tamanho atual, acertos, falhas e taxa de acerto."""
+        with self._trava:
+            consultas = self.acertos + self.falhas
+            return dict(
+                nome=self.nome,
+                itens=len(self._itens),
+                tamanho_max=self.tamanho_max,
+                acertos=self.acertos,
+                falhas=self.falhas,
+                taxa_acerto=self.acertos / consultas if consultas else 0.0,
+            )
+
+    def __len__(self):
+        return len(self._itens)
+
+    def __contains__(self, chave):
+        return chave in self._itens
+
+
+def _congelar(valor):
+    """Marca os arrays do resultado (também dentro de tuplas, listas e dicionários) como somente leitura."""
+    if isinstance(valor, np.ndarray):
+        valor.flags.writeable = False
+    elif isinstance(valor, (tuple, list)):
+        for item in valor:
+            _congelar(item)
+    elif isinstance(valor, dict):
+        for item in valor.values():
+            _congelar(item)
+    return valor
+
+
+def memoizar(cache):
+    """
+    Decorador: guarda no cache o resultado da função para cada combinação de argumentos.
+
+    Os argumentos precisam ser hasheáveis (números, textos, tuplas), como os
+    valores dos sliders. A função deve ser pura: sem st.* nem outros efeitos.
+    """
+    def decorador(funcao):
+        prefixo = (funcao.__module__, funcao.__qualname__)
+
+        @functools.wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            chave = (prefixo, args, tuple(sorted(kwargs.items())))
+            return cache.obter(chave, lambda: funcao(*args, **kwargs))
+
+        envoltorio.cache = cache
+        return envoltorio
+
+    return decorador
+
+
+# --- Caches compartilhados pelos simuladores ---
+# Arrays e resultados numéricos
+CACHE_CALCULOS = CacheLRU(tamanho_max=512, nome="cálculos")
+# Gráficos estáticos já renderizados (bytes PNG)
+CACHE_FIGURAS = CacheLRU(tamanho_max=128, nome="figuras")
+
+INSTRUMENTACAO.registrar_fonte("cache_calculos", CACHE_CALCULOS.estatisticas)
+INSTRUMENTACAO.registrar_fonte("cache_figuras", CACHE_FIGURAS.estatisticas)
@@ -0,0 +1,207 @@
+"""
+Armazém em disco de quadros e animações já renderizados.
+
+Em uma aula, a turma inteira costuma rodar o mesmo cenário (por exemplo, o
+lançamento padrão de 50 m/s a 45°). O armazém guarda os bytes renderizados
+(PNG dos quadros, GIF/APNG/MP4 das animações e gráficos estáticos) em um
+diretório local compartilhado por todas as sessões e processos: depois do
+primeiro aluno, os demais recebem o resultado pronto.
+
+Cada item é endereçado pelo hash de (app, parâmetros físicos, opções da
+figura). As gravações são atômicas (arquivo temporário + os.replace) e os
+itens são descartados por idade e pelo tamanho total do diretório, do menos
+usado recentemente para o mais usado. Cada leitura renova o horário do
+arquivo, então a idade de um item conta a partir do último uso: idade_max é
+o tempo máximo sem uso, não desde a gravação.
+
+O diretório padrão é ~/.cache/cinematica, ou o da variável de ambiente
+CINEMATICA_CACHE_DIR.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from instrumentacao import INSTRUMENTACAO
+
+TAMANHO_MAX_PADRAO = 512 * 1024**2   # 512 MB
+IDADE_MAX_PADRAO = 7 * 24 * 3600     # uma semana
+
+# Faz parte de todas as chaves: incremente ao mudar a aparência dos gráficos
+# para que os quadros antigos deixem de ser usados
+VERSAO = 5
+
+
+def _diretorio_padrao():
+    return os.environ.get("CINEMATICA_CACHE_DIR",
+                          os.path.join(os.path.expanduser("~"), ".cache", "cinematica"))
+
+
+class ArmazemDisco:
+    """
+    Armazém de bytes endereçado por conteúdo, persistido em disco.
+
+    O número de arquivos e o tamanho total são contados uma vez no diretório
+    e depois acompanhados a cada gravação deste processo; as gravações de
+    outros processos só entram na contagem no próximo descarte.
+    """
+
+    def __init__(self, diretorio=None, tamanho_max=TAMANHO_MAX_PADRAO, idade_max=IDADE_MAX_PADRAO):
+        self.diretorio = diretorio or _diretorio_padrao()
+        self.tamanho_max = tamanho_max
+        self.idade_max = idade_max
+        self.acertos = 0
+        self.falhas = 0
+        self.bytes_servidos = 0
+        self._tamanho_total = None   # contados no diretório no primeiro uso
+        self._n_arquivos = None
+        self._trava = threading.Lock()
+
+    # --- Chaves ---
+    @staticmethod
+    def chave(app, parametros, opcoes=None):
+        """Hash SHA-256 de (app, parâmetros físicos, opções da figura)."""
+        texto = json.dumps([VERSAO, app, parametros, opcoes], sort_keys=True, default=repr)
+        return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, chave[:2], chave)
+
+    # --- Leitura e gravação ---
+    def obter(self, chave):
+        """Bytes guardados para a chave, ou None se não existirem (ou estiverem vencidos)."""
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, "rb") as arquivo:
+                dados = arquivo.read()
+            if time.time() - os.path.getmtime(caminho) > self.idade_max:
+                dados = None
+            else:
+                # O horário do último uso define a ordem de descarte (LRU) e a idade do item
+                os.utime(caminho)
+        except OSError:
+            dados = None
+
+        with self._trava:
+            if dados is None:
+                self.falhas += 1
+            else:
+                self.acertos += 1
+                self.bytes_servidos += len(dados)
+        return dados
+
+    def guardar(self, chave, dados):
+        """Grava os bytes de forma atômica: leitores nunca veem um arquivo pela metade."""
+        caminho = self._caminho(chave)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        try:
+            # Uma chave regravada substitui o arquivo anterior: o tamanho dele sai do total
+            antigo = os.path.getsize(caminho)
+        except OSError:
+            antigo = None
+        descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho), prefix=".tmp-")
+        try:
+            with os.fdopen(descritor, "wb") as arquivo:
+                arquivo.write(dados)
+            os.replace(temporario, caminho)
+        except BaseException:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+
+        with self._trava:
+            if self._tamanho_total is None:
+                self._contar()
+            else:
+                self._tamanho_total += len(dados) - (antigo or 0)
+                self._n_arquivos += antigo is None
+            excedeu = self._tamanho_total > self.tamanho_max
+        if excedeu:
+            self.descartar()
+
+    def obter_ou_gerar(self, chave, gerar):
+        """Devolve os bytes da chave; se não existirem, chama gerar() e guarda o resultado."""
+        dados = self.obter(chave)
+        if dados is None:
+            dados = gerar()
+            self.guardar(chave, dados)
+        return dados
+
+    # --- Descarte ---
+    def _contar(self):
+        # Chamado com a trava: conta os arquivos e o tamanho total no diretório
+        itens = self._arquivos()
+        self._n_arquivos = len(itens)
+        self._tamanho_total = sum(tamanho for _, _, tamanho in itens)
+
+    def _arquivos(self):
+        """(caminho, horário do último uso, tamanho) de cada item guardado."""
+        itens = []
+        if not os.path.isdir(self.diretorio):
+            return itens
+        for pasta in os.scandir(self.diretorio):
+            if not pasta.is_dir():
+                continue
+            for entrada in os.scandir(pasta.path):
+                if entrada.name.startswith(".tmp-"):
+                    continue
+                try:
+                    info = entrada.stat()
+                except OSError:
+                    continue
+                itens.append((entrada.path, info.st_mtime, info.st_size))
+        return itens
+
+    def descartar(self):
+        """Remove os itens vencidos e, se preciso, os menos usados até caber em tamanho_max."""
+        agora = time.time()
+        itens = sorted(self._arquivos(), key=lambda item: item[1])
+        total = sum(tamanho for _, _, tamanho in itens)
+        restantes = len(itens)
+        for caminho, ultimo_uso, tamanho in itens:
+            if total <= self.tamanho_max and agora - ultimo_uso <= self.idade_max:
+                continue
+            try:
+                os.remove(caminho)
+                total -= tamanho
+                restantes -= 1
+            except OSError:
+                pass
+        with self._trava:
+            self._tamanho_total = total
+            self._n_arquivos = restantes
+
+    def limpar(self):
+        for caminho, _, _ in self._arquivos():
+            try:
+                os.remove(caminho)
+            except OSError:
+                pass
+        with self._trava:
+            self._tamanho_total = self._n_arquivos = 0
+            self.acertos = self.falhas = self.bytes_servidos = 0
+
+    # --- Estatísticas ---
+    def estatisticas(self):
+        """Taxa de acerto deste processo e ocupação do diretório (sem varrê-lo a cada chamada)."""
+        with self._trava:
+            if self._tamanho_total is None:
+                self._contar()
+            consultas = self.acertos + self.falhas
+            return dict(
+                diretorio=self.diretorio,
+                arquivos=self._n_arquivos,
+                bytes=self._tamanho_total,
+                tamanho_max=self.tamanho_max,
+                acertos=self.acertos,
+                falhas=self.falhas,
+                taxa_acerto=self.acertos / consultas if consultas else 0.0,
+                bytes_servidos=self.bytes_servidos,
+            )
+
+
+# Armazém compartilhado pelos simuladores
+ARMAZEM = ArmazemDisco()
+INSTRUMENTACAO.registrar_fonte("armazem", ARMAZEM.estatisticas)
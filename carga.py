@@ -0,0 +1,365 @@
+"""
+Teste de carga: uma turma inteira de sessões simultâneas em um simulador local.
+
+Sobe o simulador com o streamlit run em uma porta livre (ou usa um servidor
+já em execução) e abre N sessões pelo mesmo websocket que o navegador usa.
+Cada sessão segue o roteiro de um aluno: abre a página, mexe nos sliders do
+roteiro do app, aperta o botão da animação e acompanha a reprodução até o
+fim, pedindo cada quadro no intervalo escolhido, como faz o navegador.
+
+Ao final mostra:
+  - a latência das execuções completas (abertura, sliders, botão) e dos
+    quadros, em percentis;
+  - os quadros atrasados (chegaram mais de 50% depois do intervalo pedido) e
+    os repetidos (o servidor ainda não tinha o quadro seguinte pronto e
+    reenviou o atual);
+  - o uso de CPU e a memória (RSS) do servidor e dos seus processos filhos,
+    lidos do /proc.
+
+Roda sem internet, em um único Linux. Por padrão o servidor usa um armazém
+em disco vazio (cache_disco.py), para medir o primeiro acesso da turma.
+
+Uso:
+    python carga.py                                          # 30 sessões no simulador de projétil
+    python carga.py encontro_todos_mov_web.py --sessoes 40 --rampa 10
+    python carga.py --iguais --intervalo 0.05                # todos com os mesmos parâmetros
+    python carga.py --url ws://localhost:8501 --pid 1234     # servidor já em execução
+    python carga.py --saida carga.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import numpy as np
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+
+# --- Roteiros: botão da animação e sliders sorteados (rótulo -> faixa) de cada app ---
+ROTEIROS = {
+    "simulador_projetil_web.py": dict(botao="Animação", sliders={
+        "Velocidade Inicial (vᵢ, em m/s)": (20, 100),
+        "Ângulo de Lançamento (θ, em °)": (15, 75),
+    }),
+    "encontro_todos_mov_web.py": dict(botao="Iniciar Animação", sliders={
+        "Tempo Máximo da Simulação (t_max em s)": (5, 30),
+    }),
+    "mu_grafico_web.py": dict(botao="Iniciar Animação", sliders={
+        "Velocidade (v em m/s)": (-20, 20),
+        "Tempo Final (t em s)": (5, 20),
+    }),
+    "muv_grafico_web.py": dict(botao="Iniciar Animação", sliders={
+        "Aceleração (a em m/s²)": (-10, 10),
+        "Tempo Final (t em s)": (5, 20),
+    }),
+}
+SLIDER_INTERVALO = "Velocidade da Animação (segundos)"
+
+# Um quadro é atrasado se chega mais de ATRASO vezes o intervalo pedido depois do anterior
+ATRASO = 1.5
+ESPERA_MAXIMA = 120.0
+PERCENTIS = (50, 90, 99)
+
+
+# --- Servidor local ---
+def porta_livre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def iniciar_servidor(app, porta):
+    """Sobe o streamlit run do app e espera o servidor responder."""
+    ambiente = dict(os.environ)
+    ambiente.setdefault("CINEMATICA_CACHE_DIR", tempfile.mkdtemp(prefix="cinematica-carga-"))
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", os.path.join(PASTA, app), "--server.headless", "true",
+         "--server.port", str(porta), "--server.address", "127.0.0.1", "--server.fileWatcherType", "none",
+         "--browser.gatherUsageStats", "false"],
+        cwd=PASTA, env=ambiente, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    limite = time.monotonic() + 60
+    while time.monotonic() < limite:
+        if processo.poll() is not None:
+            raise RuntimeError("O servidor do Streamlit terminou antes de responder.")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{porta}/_stcore/health", timeout=1)
+            return processo
+        except OSError:
+            time.sleep(0.2)
+    processo.terminate()
+    raise RuntimeError("O servidor do Streamlit não respondeu em 60 s.")
+
+
+# --- CPU e memória do servidor (/proc) ---
+def _arvore(pid):
+    """O processo e todos os seus descendentes."""
+    pids, pendentes = [], [pid]
+    while pendentes:
+        atual = pendentes.pop()
+        pids.append(atual)
+        try:
+            for tarefa in os.listdir(f"/proc/{atual}/task"):
+                with open(f"/proc/{atual}/task/{tarefa}/children") as arquivo:
+                    pendentes += [int(filho) for filho in arquivo.read().split()]
+        except OSError:
+            pass
+    return pids
+
+
+def _uso(pid):
+    """(segundos de CPU, bytes de RSS) somados na árvore de processos."""
+    cpu = rss = 0
+    for atual in _arvore(pid):
+        try:
+            with open(f"/proc/{atual}/stat") as arquivo:
+                campos = arquivo.read().rsplit(")", 1)[1].split()
+            cpu += (int(campos[11]) + int(campos[12])) / os.sysconf("SC_CLK_TCK")
+            rss += int(campos[21]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, IndexError, ValueError):
+            pass
+    return cpu, rss
+
+
+async def monitorar(pid, amostras, intervalo=0.5):
+    """Acrescenta a amostras (uso de CPU em % de um núcleo, RSS em bytes) até ser cancelada."""
+    cpu_anterior, _ = _uso(pid)
+    t_anterior = time.monotonic()
+    while True:
+        await asyncio.sleep(intervalo)
+        cpu, rss = _uso(pid)
+        agora = time.monotonic()
+        amostras.append((100 * (cpu - cpu_anterior) / (agora - t_anterior), rss))
+        cpu_anterior, t_anterior = cpu, agora
+
+
+# --- Sessão simulada ---
+class Sessao:
+    """Uma aba do navegador: mantém o estado dos widgets e mede cada execução e cada quadro."""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.widgets = {}         # rótulo -> proto do widget (o último recebido)
+        self.estados = {}         # id -> WidgetState enviado em todas as execuções
+        self.fragmentos = {}      # fragmentos com execução automática: id -> intervalo
+        self.quadro = None
+        self.imagens = 0
+        self.erros = []
+
+    async def executar(self, gatilho=None, fragmento=None):
+        """Pede uma execução (completa ou só do fragmento) e espera o fim; devolve a duração."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+
+        mensagem = BackMsg()
+        pedido = mensagem.rerun_script
+        pedido.SetInParent()
+        for estado in self.estados.values():
+            pedido.widget_states.widgets.add().CopyFrom(estado)
+        if gatilho is not None:
+            estado = pedido.widget_states.widgets.add()
+            estado.id = gatilho
+            estado.trigger_value = True
+        if fragmento is not None:
+            pedido.fragment_id = fragmento
+            pedido.is_auto_rerun = True
+
+        inicio = time.perf_counter()
+        await self.ws.send(mensagem.SerializeToString())
+        await self._receber_ate_o_fim()
+        return time.perf_counter() - inicio
+
+    async def _receber_ate_o_fim(self):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        while True:
+            mensagem = ForwardMsg()
+            mensagem.ParseFromString(await asyncio.wait_for(self.ws.recv(), ESPERA_MAXIMA))
+            tipo = mensagem.WhichOneof("type")
+            if tipo == "delta" and mensagem.delta.WhichOneof("type") == "new_element":
+                self._elemento(mensagem.delta.new_element)
+            elif tipo == "new_session" and not mensagem.new_session.fragment_ids_this_run:
+                self.fragmentos.clear()
+            elif tipo == "auto_rerun":
+                self.fragmentos[mensagem.auto_rerun.fragment_id] = mensagem.auto_rerun.interval
+            elif tipo == "stop_auto_rerun":
+                self.fragmentos.clear()
+            elif tipo == "script_finished":
+                return
+
+    def _elemento(self, elemento):
+        tipo = elemento.WhichOneof("type")
+        if tipo == "imgs":
+            self.imagens += 1
+        elif tipo == "exception":
+            self.erros.append(elemento.exception.message)
+        elif tipo in ("button", "slider"):
+            widget = getattr(elemento, tipo)
+            self.widgets[widget.label] = widget
+            if tipo == "slider" and widget.label == "Quadro":
+                self.quadro = (widget.value if widget.set_value else widget.default)[0]
+
+    def mover_slider(self, rotulo, valor):
+        """Muda o valor do slider (ajustado ao passo do slider) para as próximas execuções."""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        slider = self.widgets[rotulo]
+        valor = min(max(valor, slider.min), slider.max)
+        valor = slider.min + round((valor - slider.min) / slider.step) * slider.step
+        estado = WidgetState(id=slider.id)
+        estado.double_array_value.data.append(round(valor, 10))
+        self.estados[slider.id] = estado
+
+
+async def sessao(numero, url, roteiro, intervalo, iguais, semente, resultados):
+    """Roteiro de um aluno; acrescenta as medições ao dicionário de resultados."""
+    import websockets
+
+    sorteio = random.Random(semente if iguais else semente + numero)
+    async with websockets.connect(f"{url.rstrip('/')}/_stcore/stream", subprotocols=["streamlit"],
+                                  max_size=None) as ws:
+        aluno = Sessao(ws)
+        resultados["execucoes"].append(await aluno.executar())
+
+        for rotulo, (minimo, maximo) in roteiro["sliders"].items():
+            aluno.mover_slider(rotulo, sorteio.uniform(minimo, maximo))
+            resultados["execucoes"].append(await aluno.executar())
+        if intervalo is not None:
+            aluno.mover_slider(SLIDER_INTERVALO, intervalo)
+            resultados["execucoes"].append(await aluno.executar())
+
+        resultados["execucoes"].append(await aluno.executar(gatilho=aluno.widgets[roteiro["botao"]].id))
+
+        # Reprodução: o navegador pede o fragmento a cada intervalo, até a animação parar
+        chegada_anterior = time.perf_counter()
+        while aluno.fragmentos:
+            fragmento, pedido = next(iter(aluno.fragmentos.items()))
+            await asyncio.sleep(max(0.0, chegada_anterior + pedido - time.perf_counter()))
+            quadro_anterior = aluno.quadro
+            resultados["quadros"].append(await aluno.executar(fragmento=fragmento))
+            chegada = time.perf_counter()
+            if chegada - chegada_anterior > ATRASO * pedido:
+                resultados["atrasados"] += 1
+            if aluno.fragmentos and aluno.quadro == quadro_anterior:
+                resultados["repetidos"] += 1
+            chegada_anterior = chegada
+
+        resultados["imagens"] += aluno.imagens
+        resultados["erros"] += aluno.erros
+
+
+async def turma(url, app, sessoes, rampa, intervalo, iguais, semente, pid):
+    resultados = dict(execucoes=[], quadros=[], atrasados=0, repetidos=0, imagens=0, erros=[], falhas=0,
+                      recursos=[])
+    monitor = asyncio.create_task(monitorar(pid, resultados["recursos"])) if pid else None
+
+    async def aluno(numero):
+        # Os alunos entram na aula ao longo da rampa
+        await asyncio.sleep(rampa * numero / max(sessoes, 1))
+        try:
+            await sessao(numero, url, ROTEIROS[app], intervalo, iguais, semente, resultados)
+        except Exception as erro:
+            resultados["falhas"] += 1
+            resultados["erros"].append(f"sessão {numero}: {erro!r}")
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(aluno(numero) for numero in range(sessoes)))
+    resultados["duracao"] = time.perf_counter() - inicio
+    if monitor:
+        monitor.cancel()
+    return resultados
+
+
+# --- Relatório ---
+def percentis(valores):
+    if not valores:
+        return {}
+    ms = 1000 * np.asarray(valores)
+    return {f"p{p}_ms": float(np.percentile(ms, p)) for p in PERCENTIS} | dict(max_ms=float(ms.max()), n=len(ms))
+
+
+def relatorio(resultados):
+    """Resumo dos resultados da turma (o que é gravado em --saida)."""
+    recursos = np.asarray(resultados["recursos"]) if resultados["recursos"] else np.zeros((0, 2))
+    quadros = len(resultados["quadros"])
+    return dict(
+        duracao_s=resultados["duracao"],
+        execucoes=percentis(resultados["execucoes"]),
+        quadros=percentis(resultados["quadros"]),
+        quadros_atrasados=resultados["atrasados"],
+        quadros_repetidos=resultados["repetidos"],
+        fracao_atrasados=resultados["atrasados"] / quadros if quadros else 0.0,
+        imagens_recebidas=resultados["imagens"],
+        sessoes_com_falha=resultados["falhas"],
+        erros=resultados["erros"][:20],
+        cpu_media_pct=float(recursos[:, 0].mean()) if len(recursos) else None,
+        cpu_max_pct=float(recursos[:, 0].max()) if len(recursos) else None,
+        rss_max_mb=float(recursos[:, 1].max() / 1024**2) if len(recursos) else None,
+    )
+
+
+def mostrar(resumo):
+    print(f"\nDuração: {resumo['duracao_s']:.1f} s")
+    for nome in ("execucoes", "quadros"):
+        dados = resumo[nome]
+        if dados:
+            texto = "  ".join(f"p{p} {dados[f'p{p}_ms']:8.1f} ms" for p in PERCENTIS)
+            print(f"{nome:10s} n={dados['n']:6d}  {texto}  máx {dados['max_ms']:8.1f} ms")
+    print(f"Quadros atrasados: {resumo['quadros_atrasados']} ({resumo['fracao_atrasados']:.1%}); "
+          f"repetidos: {resumo['quadros_repetidos']}")
+    if resumo["cpu_media_pct"] is not None:
+        print(f"Servidor: CPU média {resumo['cpu_media_pct']:.0f}% (máx. {resumo['cpu_max_pct']:.0f}%), "
+              f"RSS máx. {resumo['rss_max_mb']:.0f} MB")
+    if resumo["sessoes_com_falha"] or resumo["erros"]:
+        print(f"Sessões com falha: {resumo['sessoes_com_falha']}")
+        for erro in resumo["erros"]:
+            print(f"  {erro}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simula uma turma de sessões simultâneas em um simulador local.")
+    parser.add_argument("app", nargs="?", default="simulador_projetil_web.py", choices=list(ROTEIROS))
+    parser.add_argument("--sessoes", type=int, default=30, help="sessões simultâneas (padrão: 30)")
+    parser.add_argument("--rampa", type=float, default=5.0, help="segundos até todas as sessões entrarem")
+    parser.add_argument("--intervalo", type=float,
+                        help="intervalo entre quadros pedido em cada sessão (padrão: o do app)")
+    parser.add_argument("--iguais", action="store_true", help="todas as sessões com os mesmos parâmetros")
+    parser.add_argument("--semente", type=int, default=0, help="semente do sorteio dos sliders")
+    parser.add_argument("--url", help="servidor já em execução (ws://host:porta); sem ele, um é iniciado")
+    parser.add_argument("--pid", type=int, help="PID do servidor já em execução, para medir CPU e memória")
+    parser.add_argument("--saida", help="arquivo JSON com o resumo")
+    args = parser.parse_args(argv)
+
+    servidor = None
+    url, pid = args.url, args.pid
+    if url is None:
+        porta = porta_livre()
+        servidor = iniciar_servidor(args.app, porta)
+        url, pid = f"ws://127.0.0.1:{porta}", servidor.pid
+    try:
+        print(f"{args.sessoes} sessões em {args.app} ({url})...")
+        resultados = asyncio.run(turma(url, args.app, args.sessoes, args.rampa, args.intervalo, args.iguais,
+                                       args.semente, pid))
+    finally:
+        if servidor is not None:
+            servidor.terminate()
+            servidor.wait()
+
+    resumo = relatorio(resultados)
+    mostrar(resumo)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(dict(app=args.app, sessoes=args.sessoes, intervalo=args.intervalo, **resumo),
+                      arquivo, indent=2, ensure_ascii=False)
+        print(f"\nResumo salvo em {args.saida}")
+    return 1 if resumo["sessoes_com_falha"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+"""
+Codificação das imagens enviadas ao navegador: resolução, formato e orçamento de bytes.
+
+Os quadros da animação e o gráfico estático eram sempre PNG na resolução
+padrão da figura (figsize x 100 dpi): 1000 x 600 pixels no projétil e
+1200 x 700 no M.U., qualquer que fosse a tela do aluno. Em um celular na
+rede da escola, cada quadro tinha mais pixels e bytes do que a tela mostra.
+
+Aqui cada tipo de imagem segue uma Codificacao:
+  - a resolução (dpi) vem da largura que o gráfico ocupa na tela do aluno,
+    medida no navegador (medir_tela) e multiplicada pela densidade de pixels
+    da tela, com limites;
+  - o formato é PNG, JPEG ou WebP (com perdas, qualidade ajustável) ou SVG;
+  - com um orçamento de bytes, uma imagem maior que ele é refeita com menor
+    qualidade e, se ainda não couber, com menor resolução.
+
+Os quadros da animação e o gráfico estático final têm configurações
+separadas, escolhidas na barra lateral (opcoes_imagem):
+
+    quadros, estatico = opcoes_imagem(fracao=2 / 3)     # o gráfico ocupa 2/3 da largura
+    cena = CenaAnimada(figsize=(10, 6), dpi=quadros.dpi((10, 6)))
+    dados = cena.quadro_codificado(quadros)
+    exibir_imagem(placeholder, dados)
+"""
+import base64
+import io
+
+from instrumentacao import medir
+
+FORMATOS = ("PNG", "JPEG", "WebP", "SVG")
+
+# Limites da resolução escolhida pela largura da tela
+DPI_MIN = 40
+DPI_PADRAO = 100
+
+# A cada tentativa que não cabe no orçamento: qualidade e resolução menores
+PASSO_QUALIDADE = 15
+QUALIDADE_MIN = 35
+FATOR_DPI = 0.8
+
+# O st.image reduz (e recodifica) imagens mais largas que isso
+LARGURA_MAX_PIXELS = 1460
+
+# Abaixo desta largura de janela o Streamlit empilha as colunas: o gráfico ocupa a largura toda
+LARGURA_EMPILHADA = 640
+
+
+class Codificacao:
+    """
+    Formato, qualidade e orçamento de bytes de um tipo de imagem, e a tela em que ela é exibida.
+
+    largura é a largura do gráfico na tela, em pixels CSS (None: desconhecida,
+    usa dpi_padrao); dpr é a densidade de pixels da tela, limitada a dpr_max;
+    dpi_max limita a resolução escolhida.
+    """
+
+    def __init__(self, formato="PNG", qualidade=85, orcamento=None, largura=None, dpr=1.0, dpr_max=2.0,
+                 dpi_max=200, dpi_padrao=DPI_PADRAO):
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato de imagem desconhecido: {formato}")
+        self.formato = formato
+        self.qualidade = qualidade
+        self.orcamento = orcamento
+        self.largura = largura
+        self.dpr = min(dpr, dpr_max)
+        self.dpi_max = dpi_max
+        self.dpi_padrao = dpi_padrao
+
+    def dpi(self, figsize):
+        """Resolução para uma figura de figsize polegadas ocupar a largura do gráfico na tela."""
+        dpi_max = min(self.dpi_max, LARGURA_MAX_PIXELS // figsize[0])
+        if self.largura is None:
+            return int(min(self.dpi_padrao, dpi_max))
+        return int(min(max(round(self.largura * self.dpr / figsize[0]), DPI_MIN), dpi_max))
+
+    def opcoes(self):
+        """Opções que mudam os bytes gerados (fazem parte das chaves do armazém em disco)."""
+        return dict(formato=self.formato, qualidade=self.qualidade, orcamento=self.orcamento)
+
+    def qualidades(self):
+        """Qualidades a tentar, da escolhida até a mínima (só JPEG e WebP têm qualidade)."""
+        if self.formato not in ("JPEG", "WebP"):
+            return [None]
+        return list(range(self.qualidade, QUALIDADE_MIN - 1, -PASSO_QUALIDADE)) or [self.qualidade]
+
+    def cabe(self, dados):
+        return self.orcamento is None or len(dados) <= self.orcamento
+
+
+# --- Codificação ---
+def codificar_rgba(rgba, formato="PNG", qualidade=85):
+    """Codifica uma imagem RGBA (array uint8 H x W x 4) em PNG, JPEG ou WebP."""
+    from PIL import Image
+
+    imagem = Image.fromarray(rgba)
+    buffer = io.BytesIO()
+    if formato == "PNG":
+        imagem.save(buffer, format="PNG", compress_level=1)
+    elif formato == "JPEG":
+        imagem.convert("RGB").save(buffer, format="JPEG", quality=qualidade)
+    elif formato == "WebP":
+        # method=2: bem mais rápido que o padrão (4), com arquivos quase do mesmo tamanho
+        imagem.convert("RGB").save(buffer, format="WEBP", quality=qualidade, method=2)
+    else:
+        raise ValueError(f"Formato raster desconhecido: {formato}")
+    return buffer.getvalue()
+
+
+def _no_orcamento(gerar, codificacao, dpi):
+    """
+    Chama gerar(dpi, formato, qualidade) até os bytes caberem no orçamento:
+    primeiro baixa a qualidade, depois o dpi. Devolve os bytes e o dpi usado
+    (o menor tentado, se nenhum coube).
+
+    Um SVG acima do orçamento é trocado por WebP.
+    """
+    formato = codificacao.formato
+    if formato == "SVG":
+        dados = gerar(dpi, "SVG", None)
+        if codificacao.cabe(dados):
+            return dados, dpi
+        codificacao = Codificacao("WebP", codificacao.qualidade, codificacao.orcamento)
+        formato = "WebP"
+
+    while True:
+        for qualidade in codificacao.qualidades():
+            dados = gerar(dpi, formato, qualidade)
+            if codificacao.cabe(dados):
+                return dados, dpi
+        if dpi <= DPI_MIN:
+            return dados, dpi
+        dpi = max(DPI_MIN, int(dpi * FATOR_DPI))
+
+
+def codificar_cena(cena, codificacao):
+    """
+    Quadro atual de uma CenaAnimada na codificação escolhida.
+
+    Se for preciso baixar a resolução para caber no orçamento, ela só vale
+    para este quadro: a cena volta à resolução original, que está nas chaves
+    do armazém em disco. Assim os bytes de cada quadro dependem só da chave,
+    e não dos quadros codificados antes por esta cena.
+    """
+    rgba = {}
+    dpi_original = cena.fig.dpi
+
+    def gerar(dpi, formato, qualidade):
+        if formato == "SVG":
+            buffer = io.BytesIO()
+            with medir("codificacao"):
+                cena.fig.savefig(buffer, format="svg")
+            return buffer.getvalue()
+        if dpi != cena.fig.dpi:
+            cena.fig.set_dpi(dpi)
+            cena.invalidar_fundo()
+        if dpi not in rgba:
+            rgba[dpi] = cena.quadro()
+        with medir("codificacao"):
+            return codificar_rgba(rgba[dpi], formato, qualidade)
+
+    try:
+        dados, _ = _no_orcamento(gerar, codificacao, int(dpi_original))
+    finally:
+        if cena.fig.dpi != dpi_original:
+            cena.fig.set_dpi(dpi_original)
+            cena.invalidar_fundo()
+    return dados
+
+
+def codificar_figura(fig, codificacao, figsize=None, **opcoes_savefig):
+    """
+    Figura estática do Matplotlib na codificação escolhida (savefig com as opcoes_savefig,
+    por exemplo bbox_inches="tight"), com a resolução pela largura da tela.
+    """
+    figsize = figsize or fig.get_size_inches()
+
+    def gerar(dpi, formato, qualidade):
+        buffer = io.BytesIO()
+        extras = {} if qualidade is None else dict(pil_kwargs=dict(quality=qualidade))
+        with medir("codificacao"):
+            fig.savefig(buffer, format=formato.lower(), dpi=dpi, **extras, **opcoes_savefig)
+        return buffer.getvalue()
+
+    dados, _ = _no_orcamento(gerar, codificacao, codificacao.dpi(figsize))
+    return dados
+
+
+def exibir_imagem(placeholder, dados):
+    """
+    Mostra no placeholder uma imagem codificada aqui.
+
+    O st.image recodifica em JPEG os bytes que não são PNG, JPEG ou GIF e só
+    aceita SVG como texto: o WebP vai como URL data:, sem recodificar.
+    """
+    if dados[:4] == b"RIFF":
+        dados = "data:image/webp;base64," + base64.b64encode(dados).decode("ascii")
+    elif dados[:5] == b"<?xml" or dados[:4] == b"<svg":
+        dados = dados.decode("utf-8")
+    placeholder.image(dados, width="stretch")
+
+
+# --- Tela do aluno ---
+# Mede no navegador a largura da área principal (em pixels CSS, em passos de 50 px
+# para não reexecutar a cada pixel de um redimensionamento), se a janela é estreita
+# a ponto de empilhar as colunas e a densidade de pixels, e informa ao servidor quando mudam.
+_JS_TELA = """
+export default function(component) {
+    const { setStateValue } = component;
+    let anterior = null;
+    const medir = () => {
+        const principal = document.querySelector('[data-testid="stMainBlockContainer"]');
+        const tela = {
+            largura: Math.round((principal ? principal.clientWidth : window.innerWidth) / 50) * 50,
+            empilhada: window.innerWidth < %d,
+            dpr: Math.round((window.devicePixelRatio || 1) * 4) / 4,
+        };
+        const atual = JSON.stringify(tela);
+        if (atual !== anterior) {
+            anterior = atual;
+            setStateValue('tela', tela);
+        }
+    };
+    medir();
+    const observador = new ResizeObserver(medir);
+    observador.observe(document.body);
+    return () => observador.disconnect();
+}
+""" % LARGURA_EMPILHADA
+
+_componente_tela = None
+
+
+def medir_tela():
+    """
+    Tela do aluno: largura da área principal (pixels CSS), se as colunas
+    estão empilhadas e a densidade de pixels; None antes de o navegador informar.
+    """
+    import streamlit as st
+
+    global _componente_tela
+    if _componente_tela is None:
+        _componente_tela = st.components.v2.component("tela", js=_JS_TELA)
+    with st.sidebar:
+        resultado = _componente_tela(key="tela", on_tela_change=lambda: None, height=0)
+    return resultado.tela
+
+
+# --- Configurações na barra lateral ---
+# Padrões: quadros leves (WebP, até 1,5x a densidade, no máximo a resolução de antes)
+# e gráfico estático nítido (PNG, até 2x a densidade; 144 dpi, como antes, até a tela ser medida)
+PADRAO_QUADROS = dict(formato="WebP", qualidade=75, orcamento_kb=40, dpr_max=1.5, dpi_max=100, dpi_padrao=100)
+PADRAO_ESTATICO = dict(formato="PNG", qualidade=90, orcamento_kb=300, dpr_max=2.0, dpi_max=200, dpi_padrao=144)
+ORCAMENTOS_KB = (10, 20, 40, 80, 160, 300, 600, None)
+
+
+def opcoes_imagem(fracao=1.0, estatico=True):
+    """
+    Controles de imagem na barra lateral; devolve as codificações dos quadros
+    e do gráfico estático (None com estatico=False, nos simuladores sem ele)
+    para a tela deste aluno.
+
+    fracao é a parte da largura da área principal ocupada pelo gráfico (a
+    coluna do gráfico); em janelas estreitas as colunas são empilhadas e o
+    gráfico ocupa a largura toda.
+    """
+    import streamlit as st
+
+    tela = medir_tela()
+    largura, dpr = None, 1.0
+    if tela:
+        largura = tela["largura"] * (1.0 if tela["empilhada"] else fracao)
+        dpr = tela["dpr"]
+
+    tipos = [("quadros", "Quadros da animação", PADRAO_QUADROS)]
+    if estatico:
+        tipos.append(("estatico", "Gráfico estático", PADRAO_ESTATICO))
+
+    codificacoes = []
+    with st.sidebar.expander("🖼️ Imagem"):
+        if tela:
+            densidade = f"{dpr:g}".replace(".", ",")
+            st.caption(f"Gráfico com {largura:.0f} px de largura na tela, densidade {densidade}×.")
+        for nome, titulo, padrao in tipos:
+            st.markdown(f"**{titulo}**")
+            formato = st.selectbox("Formato", FORMATOS, index=FORMATOS.index(padrao["formato"]),
+                                   key=f"imagem-{nome}-formato")
+            qualidade = st.slider("Qualidade (JPEG e WebP)", QUALIDADE_MIN, 95, padrao["qualidade"], 5,
+                                  key=f"imagem-{nome}-qualidade")
+            orcamento_kb = st.select_slider(
+                "Limite por imagem", ORCAMENTOS_KB, value=padrao["orcamento_kb"], key=f"imagem-{nome}-orcamento",
+                format_func=lambda kb: "sem limite" if kb is None else f"{kb} kB",
+                help="Imagens maiores são refeitas com menor qualidade e, se preciso, menor resolução."
+            )
+            codificacoes.append(Codificacao(
+                formato, qualidade, None if orcamento_kb is None else orcamento_kb * 1024,
+                largura=largura, dpr=dpr, dpr_max=padrao["dpr_max"], dpi_max=padrao["dpi_max"],
+                dpi_padrao=padrao["dpi_padrao"],
+            ))
+    return codificacoes if estatico else (codificacoes[0], None)
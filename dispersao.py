@@ -0,0 +1,133 @@
+"""
+Painel de incerteza (Monte Carlo) dos simuladores.
+
+Cada parâmetro medido pode ter um desvio padrão: o painel sorteia os
+parâmetros com distribuição normal em torno dos valores dos controles, passa
+as amostras pelas fórmulas do núcleo de física (fisica.montecarlo) e mostra
+a média e o desvio de cada resultado, histogramas e a dispersão de um par
+de resultados com as elipses de confiança de 68% e 95%.
+
+    painel_incerteza("projetil", "projetil", dict(v0=50.0, ang=0.79, g=9.8, h0=0.0, h_impacto=0.0),
+                     incertezas=dict(v0=("Desvio de v₀ (m/s)", 5.0, 1.0, 1.0)),
+                     grandezas=dict(alcance="Alcance (m)", t_voo="Tempo de Voo (s)"),
+                     par=("alcance", "t_voo"))
+"""
+import io
+
+import numpy as np
+import streamlit as st
+from matplotlib.figure import Figure
+
+from cache import CACHE_CALCULOS, CACHE_FIGURAS, memoizar
+from fisica.montecarlo import Normal, elipse_confianca, simular
+
+AMOSTRAS = (10**3, 10**4, 10**5, 10**6, 10**7)
+NIVEIS = (0.68, 0.95)
+
+
+@memoizar(CACHE_CALCULOS)
+def simulacao(modelo, parametros, desvios, amostras, semente):
+    """Resultado de fisica.montecarlo.simular() para parâmetros e desvios dados como tuplas (nome, valor)."""
+    distribuicoes = dict(parametros)
+    for nome, desvio in desvios:
+        if desvio > 0:
+            distribuicoes[nome] = Normal(distribuicoes[nome], desvio)
+    return simular(modelo, distribuicoes, amostras, semente=semente)
+
+
+def grafico_incerteza_png(resultado, grandezas, par):
+    """Histogramas das grandezas (linha de cima) e dispersão do par com as elipses de confiança."""
+    fig = Figure(figsize=(12, 8))
+    grade = fig.add_gridspec(2, len(grandezas), height_ratios=(1, 1.4))
+    media, desvio = resultado.momentos.media, resultado.momentos.desvio
+
+    for coluna, (nome, rotulo) in enumerate(grandezas.items()):
+        ax = fig.add_subplot(grade[0, coluna])
+        histograma = resultado.histogramas[nome]
+        ax.stairs(histograma.contagens, histograma.bordas[0], fill=True, alpha=0.6)
+        i = resultado.indice(nome)
+        ax.axvline(media[i], color="red", linewidth=1.2)
+        ax.axvspan(media[i] - desvio[i], media[i] + desvio[i], color="red", alpha=0.1)
+        ax.set_xlabel(rotulo)
+        ax.set_yticks([])
+
+    ax = fig.add_subplot(grade[1, :])
+    histograma = resultado.histogramas_pares[par]
+    contagens = np.ma.masked_equal(histograma.contagens.T, 0)
+    malha = ax.pcolormesh(*histograma.bordas, contagens, cmap="viridis")
+    fig.colorbar(malha, ax=ax, label="Amostras")
+    indices = [resultado.indice(nome) for nome in par]
+    covariancia = resultado.momentos.covariancia[np.ix_(indices, indices)]
+    for nivel, estilo in zip(NIVEIS, ("-", "--")):
+        ax.plot(*elipse_confianca(media[indices], covariancia, nivel), color="red", linestyle=estilo,
+                label=f"Elipse de {nivel:.0%}")
+    ax.plot(*media[indices], "+", color="red", markersize=12)
+    ax.set_xlabel(grandezas[par[0]])
+    ax.set_ylabel(grandezas[par[1]])
+    ax.set_title("Dispersão dos resultados")
+    ax.legend()
+    fig.tight_layout()
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=100)
+    return buffer.getvalue()
+
+
+def painel_incerteza(chave, modelo, parametros, incertezas, grandezas, par, amostras_max=10**7):
+    """
+    Expander com os desvios, o número de amostras e os resultados da simulação.
+
+    parametros são os valores centrais (argumentos do modelo em fisica.montecarlo);
+    incertezas associa nomes de parâmetros a (rótulo, desvio máximo, desvio
+    inicial, fator), em que o fator converte a unidade do slider para a do
+    modelo (por exemplo, graus para radianos); grandezas associa os
+    resultados mostrados aos seus rótulos e par escolhe os dois do gráfico de
+    dispersão.
+    """
+    with st.expander("🎲 Incerteza de Medição (Monte Carlo)"):
+        st.write(
+            "Considera os parâmetros como medidas com incerteza: cada amostra sorteia valores com distribuição "
+            "normal em torno dos controles, com os desvios padrão abaixo. As amostras são processadas em blocos, "
+            "só com estatísticas acumuladas, e a mesma semente repete o mesmo resultado."
+        )
+        desvios = []
+        colunas = st.columns(len(incertezas))
+        for coluna, (nome, (rotulo, maximo, inicial, fator)) in zip(colunas, incertezas.items()):
+            desvio = coluna.slider(rotulo, 0.0, maximo, inicial, maximo / 100, key=f"{chave}-desvio-{nome}")
+            desvios.append((nome, desvio * fator))
+
+        col_amostras, col_semente = st.columns(2)
+        opcoes = [n for n in AMOSTRAS if n <= amostras_max]
+        amostras = col_amostras.select_slider(
+            "Amostras", opcoes, value=opcoes[-1] if amostras_max < 10**6 else 10**6,
+            format_func=lambda n: f"10^{len(str(n)) - 1}", key=f"{chave}-amostras",
+        )
+        semente = col_semente.number_input("Semente", 0, 2**31 - 1, 0, key=f"{chave}-semente")
+
+        if not st.toggle("Simular", key=f"{chave}-simular"):
+            return
+
+        parametros = tuple(parametros.items())
+        desvios = tuple(desvios)
+        with st.spinner("Sorteando as amostras..."):
+            resultado = simulacao(modelo, parametros, desvios, amostras, int(semente))
+
+        if resultado.validas < 2:
+            st.error("Nenhuma amostra válida com esses parâmetros.")
+            return
+
+        colunas = st.columns(len(grandezas))
+        for coluna, (nome, rotulo) in zip(colunas, grandezas.items()):
+            i = resultado.indice(nome)
+            p5, p95 = resultado.histogramas[nome].quantis([0.05, 0.95])
+            coluna.metric(rotulo, f"{resultado.momentos.media[i]:.3g} ± {resultado.momentos.desvio[i]:.2g}",
+                          help=f"Média ± desvio padrão; 90% das amostras entre {p5:.3g} e {p95:.3g}.")
+
+        descartadas = resultado.amostras - resultado.validas
+        fora = max(h.fora for h in resultado.histogramas.values())
+        st.caption(f"{resultado.amostras:,} amostras; {descartadas:,} descartadas (sem solução física ou sem movimento); "
+                   f"{fora:,} fora da faixa dos histogramas.".replace(",", "."))
+
+        png = CACHE_FIGURAS.obter((f"{chave}-incerteza", parametros, desvios, amostras, int(semente), par),
+                                  lambda: grafico_incerteza_png(resultado, grandezas, par))
+        st.image(png, width="stretch")
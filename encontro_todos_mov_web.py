@@ -1,7 +1,19 @@
 import streamlit as st
-import matplotlib.pyplot as plt
 import numpy as np
-import time
+
+from amostragem import amostrar_adaptativo, escala_eixos
+from animacao import CenaAnimada, TrilhaIncremental, exibir_animacao, formatos_disponiveis
+from animacao_navegador import animacao_navegador, metrica, serie
+from cache import CACHE_CALCULOS, memoizar
+from cache_disco import ARMAZEM
+from codificacao import opcoes_imagem
+from fisica import encontro, muv
+from fisica.eventos import grade_com_eventos
+from instrumentacao import iniciar_execucao, painel_desempenho, terminar_execucao
+from reproducao import iniciar_reproducao, reproducao_atual
+
+# Tempo de cada execução e das suas etapas (instrumentacao.py)
+iniciar_execucao('encontro')
 
 # --- Título da página web ---
 import streamlit as st
@@ -42,18 +54,71 @@ with st.sidebar:
     else:
         a_2 = 0.0
 
+    st.markdown("---")
+
+    # Outros móveis, para exercícios de tráfego e ultrapassagem
+    st.header('Tráfego')
+    n_extras = st.number_input('Outros móveis (sorteados)', min_value=0, max_value=500, value=0, step=10,
+                               help='Móveis extras com posição e velocidade sorteadas. Todos os encontros entre '
+                                    'todos os móveis aparecem em uma tabela ao final da animação.')
+    if n_extras:
+        semente = st.number_input('Semente do sorteio', min_value=0, value=0, step=1)
+        extras_muv = st.checkbox('Móveis extras em M.U.V.', value=False)
+    else:
+        semente, extras_muv = 0, False
+
     t_max = st.slider('Tempo Máximo da Simulação (t_max em s)', min_value=1.0, max_value=30.0, value=15.0, step=1.0)
     velocidade_animacao = st.slider('Velocidade da Animação (segundos)', min_value=0.01, max_value=1.0, value=0.05, step=0.01)
+    modo_animacao = st.radio('Modo da Animação', ['Quadro a quadro', 'Vídeo único', 'Navegador'], horizontal=True,
+                             help='No modo vídeo único a animação é gerada uma vez no servidor e reproduzida pelo navegador. '
+                                  'No modo navegador a trajetória é enviada uma vez e o próprio navegador desenha a animação.')
+    if modo_animacao == 'Vídeo único':
+        formato_video = st.selectbox('Formato do Vídeo', formatos_disponiveis())
+
+# Resolução, formato e limite de bytes dos quadros pela tela do aluno (codificacao.py); o gráfico ocupa 3/4 da largura
+imagem_quadros, _ = opcoes_imagem(fracao=0.75, estatico=False)
 
 # --- Lógica de Encontro ---
-# Equação para o encontro: (s0_1 + v_1*t + 0.5*a_1*t²) = (s0_2 + v_2*t + 0.5*a_2*t²)
-# Rearranjando para a forma ax² + bx + c = 0
-a = 0.5 * (a_1 - a_2)
-b = v_1 - v_2
-c = s0_1 - s0_2
-tempos_encontro = np.roots([a, b, c])
-tempos_validos = [t.real for t in tempos_encontro if np.isreal(t) and t.real >= 0]
-tempos_validos.sort()
+# Os cálculos são memorizados (cache.py): repetir os mesmos parâmetros custa só uma consulta
+@memoizar(CACHE_CALCULOS)
+def calcular_encontros(s0_1, v_1, a_1, s0_2, v_2, a_2):
+    # Equação para o encontro: (s0_1 + v_1*t + 0.5*a_1*t²) = (s0_2 + v_2*t + 0.5*a_2*t²),
+    # resolvida em forma fechada pelo núcleo de física (fisica.encontro)
+    return encontro.tempos_encontro(s0_1, v_1, a_1, s0_2, v_2, a_2)
+
+
+@memoizar(CACHE_CALCULOS)
+def posicoes_moveis(s0_1, v_1, a_1, s0_2, v_2, a_2, t_max, num):
+    # Os instantes de encontro entram na grade de tempos (fisica.eventos):
+    # sempre há um quadro exatamente no encontro, com qualquer número de quadros
+    t = grade_com_eventos(0, t_max, num, calcular_encontros(s0_1, v_1, a_1, s0_2, v_2, a_2))
+    return t, muv.posicao(s0_1, v_1, a_1, t), muv.posicao(s0_2, v_2, a_2, t)
+
+
+@memoizar(CACHE_CALCULOS)
+def moveis_extras(n, semente, com_aceleracao):
+    # Sorteio reprodutível: a mesma semente gera sempre o mesmo tráfego
+    gerador = np.random.default_rng(semente)
+    s0 = gerador.uniform(-50, 50, n).round(1)
+    v = gerador.uniform(-20, 20, n).round(1)
+    a = gerador.uniform(-2, 2, n).round(1) if com_aceleracao else np.zeros(n)
+    return s0, v, a
+
+
+@memoizar(CACHE_CALCULOS)
+def tabela_encontros(s0, v, a, t_max):
+    # Todos os pares de uma vez (fisica.encontro.encontros), em ordem de tempo
+    return encontro.encontros(s0, v, a, t_max)
+
+
+tempos_validos = calcular_encontros(s0_1, v_1, a_1, s0_2, v_2, a_2)
+
+# Móveis extras (tráfego): posições ao longo do tempo com forma (n_extras, num)
+s0_extras, v_extras, a_extras = moveis_extras(n_extras, semente, extras_muv)
+
+
+def posicoes_extras(t):
+    return muv.posicao(s0_extras[:, None], v_extras[:, None], a_extras[:, None], t)
 
 # --- Componentes principais da UI com colunas ---
 col_grafico, col_valores = st.columns([3, 1])
@@ -74,48 +139,57 @@ with col_valores:
 resultado_container = st.empty()
 
 # Botão para iniciar a animação
-if st.button('Iniciar Animação'):
-    
-    # Prepara o gráfico
-    fig, ax = plt.subplots(figsize=(10, 6))
+iniciar = st.button('Iniciar Animação')
+
+# A animação quadro a quadro fica na sessão (reproducao.py) e continua depois das reexecuções
+parametros = (s0_1, v_1, a_1, s0_2, v_2, a_2, t_max, n_extras, semente, extras_muv)
+reproducao = reproducao_atual('encontro', parametros)
+
+if iniciar and modo_animacao == 'Navegador':
+    # Envia as posições uma única vez; o navegador anima o gráfico e os contadores
+    tempos, posicoes_1, posicoes_2 = posicoes_moveis(s0_1, v_1, a_1, s0_2, v_2, a_2, t_max, 101)
+    extras = posicoes_extras(tempos)
+    y_min = min(posicoes_1.min(), posicoes_2.min(), extras.min(initial=np.inf))
+    y_max = max(posicoes_1.max(), posicoes_2.max(), extras.max(initial=-np.inf))
+    with col_grafico, grafico_placeholder.container():
+        animacao_navegador(
+            tempos,
+            [serie(tempos, posicoes_1, rotulo='Móvel 1', cor='blue'),
+             serie(tempos, posicoes_2, rotulo='Móvel 2', cor='red', tracejada=True)]
+            + [serie(tempos, posicoes, cor='gray', alpha=0.4, espessura=1) for posicoes in extras],
+            xlim=(0, t_max), ylim=(y_min - 5, y_max + 5),
+            titulo='Trajetória dos Móveis ao Longo do Tempo', xlabel='Tempo (s)', ylabel='Posição (m)',
+            metricas=[metrica('Posição Móvel 1 (m)', posicoes_1), metrica('Posição Móvel 2 (m)', posicoes_2),
+                      metrica('Tempo (s)', tempos)],
+            intervalo=velocidade_animacao, altura=500,
+        )
+
+elif iniciar:
     
-    progress_bar = st.progress(0)
     num_steps = 100
     
     # Pre-calcula os limites do gráfico
-    t_completo = np.linspace(0, t_max, num_steps + 1)
-    pos_completo_1 = s0_1 + v_1 * t_completo + 0.5 * a_1 * t_completo**2
-    pos_completo_2 = s0_2 + v_2 * t_completo + 0.5 * a_2 * t_completo**2
-    y_min = min(pos_completo_1.min(), pos_completo_2.min())
-    y_max = max(pos_completo_1.max(), pos_completo_2.max())
-
-    # Loop de animação
-    for i in range(num_steps + 1):
-        t_atual = t_max * i / num_steps
-        
-        # Calcula a posição atual de cada móvel
-        pos_atual_1 = s0_1 + v_1 * t_atual + 0.5 * a_1 * t_atual**2
-        pos_atual_2 = s0_2 + v_2 * t_atual + 0.5 * a_2 * t_atual**2
-        
-        # Atualiza a barra de progresso
-        progress_bar.progress(i / num_steps)
-        
-        # Redesenha o gráfico a cada passo
-        ax.cla()
-        
-        # Plota a porção da trajetória percorrida
-        tempos_percorridos = np.linspace(0, t_atual, max(2, int(i*0.5)))
-        pos_percorrida_1 = s0_1 + v_1 * tempos_percorridos + 0.5 * a_1 * tempos_percorridos**2
-        pos_percorrida_2 = s0_2 + v_2 * tempos_percorridos + 0.5 * a_2 * tempos_percorridos**2
+    t_completo, pos_completo_1, pos_completo_2 = posicoes_moveis(s0_1, v_1, a_1, s0_2, v_2, a_2, t_max, num_steps + 1)
+    extras = posicoes_extras(t_completo)
+    n_quadros = len(t_completo)
+    y_min = min(pos_completo_1.min(), pos_completo_2.min(), extras.min(initial=np.inf))
+    y_max = max(pos_completo_1.max(), pos_completo_2.max(), extras.max(initial=-np.inf))
 
-        ax.plot(tempos_percorridos, pos_percorrida_1, label='Móvel 1', color='blue', linewidth=2)
-        ax.plot(tempos_percorridos, pos_percorrida_2, label='Móvel 2', color='red', linestyle='--', linewidth=2)
-        
-        # Plota as posições atuais
-        ax.plot(t_atual, pos_atual_1, 'o', color='blue', markersize=10)
-        ax.plot(t_atual, pos_atual_2, 'o', color='red', markersize=10)
+    dpi = imagem_quadros.dpi((10, 6))
 
-        # Ajusta os limites e eixos
+    def montar_cena():
+        # Prepara o gráfico uma única vez por cena: limites, eixos, legenda e grade
+        cena = CenaAnimada(figsize=(10, 6), dpi=dpi)
+        ax = cena.ax
+        trilha_1 = cena.linha(label='Móvel 1', color='blue', linewidth=2)
+        trilha_2 = cena.linha(label='Móvel 2', color='red', linestyle='--', linewidth=2)
+        ponto_1 = cena.linha('o', color='blue', markersize=10)
+        ponto_2 = cena.linha('o', color='red', markersize=10)
+        if n_extras:
+            # Trajetórias completas dos móveis extras no fundo (desenhadas uma vez) e
+            # as posições atuais de todos eles em um único artista móvel
+            ax.plot(t_completo, extras.T, color='gray', alpha=0.15, linewidth=0.8)
+            pontos_extras = cena.linha('o', color='gray', markersize=4, linestyle='none')
         ax.set_xlim(0, t_max)
         ax.set_ylim(y_min - 5, y_max + 5)
         ax.set_title('Trajetória dos Móveis ao Longo do Tempo')
@@ -124,25 +198,104 @@ if st.button('Iniciar Animação'):
         ax.legend()
         ax.grid(True)
 
-        # Atualiza o gráfico e as métricas nas colunas
+        # Trajetórias inteiras calculadas uma vez, com os pontos que aparecem no gráfico (amostragem.py).
+        # A cada quadro as trilhas só avançam no buffer.
+        escala = escala_eixos(ax)
+
+        def trilha_incremental(linha, s0, v, a):
+            tempos = amostrar_adaptativo(lambda t: (t, muv.posicao(s0, v, a, t)), 0, t_max, escala)
+            return TrilhaIncremental(linha, tempos, tempos, muv.posicao(s0, v, a, tempos))
+
+        trilha_incremental_1 = trilha_incremental(trilha_1, s0_1, v_1, a_1)
+        trilha_incremental_2 = trilha_incremental(trilha_2, s0_2, v_2, a_2)
+
+        def desenhar_quadro(i):
+            t_atual = t_completo[i]
+        
+            # Calcula a posição atual de cada móvel
+            pos_atual_1 = pos_completo_1[i]
+            pos_atual_2 = pos_completo_2[i]
+        
+            # Plota a porção da trajetória percorrida
+            trilha_incremental_1.mostrar(t_atual, t_atual, pos_atual_1)
+            trilha_incremental_2.mostrar(t_atual, t_atual, pos_atual_2)
+        
+            # Plota as posições atuais
+            ponto_1.set_data([t_atual], [pos_atual_1])
+            ponto_2.set_data([t_atual], [pos_atual_2])
+            if n_extras:
+                pontos_extras.set_data(np.full(n_extras, t_atual), extras[:, i])
+            return t_atual, pos_atual_1, pos_atual_2
+
+        return cena, desenhar_quadro
+
+    cena, desenhar_quadro = montar_cena()
+
+    def metricas(t_atual, pos_atual_1, pos_atual_2):
+        return [("Posição Móvel 1 (m)", f"{pos_atual_1:.2f}"), ("Posição Móvel 2 (m)", f"{pos_atual_2:.2f}"),
+                ("Tempo (s)", f"{t_atual:.2f}")]
+
+    # Quadros e vídeos ficam no armazém em disco, compartilhados entre as sessões (cache_disco.py)
+    opcoes_figura = dict(figsize=(10, 6), dpi=dpi, num_steps=num_steps)
+
+    if modo_animacao == 'Vídeo único':
+        # Codifica todos os quadros uma vez e envia um único arquivo ao navegador
+        chave_video = ARMAZEM.chave('encontro', parametros,
+                                    dict(opcoes_figura, formato=formato_video, intervalo=velocidade_animacao))
+        with st.spinner('Gerando a animação...'):
+            video = ARMAZEM.obter_ou_gerar(chave_video, lambda: cena.exportar(
+                desenhar_quadro, n_quadros, 1 / velocidade_animacao, formato_video))
         with col_grafico:
-            grafico_placeholder.pyplot(fig)
-        with col_valores:
-            pos_1_metric.metric(label="Posição Móvel 1 (m)", value=f"{pos_atual_1:.2f}")
-            pos_2_metric.metric(label="Posição Móvel 2 (m)", value=f"{pos_atual_2:.2f}")
-            tempo_metric.metric(label="Tempo (s)", value=f"{t_atual:.2f}")
-           
-        # Controla a velocidade da animação
-        time.sleep(velocidade_animacao)
-
-    # Exibe os resultados finais após a animação
+            exibir_animacao(grafico_placeholder, video, formato_video)
+        for placeholder, (rotulo, valor) in zip([pos_1_metric, pos_2_metric, tempo_metric],
+                                                metricas(t_max, pos_completo_1[-1], pos_completo_2[-1])):
+            placeholder.metric(label=rotulo, value=valor)
+    else:
+        # Gráfico e métricas de um quadro; quem chama é a renderização antecipada da reprodução,
+        # que monta uma cena igual para cada thread (renderizacao.py)
+        def quadro_da_cena(cena, desenhar_quadro):
+            def quadro(i):
+                valores = metricas(*desenhar_quadro(i))
+                chave_quadro = ARMAZEM.chave('encontro', parametros,
+                                             dict(opcoes_figura, quadro=i, imagem=imagem_quadros.opcoes()))
+                return cena.quadro_codificado(imagem_quadros, ARMAZEM, chave_quadro), valores
+            return quadro
+
+        reproducao = iniciar_reproducao('encontro', quadro_da_cena(cena, desenhar_quadro), n_quadros, parametros,
+                                        montar=lambda: quadro_da_cena(*montar_cena()))
+
+reproduzindo = reproducao is not None and modo_animacao == 'Quadro a quadro'
+if reproduzindo:
+    reproducao.exibir(velocidade_animacao, grafico_placeholder, [pos_1_metric, pos_2_metric, tempo_metric])
+
+# Exibe os resultados finais da animação (também nas reexecuções da reprodução)
+if iniciar or reproduzindo:
     if tempos_validos:
         with resultado_container.container():
             st.subheader('Resultados Finais do Encontro:')
             for t_encontro in tempos_validos:
-                pos_encontro = s0_1 + v_1 * t_encontro + 0.5 * a_1 * t_encontro**2
+                pos_encontro = muv.posicao(s0_1, v_1, a_1, t_encontro)
                 st.success(f'Encontro em **t = {t_encontro:.2f} s** na posição **S = {pos_encontro:.2f} m**')
     else:
         st.info('Os móveis não se encontram no intervalo de tempo selecionado.')
 
-    st.success('Animação concluída!')
+    if n_extras:
+        # Tabela de todos os encontros entre todos os móveis (1 e 2 são os da barra lateral)
+        eventos = tabela_encontros((s0_1, s0_2, *s0_extras), (v_1, v_2, *v_extras), (a_1, a_2, *a_extras), t_max)
+        st.subheader(f'Encontros entre os {n_extras + 2} móveis: {len(eventos["t"])}')
+        limite = 2000
+        st.dataframe({
+            't (s)': eventos['t'][:limite].round(3),
+            'Posição (m)': eventos['posicao'][:limite].round(2),
+            'Móvel': eventos['movel_1'][:limite] + 1,
+            'Com o móvel': eventos['movel_2'][:limite] + 1,
+        }, hide_index=True)
+        if len(eventos['t']) > limite:
+            st.caption(f'Mostrando os {limite} primeiros encontros.')
+
+    if iniciar and modo_animacao == 'Vídeo único':
+        st.success('Animação concluída!')
+
+# Painel de desempenho (com ?debug=1 na URL) e fim da medição desta execução
+painel_desempenho()
+terminar_execucao()
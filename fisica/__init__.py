@@ -0,0 +1,6 @@
+"""
+Núcleo de física dos simuladores, sem Streamlit nem Matplotlib.
+
+As funções recebem e devolvem arrays do NumPy, para que possam ser usadas
+tanto pelas páginas web quanto em estudos de parâmetros e scripts de correção.
+"""
@@ -0,0 +1,191 @@
+"""
+Problema inverso do lançamento: que ângulo ou que velocidade acertam um alvo.
+
+O alvo é um ponto (x_alvo, y_alvo), com x_alvo > 0, a partir do ponto de
+lançamento (0, h0). Como em fisica.projetil.calcular_trajetoria_lote(), todos
+os parâmetros aceitam arrays (com broadcasting): um lote de alvos é
+resolvido em uma única chamada, por exemplo para o gabarito de uma lista
+de exercícios.
+
+Sem resistência do ar as respostas vêm de fórmulas fechadas: a trajetória
+y = h0 + x tg θ - g x² / (2 v0² cos² θ) é uma equação do 2º grau em tg θ
+(dois ângulos: arco baixo e arco alto) e do 1º grau em 1/v0². Com
+resistência do ar (modelo "linear" ou "quadratico", ver fisica.arrasto), as
+mesmas perguntas são respondidas por busca de raízes vetorizada
+(fisica.eventos.refinar) sobre lotes de trajetórias integradas.
+"""
+import numpy as np
+
+from fisica.arrasto import calcular_trajetoria_arrasto
+from fisica.eventos import raizes_quadratica, refinar
+
+# Com resistência do ar: ângulos da busca inicial do ângulo de máximo e erro aceito
+# na altura do alvo (m), bem abaixo da precisão da integração
+ANGULOS_BUSCA = 32
+TOLERANCIA = 1e-7
+
+
+def _parametros(*parametros):
+    return np.broadcast_arrays(*(np.asarray(p, dtype=float) for p in parametros))
+
+
+def _tolerancia(x_alvo, y_alvo):
+    return TOLERANCIA * (1 + np.abs(x_alvo) + np.abs(y_alvo))
+
+
+# --- Sem resistência do ar (fórmulas fechadas) ---
+def envelope(x, v0, g, h0=0.0):
+    """
+    Altura máxima alcançável a uma distância x com velocidade v0, em qualquer
+    ângulo (a "parábola de segurança"): y = h0 + v0²/(2g) - g x²/(2 v0²).
+    """
+    x, v0, g, h0 = _parametros(x, v0, g, h0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return h0 + v0**2 / (2 * g) - g * x**2 / (2 * v0**2)
+
+
+def velocidade_minima(x_alvo, y_alvo, g, h0=0.0):
+    """
+    Menor velocidade que alcança o alvo e o ângulo correspondente (em radianos):
+    v² = g (Δy + √(x² + Δy²)), com o alvo exatamente sobre a parábola de segurança.
+    """
+    x, y, g, h0 = _parametros(x_alvo, y_alvo, g, h0)
+    dy = y - h0
+    distancia = np.hypot(x, dy)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        v_min = np.sqrt(g * (dy + distancia))
+        angulo = np.arctan2(dy + distancia, x)
+    return v_min, angulo
+
+
+def _angulos_analiticos(x, y, v0, g, h0):
+    # tg θ = u:  A u² + B u + C = 0, com A = g x²/(2 v0²), B = -x, C = A + Δy
+    A = g * x**2 / (2 * v0**2)
+    raizes = raizes_quadratica(A, -x, A + (y - h0))
+    baixo, alto = raizes[..., 0], raizes[..., 1]
+    # Raiz dupla: o alvo está sobre o envelope e os dois arcos coincidem
+    alto = np.where(np.isnan(alto), baixo, alto)
+    return np.arctan(baixo), np.arctan(alto)
+
+
+def _velocidade_analitica(x, y, ang, g, h0):
+    # v0² = g x² / (2 cos² θ (x tg θ - Δy)); só há solução se o alvo está abaixo da reta de lançamento
+    with np.errstate(divide="ignore", invalid="ignore"):
+        denominador = 2 * np.cos(ang)**2 * (x * np.tan(ang) - (y - h0))
+        v0 = np.sqrt(g * x**2 / denominador)
+    return np.where(denominador > 0, v0, np.nan)
+
+
+# --- Com resistência do ar (busca de raízes sobre trajetórias integradas) ---
+def _altura_no_alvo(v0, ang, g, h0, x_alvo, y_alvo, k, massa, modelo):
+    """
+    Diferença entre a altura da trajetória na distância x_alvo e y_alvo, e o
+    instante em que o projétil passa por x_alvo.
+
+    A integração para quando o projétil desce abaixo de y_alvo. Se isso
+    acontece antes de x_alvo, a diferença é a distância que faltou (negativa),
+    que vale zero no mesmo ponto que a diferença de alturas: a função continua
+    contínua para a busca de raízes.
+    """
+    r = calcular_trajetoria_arrasto(v0, ang, g, h0, y_alvo, k, massa, modelo, num=0, distancia=x_alvo)
+    alcancou = ~np.isnan(r["t_distancia"])
+    diferenca = np.where(alcancou, r["y_distancia"] - y_alvo, r["alcance"] - x_alvo)
+    # Alvo acertado exatamente no fim do movimento: o evento da distância pode ficar para depois
+    no_fim = ~alcancou & (np.abs(r["alcance"] - x_alvo) <= _tolerancia(x_alvo, y_alvo))
+    return diferenca, np.where(no_fim, r["t_voo"], r["t_distancia"])
+
+
+def _maximo(funcao, a, b, tol=1e-5):
+    """Ponto de máximo de uma função unimodal em [a, b] (razão áurea, vetorizado)."""
+    razao = (np.sqrt(5) - 1) / 2
+    c, d = b - razao * (b - a), a + razao * (b - a)
+    fc, fd = funcao(c), funcao(d)
+    while np.any(b - a > tol):
+        esquerda = fc >= fd
+        a, b = np.where(esquerda, a, c), np.where(esquerda, d, b)
+        c, d = np.where(esquerda, b - razao * (b - a), d), np.where(esquerda, c, a + razao * (b - a))
+        novo = funcao(np.where(esquerda, c, d))
+        fc, fd = np.where(esquerda, novo, fd), np.where(esquerda, fc, novo)
+    return 0.5 * (a + b)
+
+
+def _angulos_arrasto(x, y, v0, g, h0, k, massa, modelo):
+    # f(θ) (altura na distância do alvo menos a do alvo) cresce até o ângulo que passa mais
+    # alto por x_alvo e depois cai; a -90° e a 90° o projétil não avança, e f < 0.
+    # O máximo é localizado em uma grade e refinado; cada arco fica entre ele e o
+    # ponto da grade mais próximo com f < 0, e os dois arcos são refinados juntos.
+    funcao = lambda ang: _altura_no_alvo(v0, ang, g, h0, x, y, k, massa, modelo)[0]
+    grade = np.linspace(-np.pi / 2, np.pi / 2, ANGULOS_BUSCA + 1)
+    f = _altura_no_alvo(v0[..., None], grade, g[..., None], h0[..., None], x[..., None], y[..., None],
+                        k[..., None], massa[..., None], modelo)[0]
+    i = np.argmax(np.nan_to_num(f, nan=-np.inf), axis=-1)
+    melhor = _maximo(funcao, grade[np.maximum(i - 1, 0)], grade[np.minimum(i + 1, ANGULOS_BUSCA)])
+
+    indices = np.arange(ANGULOS_BUSCA + 1)
+    negativo = ~(f >= 0)
+    antes = np.max(np.where(negativo & (indices <= i[..., None]), indices, 0), axis=-1)
+    depois = np.min(np.where(negativo & (indices >= i[..., None]), indices, ANGULOS_BUSCA), axis=-1)
+    arcos = refinar(funcao, np.stack([grade[antes], melhor]), np.stack([melhor, grade[depois]]),
+                    tol=1e-9, tol_f=_tolerancia(x, y))
+    return np.where(funcao(melhor) >= 0, arcos, np.nan)
+
+
+def _velocidade_arrasto(x, y, ang, g, h0, k, massa, modelo, expansoes=30):
+    # f(v0) cresce com a velocidade: o intervalo vai de quase zero até a velocidade
+    # sem arrasto, dobrada até o projétil passar acima do alvo
+    funcao = lambda v0: _altura_no_alvo(v0, ang, g, h0, x, y, k, massa, modelo)[0]
+    possivel = x * np.tan(ang) > (y - h0)
+    v_max = _velocidade_analitica(x, y, ang, g, h0)
+    v_max = np.where(np.isfinite(v_max), v_max, 1.0)
+    f_max = funcao(v_max)
+    for _ in range(expansoes):
+        expandir = possivel & (f_max < 0)
+        if not expandir.any():
+            break
+        v_max = np.where(expandir, 2 * v_max, v_max)
+        f_max = np.where(expandir, funcao(v_max), f_max)
+    v0 = refinar(funcao, np.full(x.shape, 1e-6), v_max, tol=1e-9, tol_f=_tolerancia(x, y))
+    return np.where(possivel & (f_max >= 0), v0, np.nan)
+
+
+# --- Interface ---
+def angulos_para_alvo(x_alvo, y_alvo, v0, g, h0=0.0, k=0.0, massa=1.0, modelo=None):
+    """
+    Os dois ângulos de lançamento (em radianos) que acertam o alvo com velocidade v0.
+
+    Devolve um dicionário com angulo_baixo e angulo_alto (arcos baixo e alto;
+    iguais quando o alvo está sobre o envelope, NaN quando está fora dele) e
+    os instantes t_baixo e t_alto em que cada arco passa pelo alvo.
+    modelo=None resolve sem resistência do ar.
+    """
+    x, y, v0, g, h0, k, massa = _parametros(x_alvo, y_alvo, v0, g, h0, k, massa)
+    if modelo is None:
+        baixo, alto = _angulos_analiticos(x, y, v0, g, h0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t_baixo, t_alto = x / (v0 * np.cos(baixo)), x / (v0 * np.cos(alto))
+    else:
+        arcos = _angulos_arrasto(x, y, v0, g, h0, k, massa, modelo)
+        baixo, alto = arcos
+        t_baixo, t_alto = _altura_no_alvo(v0, np.nan_to_num(arcos), g, h0, x, y, k, massa, modelo)[1]
+    return dict(angulo_baixo=baixo, angulo_alto=alto,
+                t_baixo=np.where(np.isnan(baixo), np.nan, t_baixo),
+                t_alto=np.where(np.isnan(alto), np.nan, t_alto))
+
+
+def velocidade_para_alvo(x_alvo, y_alvo, ang, g, h0=0.0, k=0.0, massa=1.0, modelo=None):
+    """
+    Velocidade de lançamento que acerta o alvo com o ângulo ang (em radianos).
+
+    Devolve um dicionário com v0 e o instante t em que o projétil passa pelo
+    alvo (NaN quando o alvo está acima da reta de lançamento, inalcançável
+    com qualquer velocidade). modelo=None resolve sem resistência do ar.
+    """
+    x, y, ang, g, h0, k, massa = _parametros(x_alvo, y_alvo, ang, g, h0, k, massa)
+    if modelo is None:
+        v0 = _velocidade_analitica(x, y, ang, g, h0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = x / (v0 * np.cos(ang))
+    else:
+        v0 = _velocidade_arrasto(x, y, ang, g, h0, k, massa, modelo)
+        t = _altura_no_alvo(np.where(np.isnan(v0), 1.0, v0), ang, g, h0, x, y, k, massa, modelo)[1]
+    return dict(v0=v0, t=np.where(np.isnan(v0), np.nan, t))
@@ -0,0 +1,246 @@
+"""
+Lançamento de projéteis com resistência do ar.
+
+A força de arrasto pode ser linear (F = k v, regime de Stokes) ou quadrática
+(F = k v², regime turbulento). O movimento é integrado com o método de
+Dormand-Prince (RK45) de passo adaptativo, com detecção de eventos para o
+ponto mais alto e para a chegada à altura de impacto: cada passo aceito é
+interpolado pela cúbica de Hermite e o cruzamento é refinado pelo motor de
+eventos (fisica.eventos). Todos os lançamentos de um lote são integrados
+juntos, cada um com o seu próprio passo.
+"""
+import numpy as np
+
+from fisica.eventos import cruzamento_hermite, hermite, interpolador_hermite
+from fisica.projetil import GRAVIDADE_INVALIDA, IMPACTO_INALCANCAVEL, OK
+
+DENSIDADE_AR = 1.225          # kg/m³, ao nível do mar
+VISCOSIDADE_AR = 1.81e-5      # Pa·s, a 15 °C
+
+MODELOS = ("linear", "quadratico")
+
+# --- Coeficientes de Dormand-Prince 5(4) ---
+_A = [
+    [],
+    [1 / 5],
+    [3 / 40, 9 / 40],
+    [44 / 45, -56 / 15, 32 / 9],
+    [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729],
+    [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656],
+    [35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84],
+]
+# Diferença entre as soluções de 5ª e 4ª ordem (estimativa do erro)
+_E = [71 / 57600, 0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40]
+
+
+def coeficiente_quadratico(coef_arrasto, area, densidade=DENSIDADE_AR):
+    """k da força quadrática F = k v², com k = ½ ρ C_d A."""
+    return 0.5 * densidade * coef_arrasto * area
+
+
+def coeficiente_linear(area, viscosidade=VISCOSIDADE_AR):
+    """k da força linear F = k v (lei de Stokes, 6πηr, para uma esfera de seção transversal A)."""
+    raio = np.sqrt(np.asarray(area, dtype=float) / np.pi)
+    return 6 * np.pi * viscosidade * raio
+
+
+def _derivadas(estado, g, k_m, quadratico):
+    """Derivadas de (x, y, vx, vy): velocidades e acelerações (gravidade + arrasto)."""
+    vx, vy = estado[2], estado[3]
+    fator = k_m * np.hypot(vx, vy) if quadratico else k_m
+    return np.stack([vx, vy, -fator * vx, -g - fator * vy])
+
+
+def _estado_em(s, h, y0, f0, y1, f1):
+    """Estado (x, y, vx, vy) interpolado dentro do passo."""
+    return np.stack([hermite(s, h, y0[i], f0[i], y1[i], f1[i]) for i in range(4)])
+
+
+def calcular_trajetoria_arrasto(v0, ang, g, h0, h_impacto, k, massa, modelo="quadratico",
+                                num=200, distancia=None, rtol=1e-6, atol=1e-9, max_iteracoes=100000):
+    """
+    Integra vários lançamentos com resistência do ar de uma vez.
+
+    k é o coeficiente de arrasto (ver coeficiente_linear() e coeficiente_quadratico())
+    e massa a massa do projétil em kg; os demais parâmetros são os de
+    fisica.projetil.calcular_trajetoria_lote(), com o mesmo broadcasting.
+
+    Devolve os mesmos resultados e códigos de situação da versão analítica e,
+    se num > 0, também os arrays t, x, y, vx e vy com num amostras por
+    lançamento (forma (..., num)), de 0 até o impacto. Com uma distância
+    horizontal (distancia, também com broadcasting), devolve ainda t_distancia
+    e y_distancia: o instante e a altura em que o projétil passa por ela (NaN
+    se o movimento termina antes).
+    """
+    if modelo not in MODELOS:
+        raise ValueError(f"Modelo de arrasto desconhecido: {modelo}")
+    quadratico = modelo == "quadratico"
+
+    distancia = np.nan if distancia is None else distancia
+    parametros = np.broadcast_arrays(*(np.asarray(p, dtype=float)
+                                       for p in (v0, ang, g, h0, h_impacto, k, massa, distancia)))
+    forma = parametros[0].shape
+    v0, ang, g, h0, h_impacto, k, massa, distancia = (p.ravel() for p in parametros)
+    n = v0.size
+
+    k_m = k / massa
+    estado = np.stack([np.zeros(n), h0.copy(), v0 * np.cos(ang), v0 * np.sin(ang)])
+    derivada = _derivadas(estado, g, k_m, quadratico)
+    t = np.zeros(n)
+
+    situacao = np.full(n, OK, dtype=np.int8)
+    situacao[g <= 0] = GRAVIDADE_INVALIDA
+
+    # Eventos: ponto mais alto e impacto (NaN enquanto não ocorrem)
+    t_apice = np.full(n, np.nan)
+    y_apice = np.full(n, np.nan)
+    t_fim = np.full(n, np.nan)
+    estado_fim = np.full((4, n), np.nan)
+
+    # Passagem pela distância horizontal pedida (já na partida, se ela não for positiva)
+    t_distancia = np.where(distancia <= 0, 0.0, np.nan)
+    y_distancia = np.where(distancia <= 0, h0, np.nan)
+
+    # Lançamento horizontal ou para baixo: o ponto mais alto é o de partida
+    descendo = estado[3] <= 0
+    t_apice[descendo] = 0.0
+    y_apice[descendo] = h0[descendo]
+    abaixo = descendo & (h0 <= h_impacto)
+    situacao[abaixo & (h0 < h_impacto) & (situacao == OK)] = IMPACTO_INALCANCAVEL
+    t_fim[abaixo] = 0.0
+    estado_fim[:, abaixo] = estado[:, abaixo]
+
+    ativo = (situacao != GRAVIDADE_INVALIDA) & ~abaixo
+
+    # Passo inicial proporcional à escala de tempo do voo sem arrasto
+    with np.errstate(divide="ignore", invalid="ignore"):
+        escala = np.abs(v0) / g + np.sqrt(2 * (np.abs(h0) + np.abs(h_impacto) + 1) / g)
+    passo = np.where(ativo, 1e-3 * escala, 0.0)
+
+    # Histórico dos passos aceitos, para as amostras da trajetória (só se forem pedidas)
+    historico = [(t.copy(), estado.copy(), derivada.copy(), np.ones(n, dtype=bool))] if num else None
+
+    for _ in range(max_iteracoes):
+        if not ativo.any():
+            break
+        h = passo
+
+        # --- Estágios do Runge-Kutta ---
+        estagios = [derivada]
+        for linha in _A[1:]:
+            incremento = sum(a * kk for a, kk in zip(linha, estagios) if a)
+            estagios.append(_derivadas(estado + h * incremento, g, k_m, quadratico))
+        novo = estado + h * sum(a * kk for a, kk in zip(_A[6], estagios) if a)
+        nova_derivada = estagios[6]
+
+        erro_abs = h * sum(e * kk for e, kk in zip(_E, estagios) if e)
+        tolerancia = atol + rtol * np.maximum(np.abs(estado), np.abs(novo))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            erro = np.sqrt(np.mean((erro_abs / tolerancia) ** 2, axis=0))
+            fator = np.clip(0.9 * erro ** -0.2, 0.2, 5.0)
+        fator = np.where(np.isfinite(fator), fator, 5.0)
+        aceito = ativo & (erro <= 1.0)
+
+        # --- Detecção de eventos no passo aceito ---
+        y0, vy0, y1, vy1 = estado[1], estado[3], novo[1], novo[3]
+        ay0, ay1 = derivada[3], nova_derivada[3]
+        inicio_busca = np.zeros(n)
+        s_fim = np.ones(n)
+
+        apice = aceito & np.isnan(t_apice) & (vy1 <= 0)
+        fim_no_apice = np.zeros(n, dtype=bool)
+        if apice.any():
+            s = cruzamento_hermite(h, vy0, ay0, vy1, ay1, 0.0)
+            y_s = hermite(s, h, y0, vy0, y1, vy1)
+            t_apice = np.where(apice, t + s * h, t_apice)
+            y_apice = np.where(apice, y_s, y_apice)
+            inicio_busca = np.where(apice, s, inicio_busca)
+
+            # Impacto inalcançável: o movimento termina no ponto mais alto
+            fim_no_apice = apice & (y_s < h_impacto)
+            s_fim = np.where(fim_no_apice, s, s_fim)
+            if fim_no_apice.any():
+                situacao[fim_no_apice] = IMPACTO_INALCANCAVEL
+                t_fim[fim_no_apice] = t_apice[fim_no_apice]
+                fim = _estado_em(s, h, estado, derivada, novo, nova_derivada)
+                estado_fim[:, fim_no_apice] = fim[:, fim_no_apice]
+
+        # Impacto: a altura desce até h_impacto (depois do ponto mais alto)
+        y_inicio = np.where(apice, y_apice, y0)
+        impacto = aceito & ~fim_no_apice & ~np.isnan(t_apice) & (y_inicio >= h_impacto) & (y1 < h_impacto)
+        if impacto.any():
+            s = cruzamento_hermite(h, y0, vy0, y1, vy1, h_impacto, s_min=inicio_busca)
+            s_fim = np.where(impacto, s, s_fim)
+            fim = _estado_em(s, h, estado, derivada, novo, nova_derivada)
+            t_fim[impacto] = (t + s * h)[impacto]
+            estado_fim[:, impacto] = fim[:, impacto]
+            estado_fim[1, impacto] = h_impacto[impacto]
+
+        # Distância horizontal: x cruza o valor pedido antes do fim do movimento
+        passagem = aceito & np.isnan(t_distancia) & (estado[0] < distancia) & (novo[0] >= distancia)
+        if passagem.any():
+            s = cruzamento_hermite(h, estado[0], derivada[0], novo[0], nova_derivada[0], distancia)
+            passagem &= s <= s_fim
+            t_distancia = np.where(passagem, t + s * h, t_distancia)
+            y_distancia = np.where(passagem, hermite(s, h, y0, vy0, y1, vy1), y_distancia)
+
+        # --- Avança os lançamentos cujo passo foi aceito ---
+        t = np.where(aceito, t + h, t)
+        estado = np.where(aceito, novo, estado)
+        derivada = np.where(aceito, nova_derivada, derivada)
+        if num:
+            historico.append((t.copy(), estado.copy(), derivada.copy(), aceito.copy()))
+
+        ativo &= ~(fim_no_apice | impacto)
+        passo = np.where(ativo, h * fator, 0.0)
+    else:
+        raise RuntimeError("A integração com resistência do ar não convergiu.")
+
+    # --- Resultados, no mesmo formato da versão analítica ---
+    erro = situacao == GRAVIDADE_INVALIDA
+    resultados = dict(
+        alcance=np.where(erro, 0.0, estado_fim[0]),
+        altura_max=np.where(erro, 0.0, y_apice),
+        t_altura_max=np.where(erro, 0.0, t_apice),
+        t_voo=np.where(erro, 0.0, t_fim),
+        velocidade_final=np.where(erro | (situacao == IMPACTO_INALCANCAVEL), 0.0,
+                                  np.hypot(estado_fim[2], estado_fim[3])),
+    )
+    resultados = {nome: valores.reshape(forma) for nome, valores in resultados.items()}
+    resultados["situacao"] = situacao.reshape(forma)
+    if not np.isnan(distancia).all():
+        resultados["t_distancia"] = t_distancia.reshape(forma)
+        resultados["y_distancia"] = y_distancia.reshape(forma)
+
+    if num:
+        amostras = _amostrar(historico, resultados["t_voo"].ravel(), estado_fim, situacao, num)
+        for nome, valores in zip(("t", "x", "y", "vx", "vy"), amostras):
+            resultados[nome] = valores.reshape(forma + (num,))
+    return resultados
+
+
+def _amostrar(historico, t_final, estado_fim, situacao, num):
+    """Amostras igualmente espaçadas no tempo, interpoladas entre os passos aceitos."""
+    tempos = np.stack([h[0] for h in historico])
+    estados = np.stack([h[1] for h in historico], axis=1)
+    derivadas = np.stack([h[2] for h in historico], axis=1)
+    aceitos = np.stack([h[3] for h in historico])
+
+    n = t_final.size
+    saida = np.zeros((5, n, num))
+    for j in range(n):
+        grade = np.linspace(0, t_final[j], num)
+        saida[0, j] = grade
+        passos = aceitos[:, j]
+        ts = tempos[passos, j]
+        if situacao[j] == GRAVIDADE_INVALIDA or ts.size < 2:
+            saida[1:, j] = estados[:, 0, j, None]
+            continue
+
+        ys, fs = estados[:, passos, j], derivadas[:, passos, j]
+        for c in range(4):
+            saida[c + 1, j] = interpolador_hermite(ts, ys[c], fs[c])(grade)
+
+        # O último ponto é exatamente o do evento final
+        saida[1:, j, -1] = estado_fim[:, j]
+    return saida
@@ -0,0 +1,242 @@
+"""
+Sistemas de blocos ligados por um fio, com planos inclinados, polias e atrito.
+
+Os corpos ficam em fila ao longo de um fio ideal (inextensível, sem massa,
+sempre esticado), passando por polias sem atrito: todos andam a mesma
+distância s. Cada corpo se move em linha reta, com a direção de s fazendo o
+ângulo θ com a horizontal:
+
+    θ = 0      bloco em uma mesa, andando para a frente;
+    θ = α      bloco subindo uma rampa de inclinação α;
+    θ = -90°   corpo pendurado, descendo;
+    θ = 90°    corpo pendurado, subindo (a outra ponta de uma máquina de Atwood).
+
+A força aplicada F(t) puxa o primeiro corpo no sentido de s. O atrito tem
+um coeficiente estático (µe, para tirar do repouso) e um cinético (µc,
+durante o deslizamento) em cada corpo.
+
+A integração é de passo fixo (Euler semi-implícito, com a força no meio do
+passo: exato para forças constantes por trechos e de 2ª ordem para as que
+variam com o tempo) e vetorizada sobre os corpos e sobre um lote de
+cenários: os parâmetros dos corpos são arrays (..., n_corpos) e as dimensões
+da frente são os cenários.
+As transições entre repouso e deslizamento e a chegada são eventos,
+localizados dentro do passo pelo motor de eventos (fisica.eventos): dentro
+de um passo a posição é s + v τ + a τ²/2, então a parada (velocidade nula)
+e a chegada à distância saem da fórmula fechada; a partida é o instante em
+que a força que move o sistema passa do atrito estático máximo, refinado
+sobre a própria força aplicada.
+"""
+import numpy as np
+
+from fisica import eventos
+from fisica.dinamica import G
+
+# --- Eventos ---
+PARTIDA = 0    # o sistema sai do repouso
+PARADA = 1     # o sistema para (e fica parado se o atrito estático segurar)
+CHEGADA = 2    # o sistema andou a distância pedida (a simulação do cenário termina)
+
+EVENTOS = {
+    PARTIDA: "começa a deslizar",
+    PARADA: "para",
+    CHEGADA: "chega ao fim do percurso",
+}
+
+# Passo de integração (s) e número de instantes guardados
+PASSO = 0.01
+AMOSTRAS = 300
+
+
+# --- Força aplicada ---
+def forca_variavel(forma, amplitude, duracao=1.0):
+    """
+    Força aplicada em função do tempo:
+      - "constante": amplitude o tempo todo;
+      - "rampa": cresce de 0 até amplitude em duracao segundos e depois fica constante;
+      - "pulso": amplitude até duracao e zero depois.
+
+    A amplitude pode ser um array (um valor por cenário), e t um instante
+    ou um array de instantes, um por cenário.
+    """
+    amplitude = np.asarray(amplitude, dtype=float)
+    if forma == "constante":
+        return amplitude
+    if forma == "rampa":
+        return lambda t: amplitude * np.minimum(t / duracao, 1.0)
+    if forma == "pulso":
+        return lambda t: amplitude * (t < duracao)
+    raise ValueError(f"Forma de força desconhecida: {forma!r}")
+
+
+# --- Simulação ---
+def simular(massas, angulos, mu_estatico, mu_cinetico, forca=0.0, distancia=np.inf, t_max=10.0,
+            passo=PASSO, amostras=AMOSTRAS, g=G):
+    """
+    Integra o sistema a partir do repouso em s = 0 até t_max, ou até |s|
+    chegar à distância.
+
+    massas (kg), angulos (rad), mu_estatico e mu_cinetico: arrays (..., n_corpos),
+    com broadcasting. forca (N): número, array de um valor por cenário ou
+    função do tempo que devolve um deles (veja forca_variavel); a função
+    também recebe arrays de instantes, um por cenário, ao localizar a partida.
+
+    Devolve um dicionário com:
+      - t: os instantes guardados (amostras);
+      - forca: a força aplicada nesses instantes, por cenário;
+      - posicao, velocidade, aceleracao: arrays (amostras, *cenarios);
+      - deslizando: se o sistema estava em movimento em cada instante;
+      - atrito: força de atrito em cada corpo, no sentido de s (amostras, *cenarios, n_corpos);
+      - tracao: tração nos trechos do fio entre corpos vizinhos (amostras, *cenarios, n_corpos - 1);
+      - fio_frouxo: cenários em que alguma tração ficou negativa (o fio afrouxaria
+        e o modelo de fio esticado deixa de valer);
+      - t_chegada: instante da chegada (nan se não chegou);
+      - eventos: arrays t, cenario (índice no lote achatado) e tipo, em ordem de tempo.
+
+    No repouso o atrito estático é dividido entre os corpos na proporção do
+    máximo de cada um.
+    """
+    massas, angulos, mu_estatico, mu_cinetico = np.broadcast_arrays(
+        *(np.asarray(p, dtype=float) for p in (massas, angulos, mu_estatico, mu_cinetico))
+    )
+    if np.any(massas <= 0):
+        raise ValueError("As massas devem ser maiores que zero.")
+    forma = massas.shape[:-1]
+    distancia = np.broadcast_to(np.asarray(distancia, dtype=float), forma)
+    forca_no_tempo = forca if callable(forca) else (lambda t, f=np.asarray(forca, dtype=float): f)
+
+    # Forças que não mudam: peso ao longo de s, atritos máximos e massa total
+    normal = massas * g * np.abs(np.cos(angulos))
+    peso = -(massas * g * np.sin(angulos))
+    estatico_corpo = mu_estatico * normal
+    cinetico_corpo = mu_cinetico * normal
+    peso_total = peso.sum(axis=-1)
+    estatico = estatico_corpo.sum(axis=-1)
+    cinetico = cinetico_corpo.sum(axis=-1)
+    massa_total = massas.sum(axis=-1)
+
+    def forca_motriz(t):
+        return np.broadcast_to(forca_no_tempo(t), forma) + peso_total
+
+    s = np.zeros(forma)
+    v = np.zeros(forma)
+    direcao = np.zeros(forma)                 # sentido do deslizamento (+1 ou -1)
+    parado = np.ones(forma, dtype=bool)
+    ativo = np.ones(forma, dtype=bool)        # ainda não chegou
+    t_chegada = np.full(forma, np.nan)
+    excesso_anterior = np.abs(forca_motriz(0.0)) - estatico
+    ocorrencias = []
+
+    n_passos = int(np.ceil(t_max / passo))
+    salto = max(1, n_passos // (amostras - 1))
+    guardados = dict(t=[], posicao=[], velocidade=[], aceleracao=[], deslizando=[], motriz=[], sentido=[])
+
+    def guardar(t, motriz, aceleracao):
+        guardados["t"].append(t)
+        guardados["posicao"].append(s.copy())
+        guardados["velocidade"].append(v.copy())
+        guardados["aceleracao"].append(aceleracao)
+        guardados["deslizando"].append(~parado)
+        guardados["motriz"].append(motriz)
+        guardados["sentido"].append(direcao)
+
+    for i in range(n_passos):
+        t = i * passo
+        motriz = forca_motriz(t)
+
+        # Partida: a força que move o sistema passa do atrito estático máximo
+        excesso = np.abs(motriz) - estatico
+        partida = parado & ativo & (excesso > 0)
+        if partida.any():
+            # Instante em que o excesso se anula, entre o passo anterior e este; só os
+            # cenários que partem entram na busca (a força é calculada para o lote todo)
+            cruzou = partida & (excesso_anterior < 0)
+            t_partida = np.full(forma, t)
+            if cruzou.any():
+                def excesso_em(tempos):
+                    instantes = np.full(forma, t)
+                    instantes[cruzou] = tempos
+                    return (np.abs(forca_motriz(instantes)) - estatico)[cruzou]
+
+                refinado = eventos.refinar(excesso_em, np.full(cruzou.sum(), t - passo), np.full(cruzou.sum(), t))
+                t_partida[cruzou] = np.where(np.isnan(refinado), t, refinado)
+            ocorrencias.append((t_partida[partida], np.flatnonzero(partida), PARTIDA))
+            direcao = np.where(partida, np.sign(motriz), direcao)
+            parado = parado & ~partida
+        excesso_anterior = excesso
+
+        if i % salto == 0:
+            guardar(t, motriz, np.where(parado, 0.0, (motriz - direcao * cinetico) / massa_total))
+
+        # Aceleração no meio do passo; o sentido do atrito cinético não muda dentro do passo.
+        # Depois da chegada o cenário fica congelado no estado em que chegou.
+        a = np.where(parado, 0.0, (forca_motriz(t + 0.5 * passo) - direcao * cinetico) / massa_total)
+        v_novo = np.where(ativo, v + passo * a, v)
+        s_novo = np.where(ativo, s + passo * 0.5 * (v + v_novo), s)
+
+        # Parada: a velocidade v + a τ se anula dentro do passo
+        parada = ~parado & ativo & (direcao * v_novo <= 0)
+        tau = np.full(forma, passo)
+        if parada.any():
+            tau[parada] = np.clip(eventos.parada(v[parada], a[parada]), 0.0, passo)
+            s_novo = np.where(parada, s + v * tau + 0.5 * a * tau**2, s_novo)
+            v_novo = np.where(parada, 0.0, v_novo)
+            parado = parado | parada
+            ocorrencias.append((t + tau[parada], np.flatnonzero(parada), PARADA))
+
+        # Chegada: |s| alcança a distância antes do fim do passo (ou da parada);
+        # o cenário para de ser integrado
+        chegada = ativo & (np.abs(s_novo) >= distancia)
+        if chegada.any():
+            tau_chegada, alvo, v_chegada = eventos.chegada(s[chegada], v[chegada], a[chegada], distancia[chegada],
+                                                           tau[chegada])
+            # Arredondamento: |s| só alcança a distância no fim do passo
+            sem_raiz = np.isnan(tau_chegada)
+            tau_chegada[sem_raiz] = tau[chegada][sem_raiz]
+            alvo[sem_raiz] = np.sign(s_novo[chegada][sem_raiz]) * distancia[chegada][sem_raiz]
+            v_chegada[sem_raiz] = v_novo[chegada][sem_raiz]
+            s_novo[chegada], v_novo[chegada], t_chegada[chegada] = alvo, v_chegada, t + tau_chegada
+            ativo = ativo & ~chegada
+            ocorrencias.append((t + tau_chegada, np.flatnonzero(chegada), CHEGADA))
+
+        s, v = s_novo, v_novo
+        # Nada mais muda: todos chegaram, ou todos parados com força constante
+        if not ativo.any() or (not callable(forca) and (parado | ~ativo).all()):
+            break
+
+    t = (i + 1) * passo
+    motriz = forca_motriz(t)
+    guardar(t, motriz, np.where(parado, 0.0, (motriz - direcao * cinetico) / massa_total))
+
+    resultado = {chave: np.array(valores) for chave, valores in guardados.items()}
+
+    # Atrito em cada corpo: cinético contra o deslizamento ou estático dividido pelos corpos
+    deslizando = resultado["deslizando"][..., None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        parcela = np.where(estatico[..., None] > 0, estatico_corpo / estatico[..., None], 0.0)
+    sentido = resultado.pop("sentido")[..., None]
+    atrito = np.where(deslizando, -sentido * cinetico_corpo,
+                      -np.clip(resultado.pop("motriz"), -estatico, estatico)[..., None] * parcela)
+
+    # Tração entre os corpos i e i + 1: a força que falta aos corpos até i, além da aplicada
+    aplicada = np.stack([np.broadcast_to(forca_no_tempo(t), forma) for t in resultado["t"]])
+    necessaria = massas * resultado["aceleracao"][..., None] - peso - atrito
+    tracao = np.cumsum(necessaria, axis=-1)[..., :-1] - aplicada[..., None]
+
+    if ocorrencias:
+        t_eventos, cenarios, tipos = zip(*((t_ev, c, np.full(c.size, tipo)) for t_ev, c, tipo in ocorrencias))
+        t_eventos, cenarios, tipos = np.concatenate(t_eventos), np.concatenate(cenarios), np.concatenate(tipos)
+        ordem = np.argsort(t_eventos, kind="stable")
+        tabela = dict(t=t_eventos[ordem], cenario=cenarios[ordem], tipo=tipos[ordem])
+    else:
+        tabela = dict(t=np.zeros(0), cenario=np.zeros(0, dtype=int), tipo=np.zeros(0, dtype=int))
+
+    resultado.update(
+        forca=aplicada,
+        atrito=atrito,
+        tracao=tracao,
+        fio_frouxo=(tracao < -1e-9 * massa_total[..., None] * g).any(axis=(0, -1)),
+        t_chegada=t_chegada,
+        eventos=tabela,
+    )
+    return resultado
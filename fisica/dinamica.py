@@ -0,0 +1,41 @@
+"""
+Dinâmica de um bloco puxado por uma força horizontal, com atrito.
+
+Segunda lei de Newton: F - µc m g = m a. Se a força aplicada não vence o
+atrito estático (F ≤ µe m g), o bloco fica em repouso (a = 0).
+"""
+import numpy as np
+
+G = 9.8   # m/s²
+
+
+def bloco_com_atrito(massa, forca, mu, distancia, g=G, mu_estatico=None):
+    """
+    Forças, aceleração e tempo para o bloco percorrer a distância.
+
+    mu é o atrito cinético e mu_estatico, o estático (None: igual ao
+    cinético), que decide se o bloco sai do repouso. Os parâmetros podem ser
+    arrays (com broadcasting). Devolve um dicionário de arrays: f_atrito
+    (cinético), f_resultante, aceleracao e t_total (zero quando o bloco não
+    se move).
+    """
+    if mu_estatico is None:
+        mu_estatico = mu
+    massa, forca, mu, mu_estatico, distancia = np.broadcast_arrays(
+        *(np.asarray(p, dtype=float) for p in (massa, forca, mu, mu_estatico, distancia))
+    )
+    f_atrito = mu * massa * g
+    f_resultante = forca - f_atrito
+    move = (forca > mu_estatico * massa * g) & (f_resultante > 0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        aceleracao = np.where(move, f_resultante / massa, 0.0)
+        t_total = np.where(move, np.sqrt(2 * distancia / aceleracao), 0.0)
+
+    return dict(f_atrito=f_atrito, f_resultante=f_resultante, aceleracao=aceleracao, t_total=t_total)
+
+
+def estado_bloco(aceleracao, t):
+    """Posição e velocidade do bloco (partindo do repouso na origem) nos instantes t."""
+    t = np.asarray(t, dtype=float)
+    return 0.5 * aceleracao * t**2, aceleracao * t
@@ -0,0 +1,75 @@
+"""
+Encontro de móveis em M.U. ou M.U.V. (o M.U. é o caso a = 0).
+
+O encontro de dois móveis é a igualdade das posições:
+    s0_1 + v_1 t + a_1 t²/2 = s0_2 + v_2 t + a_2 t²/2
+uma equação de até 2º grau, resolvida pela fórmula fechada do motor de
+eventos (fisica.eventos.encontros). Com N móveis, encontros() resolve todos
+os pares de uma vez.
+"""
+import numpy as np
+
+from fisica import eventos, muv
+
+
+def tempos_encontro(s0_1, v_1, a_1, s0_2, v_2, a_2):
+    """Instantes de encontro t >= 0 de dois móveis, em ordem crescente (tupla vazia se não houver)."""
+    t, _ = eventos.encontros(s0_1, v_1, a_1, s0_2, v_2, a_2)
+    return tuple(float(tempo) for tempo in t if not np.isnan(tempo))
+
+
+def encontros(s0, v, a, t_max=None):
+    """
+    Todos os encontros entre N móveis (cada um em M.U. ou M.U.V.).
+
+    s0, v e a são arrays de tamanho N. Os N(N-1)/2 pares são resolvidos juntos
+    (fisica.eventos.cruzamentos), sem laços em Python. Devolve a tabela de
+    eventos em ordem de tempo, como um dicionário de arrays: t, posicao,
+    movel_1 e movel_2 (índices, com movel_1 < movel_2) e coincidentes (pares
+    que andam sempre juntos, registrados em t = 0). Com t_max, só os
+    encontros em [0, t_max].
+    """
+    s0, v, a = (np.asarray(p, dtype=float).ravel() for p in (s0, v, a))
+    i, j = np.triu_indices(s0.size, k=1)
+
+    # Diferença das posições dos dois móveis de cada par: os encontros são os zeros dela
+    ds0, dv, da = s0[i] - s0[j], v[i] - v[j], a[i] - a[j]
+    raizes = eventos.cruzamentos(ds0, dv, da)
+
+    validos = raizes >= 0
+    if t_max is not None:
+        validos &= raizes <= t_max
+    par, coluna = np.nonzero(validos)
+    t = raizes[par, coluna]
+
+    # Ordena por tempo; empates ficam na ordem dos índices dos móveis
+    ordem = np.lexsort((j[par], i[par], t))
+    par, t = par[ordem], t[ordem]
+    movel_1, movel_2 = i[par], j[par]
+    return dict(
+        t=t,
+        posicao=muv.posicao(s0[movel_1], v[movel_1], a[movel_1], t),
+        movel_1=movel_1,
+        movel_2=movel_2,
+        coincidentes=(ds0[par] == 0) & (dv[par] == 0) & (da[par] == 0),
+    )
+
+
+def posicoes(s0_1, v_1, a_1, s0_2, v_2, a_2, t_max, num=101):
+    """Tempos e posições dos dois móveis de 0 a t_max: (t, pos_1, pos_2)."""
+    t, pos_1 = muv.trajetoria(s0_1, v_1, a_1, t_max, num)
+    pos_2 = muv.posicao(np.asarray(s0_2, dtype=float)[..., None], np.asarray(v_2, dtype=float)[..., None],
+                        np.asarray(a_2, dtype=float)[..., None], t)
+    return t, pos_1, pos_2
+
+
+def encontro_frontal(v_a, v_b, distancia):
+    """
+    Dois carros em M.U. partindo de 0 (A) e de distancia (B), um em direção ao outro.
+
+    Devolve (t_encontro, posicao_encontro); com arrays, um encontro por elemento.
+    """
+    v_a, v_b, distancia = (np.asarray(p, dtype=float) for p in (v_a, v_b, distancia))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = distancia / (v_a - v_b)
+    return t, v_a * t
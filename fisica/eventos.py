@@ -0,0 +1,256 @@
+"""
+Detecção de eventos: instantes exatos em que uma grandeza cruza um valor.
+
+Um evento é o zero de uma função f(t): vy(t) no ponto mais alto, y(t) - alvo
+na chegada a uma altura, s1(t) - s2(t) no encontro de dois móveis,
+s(t) - d na chegada de um bloco a uma distância. O mesmo motor serve aos
+dois tipos de movimento dos simuladores:
+
+  - analítico: a grandeza é s0 + v t + a t²/2 (M.U., M.U.V., projétil sem
+    arrasto e um bloco dentro de um passo de integração), e o instante sai
+    da fórmula fechada do 2º grau (raizes_quadratica());
+  - integrado numericamente: entre dois pontos a grandeza é a cúbica de
+    Hermite dos valores e derivadas (hermite(), interpolador_hermite()), e
+    o instante é refinado com refinar() dentro de um intervalo em que f
+    troca de sinal.
+
+apice(), altura_alvo(), encontros(), parada() e chegada() devolvem o
+instante e o estado do movimento analítico no evento; cruzamento_hermite()
+e encontrar_eventos() localizam os do movimento integrado ou de uma f
+qualquer. O resultado não depende de quantos pontos são usados no gráfico;
+grade_com_eventos() põe os instantes na grade de tempos dos gráficos.
+"""
+import numpy as np
+
+
+# --- Zeros de funções ---
+def refinar(f, a, b, tol=1e-13, max_iteracoes=100, tol_f=0.0):
+    """
+    Zero de f no intervalo [a, b], em que f(a) e f(b) têm sinais opostos.
+
+    Método de Illinois (falsa posição modificada), vetorizado: a e b podem
+    ser arrays, com um intervalo independente por elemento, e f deve aceitar
+    arrays. Onde não há troca de sinal, devolve NaN. tol_f também aceita o
+    zero quando |f| fica abaixo dela (para f com ruído, como a de uma
+    integração numérica, em que o intervalo pode não se fechar).
+    """
+    a, b = np.broadcast_arrays(*(np.asarray(p, dtype=float) for p in (a, b)))
+    a, b = a.copy(), b.copy()
+    fa, fb = f(a), f(b)
+
+    raiz = np.where(fa == 0, a, np.where(fb == 0, b, np.nan))
+    ativo = np.isnan(raiz) & (np.sign(fa) * np.sign(fb) < 0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for _ in range(max_iteracoes):
+            if not ativo.any():
+                break
+            c = (a * fb - b * fa) / (fb - fa)
+            # Proteção contra erros de arredondamento: volta para a bissecção
+            fora = ~((c - a) * (c - b) <= 0) | ~np.isfinite(c)
+            c = np.where(fora, 0.5 * (a + b), c)
+            fc = f(c)
+
+            # Mantém o intervalo com troca de sinal; reduz à metade o extremo que ficou parado
+            troca = np.sign(fc) * np.sign(fb) < 0
+            a, fa = np.where(troca, b, a), np.where(troca, fb, 0.5 * fa)
+            b, fb = c, fc
+
+            pronto = ativo & ((np.abs(fc) <= tol_f) | (np.abs(b - a) <= tol * (1 + np.abs(c))))
+            raiz = np.where(pronto, c, raiz)
+            ativo &= ~pronto
+
+    return np.where(ativo, 0.5 * (a + b), raiz)
+
+
+def encontrar_eventos(f, t0, t1, amostras=64, direcao=0):
+    """
+    Todos os zeros de f(t) em [t0, t1], em ordem crescente.
+
+    f é avaliada em uma grade de amostras para localizar as trocas de sinal,
+    e cada intervalo é refinado com refinar(). direcao = +1 só aceita zeros
+    em que f cresce, -1 só em que f decresce e 0 aceita os dois.
+
+    Um zero exatamente em um ponto da grade, inclusive em t0 ou em t1, entra
+    uma vez, com o sentido dado pelos vizinhos (só de um lado nas pontas);
+    se f se anula em vários pontos seguidos, só o primeiro deles conta. Zeros
+    mais próximos entre si que o espaçamento da grade podem se cancelar:
+    aumente amostras se f oscila rápido.
+    """
+    t = np.linspace(t0, t1, amostras + 1)
+    valores = np.broadcast_to(f(t), t.shape)
+    sinal = np.sign(valores)
+
+    # Zeros na grade: o sentido vem do último valor não nulo antes e do primeiro depois
+    zero = sinal == 0
+    exatos = np.flatnonzero(zero & ~np.r_[False, zero[:-1]])
+    nao_nulos = np.flatnonzero(~zero)
+    antes, depois = np.zeros(exatos.size), np.zeros(exatos.size)
+    if nao_nulos.size:
+        k = np.searchsorted(nao_nulos, exatos)
+        antes = np.where(k > 0, sinal[nao_nulos[np.maximum(k - 1, 0)]], 0.0)
+        depois = np.where(k < nao_nulos.size, sinal[nao_nulos[np.minimum(k, nao_nulos.size - 1)]], 0.0)
+    sentido_exatos = np.sign(depois - antes)
+
+    i = np.flatnonzero(sinal[:-1] * sinal[1:] < 0)
+    sentido = sinal[i + 1]
+    if direcao:
+        exatos = exatos[sentido_exatos == direcao]
+        i = i[sentido == direcao]
+
+    return np.sort(np.concatenate([t[exatos], refinar(f, t[i], t[i + 1])]))
+
+
+def primeiro_evento(f, t0, t1, amostras=64, direcao=0):
+    """Primeiro zero de f(t) em [t0, t1], ou NaN se não houver."""
+    tempos = encontrar_eventos(f, t0, t1, amostras, direcao)
+    return tempos[0] if tempos.size else np.nan
+
+
+# --- Movimento integrado: cúbica de Hermite entre os pontos ---
+def hermite(s, h, p0, d0, p1, d1):
+    """Interpolação cúbica de Hermite no intervalo [0, h], com s = τ/h em [0, 1]."""
+    s2, s3 = s * s, s * s * s
+    return ((2 * s3 - 3 * s2 + 1) * p0 + (s3 - 2 * s2 + s) * h * d0
+            + (-2 * s3 + 3 * s2) * p1 + (s3 - s2) * h * d1)
+
+
+def interpolador_hermite(t, y, dy):
+    """
+    Interpolação cúbica de Hermite de pontos (t, y) com derivadas dy, como
+    os de uma integração numérica. Devolve uma função de t, para usar como
+    f nos eventos; o erro é de 4ª ordem no espaçamento dos pontos.
+    """
+    t, y, dy = (np.asarray(p, dtype=float) for p in (t, y, dy))
+
+    def interpolar(tempo):
+        tempo = np.asarray(tempo, dtype=float)
+        i = np.clip(np.searchsorted(t, tempo, side="right") - 1, 0, t.size - 2)
+        h = t[i + 1] - t[i]
+        return hermite((tempo - t[i]) / h, h, y[i], dy[i], y[i + 1], dy[i + 1])
+
+    return interpolar
+
+
+def cruzamento_hermite(h, p0, d0, p1, d1, alvo, s_min=0.0):
+    """
+    Fração s em [s_min, 1] do intervalo [0, h] em que a cúbica de Hermite
+    cruza o valor alvo (NaN onde não cruza). Vetorizado: um intervalo por
+    elemento, como os passos de um lote de integrações.
+    """
+    forma = np.broadcast_shapes(*(np.shape(p) for p in (h, p0, d0, p1, d1, alvo, s_min)))
+    s_min = np.broadcast_to(np.asarray(s_min, dtype=float), forma)
+    return refinar(lambda s: hermite(s, h, p0, d0, p1, d1) - alvo, s_min, np.ones(forma))
+
+
+# --- Movimento analítico: s0 + v t + a t²/2 ---
+def raizes_quadratica(A, B, C):
+    """
+    Raízes reais de A t² + B t + C = 0, vetorizado sobre arrays de coeficientes.
+
+    Devolve um array (..., 2) com as duas raízes em ordem crescente, ou NaN
+    onde não existem. Casos degenerados: A = 0 vira equação do 1º grau;
+    A = B = 0 não tem raiz (C != 0) ou é satisfeita sempre (C = 0, devolve t = 0);
+    a raiz dupla aparece uma só vez.
+    """
+    A, B, C = np.broadcast_arrays(*(np.asarray(p, dtype=float) for p in (A, B, C)))
+    raizes = np.full(A.shape + (2,), np.nan)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # 1º grau: B t + C = 0
+        linear = A == 0
+        raizes[..., 0] = np.where(linear & (B != 0), -C / B, np.nan)
+        raizes[..., 0] = np.where(linear & (B == 0) & (C == 0), 0.0, raizes[..., 0])
+
+        # 2º grau, com tolerância para o discriminante que deveria ser zero (tangência)
+        discriminante = B * B - 4 * A * C
+        escala = B * B + np.abs(4 * A * C)
+        discriminante = np.where(np.abs(discriminante) <= 1e-12 * escala, 0.0, discriminante)
+        quadratica = ~linear & (discriminante >= 0)
+
+        # Forma estável de Bhaskara (evita cancelamento quando B² >> 4AC)
+        q = -0.5 * (B + np.copysign(np.sqrt(np.maximum(discriminante, 0.0)), B))
+        r1 = q / A
+        r2 = np.where(q != 0, C / q, r1)
+        dupla = discriminante == 0
+        raizes[..., 0] = np.where(quadratica, np.where(dupla, -B / (2 * A), np.minimum(r1, r2)), raizes[..., 0])
+        raizes[..., 1] = np.where(quadratica & ~dupla, np.maximum(r1, r2), np.nan)
+
+    # (+ 0.0 troca um eventual -0.0 por 0.0)
+    return raizes + 0.0
+
+
+def cruzamentos(s0, v, a, alvo=0.0):
+    """Instantes (..., 2), em ordem crescente, em que s0 + v t + a t²/2 vale alvo (NaN onde não há)."""
+    s0, v, a, alvo = (np.asarray(p, dtype=float) for p in (s0, v, a, alvo))
+    return raizes_quadratica(0.5 * a, v, s0 - alvo)
+
+
+# --- Eventos dos simuladores (movimento analítico) ---
+def parada(v, a):
+    """Instante em que a velocidade v + a t se anula (0 se ela é sempre nula; NaN se a = 0 e v != 0)."""
+    v, a = np.asarray(v, dtype=float), np.asarray(a, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(a != 0, -v / a, np.where(v == 0, 0.0, np.nan))
+
+
+def apice(y0, vy, g):
+    """Ponto mais alto de um lançamento sem arrasto (g > 0): (t, y), em que vy - g t se anula."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.asarray(vy, dtype=float) / g
+    return t, y0 + 0.5 * vy * t
+
+
+def altura_alvo(y0, vy, g, alvo):
+    """
+    Chegada de um lançamento sem arrasto (g > 0) à altura alvo, descendo:
+    (t, vy no instante), NaN se a altura não é alcançada. É a maior raiz de
+    y0 + vy t - g t²/2 = alvo, na forma sem cancelamento para cada sinal de vy.
+    """
+    vy, g = np.asarray(vy, dtype=float), np.asarray(g, dtype=float)
+    queda = np.asarray(y0, dtype=float) - alvo
+    with np.errstate(divide="ignore", invalid="ignore"):
+        raiz = np.sqrt(vy**2 + 2 * g * queda)
+        t = np.where(vy >= 0, (vy + raiz) / g, 2 * queda / (raiz - vy))
+    return t, vy - g * t
+
+
+def encontros(s0_1, v_1, a_1, s0_2, v_2, a_2):
+    """
+    Encontros de dois móveis em M.U.V.: (t, posicao), arrays (..., 2) com os
+    instantes t >= 0 em ordem crescente e a posição comum (NaN onde não há).
+    Móveis que andam sempre juntos se encontram em t = 0.
+    """
+    s0_1, v_1, a_1 = (np.asarray(p, dtype=float) for p in (s0_1, v_1, a_1))
+    t = cruzamentos(s0_1 - s0_2, v_1 - v_2, a_1 - a_2)
+    # As raízes já estão em ordem; se só a segunda é t >= 0, ela passa para a frente
+    t = np.where(t >= 0, t, np.nan)
+    t = np.where(np.isnan(t[..., :1]), t[..., ::-1], t)
+    return t, s0_1[..., None] + v_1[..., None] * t + 0.5 * a_1[..., None] * t**2
+
+
+def chegada(s0, v, a, distancia, t_max=np.inf):
+    """
+    Primeiro instante em [0, t_max] em que |s0 + v t + a t²/2| alcança a
+    distância: (t, posicao, velocidade), com a posição igual a ±distancia
+    (NaN onde não chega).
+    """
+    s0, v, a, distancia, t_max = (np.asarray(p, dtype=float) for p in (s0, v, a, distancia, t_max))
+    with np.errstate(invalid="ignore"):
+        # Os dois alvos, +distancia e -distancia, em uma só chamada: raízes (..., 2, 2)
+        alvos = np.stack([distancia, -distancia], axis=-1)
+        raizes = raizes_quadratica(0.5 * a[..., None], v[..., None], s0[..., None] - alvos)
+        t = np.min(np.where((raizes >= 0) & (raizes <= t_max[..., None, None]), raizes, np.inf), axis=(-2, -1))
+    t = np.where(np.isfinite(t), t, np.nan)
+    posicao = np.copysign(distancia, s0 + v * t + 0.5 * a * t**2)
+    return t, posicao, v + a * t
+
+
+def grade_com_eventos(t0, t1, num, eventos=()):
+    """
+    Tempos igualmente espaçados de t0 a t1 com os instantes dos eventos
+    incluídos, para que o gráfico passe exatamente pelos pontos importantes.
+    """
+    eventos = np.asarray(eventos, dtype=float).ravel()
+    eventos = eventos[np.isfinite(eventos) & (eventos >= t0) & (eventos <= t1)]
+    return np.union1d(np.linspace(t0, t1, num), eventos)
@@ -0,0 +1,312 @@
+"""
+Propagação de incertezas por Monte Carlo.
+
+Os parâmetros de um modelo (velocidade, ângulo, gravidade, massa, µ...) podem
+ser distribuições em vez de valores: cada amostra sorteia um valor de cada
+um e passa pelas fórmulas do núcleo de física. As amostras são geradas e
+processadas em blocos de tamanho fixo, e de cada bloco só sobram
+estatísticas acumuladas: momentos (média e covariância), mínimo e máximo e
+histogramas com faixas fixas. A memória não depende do número de amostras.
+
+    resultado = simular("projetil", dict(v0=Normal(50, 1), ang=Normal(np.radians(45), 0.01),
+                                         g=9.8, h0=0.0, h_impacto=0.0), 1_000_000, semente=1)
+    resultado.momentos.media, resultado.momentos.desvio
+
+Os blocos podem ser distribuídos entre processos. Cada bloco tem a sua
+própria semente, derivada da semente principal (np.random.SeedSequence), e
+os resultados são juntados na ordem dos blocos: a mesma semente dá o mesmo
+resultado com qualquer número de processos.
+"""
+import itertools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from fisica import dinamica
+from fisica.arrasto import calcular_trajetoria_arrasto
+from fisica.projetil import OK, calcular_trajetoria_lote
+from fisica.varredura import contexto_processos
+
+# Amostras por bloco (com arrasto cada amostra é uma integração numérica), faixas dos
+# histogramas e número de amostras a partir do qual as fórmulas fechadas usam processos
+BLOCO = 100_000
+BLOCO_ARRASTO = 4096
+FAIXAS = 60
+AMOSTRAS_PROCESSOS = 2_000_000
+
+
+# --- Distribuições dos parâmetros ---
+class Normal:
+    """Distribuição normal (gaussiana) com média e desvio padrão."""
+
+    def __init__(self, media, desvio):
+        self.media = media
+        self.desvio = desvio
+
+    def amostrar(self, gerador, n):
+        return gerador.normal(self.media, self.desvio, n)
+
+    def __repr__(self):
+        return f"Normal({self.media!r}, {self.desvio!r})"
+
+
+class Uniforme:
+    """Distribuição uniforme entre mínimo e máximo."""
+
+    def __init__(self, minimo, maximo):
+        self.minimo = minimo
+        self.maximo = maximo
+
+    def amostrar(self, gerador, n):
+        return gerador.uniform(self.minimo, self.maximo, n)
+
+    def __repr__(self):
+        return f"Uniforme({self.minimo!r}, {self.maximo!r})"
+
+
+def _amostrar(parametro, gerador, n):
+    # Valores fixos passam direto (o broadcasting dos modelos cuida do resto)
+    return parametro.amostrar(gerador, n) if hasattr(parametro, "amostrar") else parametro
+
+
+# --- Modelos: amostras dos parâmetros -> grandezas e amostras válidas ---
+def _projetil(v0, ang, g, h0, h_impacto, k=0.0, massa=1.0, modelo=None):
+    if modelo is None:
+        r = calcular_trajetoria_lote(v0, ang, g, h0, h_impacto)
+    else:
+        # Massas não positivas (descartadas abaixo) não entram na integração
+        positiva = np.asarray(massa) > 0
+        r = calcular_trajetoria_arrasto(v0, ang, g, h0, h_impacto, k, np.where(positiva, massa, 1.0), modelo, num=0)
+        return r, (r["situacao"] == OK) & positiva
+    return r, r["situacao"] == OK
+
+
+def _bloco_com_atrito(massa, forca, mu, distancia, g=dinamica.G, mu_estatico=None):
+    r = dinamica.bloco_com_atrito(massa, forca, mu, distancia, g, mu_estatico)
+    r["velocidade_final"] = r["aceleracao"] * r["t_total"]
+    validas = (r["aceleracao"] > 0) & (np.asarray(massa) > 0) & (np.asarray(mu) >= 0)
+    if mu_estatico is not None:
+        validas &= np.asarray(mu_estatico) >= 0
+    return r, validas
+
+
+# Nome: (função, grandezas de saída); amostras inválidas (o projétil não chega
+# à altura de impacto, o bloco não se move, massa ou µ negativos sorteados nas
+# caudas da distribuição) são só contadas
+MODELOS = {
+    "projetil": (_projetil, ("alcance", "altura_max", "t_voo", "velocidade_final")),
+    "bloco": (_bloco_com_atrito, ("aceleracao", "t_total", "velocidade_final")),
+}
+
+
+# --- Estatísticas acumuladas por blocos ---
+class Momentos:
+    """
+    Número de amostras, média e covariância de vetores de grandezas,
+    acumulados bloco a bloco (fórmula de Chan et al. para juntar dois grupos).
+    """
+
+    def __init__(self, dimensao):
+        self.n = 0
+        self.media = np.zeros(dimensao)
+        self._m2 = np.zeros((dimensao, dimensao))
+        self.minimo = np.full(dimensao, np.inf)
+        self.maximo = np.full(dimensao, -np.inf)
+
+    def adicionar(self, valores):
+        """Acrescenta as amostras de um bloco (array (n, dimensao))."""
+        if len(valores):
+            bloco = Momentos(valores.shape[1])
+            bloco.n = len(valores)
+            bloco.media = valores.mean(axis=0)
+            desvios = valores - bloco.media
+            bloco._m2 = desvios.T @ desvios
+            bloco.minimo, bloco.maximo = valores.min(axis=0), valores.max(axis=0)
+            self.juntar(bloco)
+
+    def juntar(self, outro):
+        n = self.n + outro.n
+        if outro.n:
+            delta = outro.media - self.media
+            self.media = self.media + delta * outro.n / n
+            self._m2 = self._m2 + outro._m2 + np.outer(delta, delta) * self.n * outro.n / n
+            self.minimo = np.minimum(self.minimo, outro.minimo)
+            self.maximo = np.maximum(self.maximo, outro.maximo)
+            self.n = n
+
+    @property
+    def covariancia(self):
+        return self._m2 / (self.n - 1) if self.n > 1 else np.full_like(self._m2, np.nan)
+
+    @property
+    def desvio(self):
+        return np.sqrt(np.diag(self.covariancia))
+
+
+class Histograma:
+    """
+    Contagens em faixas fixas, em uma ou mais dimensões, acumuladas bloco a
+    bloco. Amostras fora dos limites só entram na contagem fora.
+    """
+
+    def __init__(self, minimos, maximos, faixas=FAIXAS):
+        self.minimos = np.atleast_1d(np.asarray(minimos, dtype=float))
+        self.maximos = np.atleast_1d(np.asarray(maximos, dtype=float))
+        self.faixas = faixas
+        self.contagens = np.zeros((faixas,) * self.minimos.size, dtype=np.int64)
+        self.fora = 0
+
+    @property
+    def bordas(self):
+        return [np.linspace(a, b, self.faixas + 1) for a, b in zip(self.minimos, self.maximos)]
+
+    def adicionar(self, valores):
+        """Acrescenta as amostras de um bloco (array (n, dimensão) ou (n,))."""
+        valores = np.asarray(valores, dtype=float).reshape(len(valores), -1)
+        with np.errstate(invalid="ignore"):
+            posicao = (valores - self.minimos) / (self.maximos - self.minimos) * self.faixas
+            indices = np.floor(np.nan_to_num(posicao, nan=-1.0)).astype(np.int64)
+        # O valor exatamente no máximo fica na última faixa
+        indices[posicao == self.faixas] = self.faixas - 1
+        dentro = np.all((indices >= 0) & (indices < self.faixas), axis=1)
+        self.fora += int(len(valores) - dentro.sum())
+        plano = np.ravel_multi_index(tuple(indices[dentro].T), self.contagens.shape)
+        self.contagens += np.bincount(plano, minlength=self.contagens.size).reshape(self.contagens.shape)
+
+    def juntar(self, outro):
+        self.contagens += outro.contagens
+        self.fora += outro.fora
+
+    def quantis(self, q):
+        """Quantis estimados de um histograma de uma dimensão (interpolação linear na faixa)."""
+        acumulado = np.concatenate([[0], np.cumsum(self.contagens)])
+        return np.interp(np.asarray(q) * acumulado[-1], acumulado, self.bordas[0])
+
+
+class ResultadoMonteCarlo:
+    """Estatísticas de todas as amostras de uma simulação."""
+
+    def __init__(self, grandezas, limites, faixas):
+        self.grandezas = grandezas
+        self.amostras = 0
+        self.momentos = Momentos(len(grandezas))
+        minimos, maximos = limites
+        self.histogramas = {nome: Histograma(minimos[i], maximos[i], faixas) for i, nome in enumerate(grandezas)}
+        self.histogramas_pares = {
+            (a, b): Histograma(minimos[[i, j]], maximos[[i, j]], faixas)
+            for (i, a), (j, b) in itertools.combinations(enumerate(grandezas), 2)
+        }
+
+    @property
+    def validas(self):
+        return self.momentos.n
+
+    def adicionar(self, valores, n_amostras):
+        self.amostras += n_amostras
+        self.momentos.adicionar(valores)
+        for i, histograma in enumerate(self.histogramas.values()):
+            histograma.adicionar(valores[:, i])
+        for (a, b), histograma in self.histogramas_pares.items():
+            histograma.adicionar(valores[:, [self.grandezas.index(a), self.grandezas.index(b)]])
+
+    def juntar(self, outro):
+        self.amostras += outro.amostras
+        self.momentos.juntar(outro.momentos)
+        for nome, histograma in self.histogramas.items():
+            histograma.juntar(outro.histogramas[nome])
+        for par, histograma in self.histogramas_pares.items():
+            histograma.juntar(outro.histogramas_pares[par])
+
+    def indice(self, nome):
+        return self.grandezas.index(nome)
+
+
+def elipse_confianca(media, covariancia, nivel=0.95, pontos=100):
+    """
+    Contorno (x, y) da elipse que contém a fração nivel de uma distribuição
+    normal bidimensional com a média e a covariância (2 × 2) dadas.
+    """
+    # Para 2 graus de liberdade o quantil do qui-quadrado tem forma fechada: -2 ln(1 - nivel)
+    raio = np.sqrt(-2 * np.log(1 - nivel))
+    autovalores, autovetores = np.linalg.eigh(np.asarray(covariancia, dtype=float))
+    angulo = np.linspace(0, 2 * np.pi, pontos)
+    circulo = np.stack([np.cos(angulo), np.sin(angulo)])
+    contorno = autovetores @ (raio * np.sqrt(np.maximum(autovalores, 0))[:, None] * circulo)
+    return contorno[0] + media[0], contorno[1] + media[1]
+
+
+# --- Simulação ---
+def _valores(modelo, parametros, n, semente):
+    """Amostras de um bloco: array (n_validas, grandezas)."""
+    funcao, grandezas = MODELOS[modelo]
+    gerador = np.random.default_rng(semente)
+    amostras = {nome: _amostrar(p, gerador, n) for nome, p in parametros.items()}
+    resultados, validas = funcao(**amostras)
+    validas = np.broadcast_to(validas, (n,))
+    return np.stack([np.broadcast_to(resultados[nome], (n,))[validas] for nome in grandezas], axis=1)
+
+
+def _resumir_bloco(modelo, parametros, n, semente, limites, faixas):
+    resumo = ResultadoMonteCarlo(MODELOS[modelo][1], limites, faixas)
+    resumo.adicionar(_valores(modelo, parametros, n, semente), n)
+    return resumo
+
+
+def _limites(valores):
+    # Faixas dos histogramas a partir do primeiro bloco, com folga para as caudas
+    if not len(valores):
+        return np.zeros(valores.shape[1]), np.ones(valores.shape[1])
+    minimo, maximo = valores.min(axis=0), valores.max(axis=0)
+    folga = np.where(maximo > minimo, 0.25 * (maximo - minimo), 0.5 * np.abs(maximo) + 1e-9)
+    return minimo - folga, maximo + folga
+
+
+def simular(modelo, parametros, amostras, semente=None, bloco=None, processos=None, faixas=FAIXAS):
+    """
+    Simulação de Monte Carlo de um dos MODELOS.
+
+    parametros é um dicionário com os argumentos do modelo (para "projetil",
+    os de calcular_trajetoria_lote(), e k, massa e modelo para o arrasto;
+    para "bloco", os de fisica.dinamica.bloco_com_atrito()); cada um pode ser
+    um valor ou uma distribuição (Normal, Uniforme). Devolve um
+    ResultadoMonteCarlo com as estatísticas das grandezas do modelo.
+
+    bloco é o número de amostras de cada bloco e processos, o número de
+    processos de trabalho (None: um por CPU com arrasto ou a partir de
+    AMOSTRAS_PROCESSOS amostras; 1: tudo no processo atual).
+    """
+    if modelo not in MODELOS:
+        raise ValueError(f"Modelo de Monte Carlo desconhecido: {modelo}")
+    if amostras < 1:
+        raise ValueError(f"O número de amostras deve ser pelo menos 1 (recebido: {amostras}).")
+    if bloco is None:
+        bloco = BLOCO_ARRASTO if parametros.get("modelo") else BLOCO
+    tamanhos = [min(bloco, amostras - inicio) for inicio in range(0, amostras, bloco)]
+    sementes = np.random.SeedSequence(semente).spawn(len(tamanhos))
+
+    # O primeiro bloco define as faixas dos histogramas e entra no resultado
+    valores = _valores(modelo, parametros, tamanhos[0], sementes[0])
+    limites = _limites(valores)
+    resultado = ResultadoMonteCarlo(MODELOS[modelo][1], limites, faixas)
+    resultado.adicionar(valores, tamanhos[0])
+    del valores
+
+    restantes = len(tamanhos) - 1
+    if processos is None:
+        paralelo = parametros.get("modelo") or amostras >= AMOSTRAS_PROCESSOS
+        processos = (os.cpu_count() or 1) if paralelo else 1
+    processos = max(1, min(processos, restantes))
+    argumentos = ([modelo] * restantes, [parametros] * restantes, tamanhos[1:], sementes[1:],
+                  [limites] * restantes, [faixas] * restantes)
+
+    if processos > 1:
+        with ProcessPoolExecutor(processos, mp_context=contexto_processos()) as executor:
+            # Os resumos chegam na ordem dos blocos: a soma não depende do número de processos
+            for resumo in executor.map(_resumir_bloco, *argumentos, chunksize=math.ceil(restantes / (4 * processos))):
+                resultado.juntar(resumo)
+    else:
+        for resumo in map(_resumir_bloco, *argumentos):
+            resultado.juntar(resumo)
+    return resultado
@@ -0,0 +1,21 @@
+"""
+Movimento Uniforme (M.U.): velocidade constante, S = S₀ + v t.
+"""
+import numpy as np
+
+
+def posicao(s0, v, t):
+    """Posição no instante t (em m, com s0 em m, v em m/s e t em s)."""
+    return s0 + v * np.asarray(t, dtype=float)
+
+
+def trajetoria(s0, v, t_max, num=101):
+    """
+    Tempos e posições igualmente espaçados de 0 a t_max.
+
+    Os parâmetros podem ser arrays (com broadcasting); o resultado tem a
+    forma (..., num).
+    """
+    s0, v, t_max = (np.asarray(p, dtype=float)[..., None] for p in (s0, v, t_max))
+    t = t_max * np.linspace(0, 1, num)
+    return t, posicao(s0, v, t)
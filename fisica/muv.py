@@ -0,0 +1,27 @@
+"""
+Movimento Uniformemente Variado (M.U.V.): S = S₀ + v₀ t + a t²/2 e v = v₀ + a t.
+"""
+import numpy as np
+
+
+def posicao(s0, v0, a, t):
+    """Posição no instante t (em m, com s0 em m, v0 em m/s, a em m/s² e t em s)."""
+    t = np.asarray(t, dtype=float)
+    return s0 + v0 * t + 0.5 * a * t**2
+
+
+def velocidade(v0, a, t):
+    """Velocidade no instante t."""
+    return v0 + a * np.asarray(t, dtype=float)
+
+
+def trajetoria(s0, v0, a, t_max, num=101):
+    """
+    Tempos e posições igualmente espaçados de 0 a t_max.
+
+    Os parâmetros podem ser arrays (com broadcasting); o resultado tem a
+    forma (..., num).
+    """
+    s0, v0, a, t_max = (np.asarray(p, dtype=float)[..., None] for p in (s0, v0, a, t_max))
+    t = t_max * np.linspace(0, 1, num)
+    return t, posicao(s0, v0, a, t)
@@ -0,0 +1,104 @@
+"""
+Lançamento de projéteis (sem resistência do ar).
+
+calcular_trajetoria_lote() resolve muitos lançamentos de uma só vez: cada
+parâmetro pode ser um escalar ou um array (com broadcasting do NumPy). Os
+casos especiais que a página web mostra como erro ou aviso são devolvidos
+como códigos de situação por lançamento. O ponto mais alto e a chegada à
+altura de impacto são eventos do movimento analítico (fisica.eventos).
+"""
+import numpy as np
+
+from fisica.eventos import altura_alvo, apice
+
+# --- Códigos de situação de cada lançamento ---
+OK = 0
+GRAVIDADE_INVALIDA = 1       # g <= 0
+IMPACTO_INALCANCAVEL = 2     # a altura de impacto está acima da altura máxima
+DISCRIMINANTE_NEGATIVO = 3   # erro numérico no tempo de voo
+
+MENSAGENS = {
+    GRAVIDADE_INVALIDA: "A gravidade deve ser maior que zero para calcular a trajetória.",
+    IMPACTO_INALCANCAVEL: "O projétil não alcançará a altura de impacto desejada.",
+    DISCRIMINANTE_NEGATIVO: "Erro no cálculo do tempo de voo (discriminante negativo).",
+}
+
+
+def calcular_trajetoria_lote(v0, ang, g, h0, h_impacto):
+    """
+    Calcula os resultados de vários lançamentos de uma vez.
+
+    v0 em m/s, ang em radianos, g em m/s², h0 e h_impacto em m.
+    Devolve um dicionário de arrays: alcance, altura_max, t_altura_max, t_voo,
+    velocidade_final e situacao (um dos códigos acima).
+
+    Os valores seguem calcular_trajetoria() do simulador: se o impacto é
+    inalcançável, os resultados param na altura máxima (velocidade final 0);
+    nos casos de erro, todos os resultados são zero. O lançamento horizontal
+    (ang = 0) é coberto pela mesma fórmula de Bhaskara; abaixo da altura de
+    impacto ele cai no impacto inalcançável, como no simulador, que testava
+    esse caso antes do ângulo zero.
+    """
+    v0, ang, g, h0, h_impacto = np.broadcast_arrays(
+        *(np.asarray(p, dtype=float) for p in (v0, ang, g, h0, h_impacto))
+    )
+
+    vx = v0 * np.cos(ang)
+    vy = v0 * np.sin(ang)
+
+    situacao = np.full(v0.shape, OK, dtype=np.int8)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_altura_max, altura_max = apice(h0, vy, g)
+
+        # h0 + vy t - g t²/2 = h_impacto, descendo (a raiz maior); NaN se não há raiz real
+        t_voo, vy_final = altura_alvo(h0, vy, g, h_impacto)
+
+        situacao[np.isnan(t_voo)] = DISCRIMINANTE_NEGATIVO
+        situacao[h_impacto > altura_max] = IMPACTO_INALCANCAVEL
+        situacao[g <= 0] = GRAVIDADE_INVALIDA
+
+        # Impacto inalcançável: o movimento é considerado até a altura máxima
+        inalcancavel = situacao == IMPACTO_INALCANCAVEL
+        t_voo = np.where(inalcancavel, t_altura_max, t_voo)
+
+        alcance = vx * t_voo
+        velocidade_final = np.where(inalcancavel, 0.0, np.sqrt(vx**2 + vy_final**2))
+
+    # Casos de erro: todos os resultados valem zero
+    erro = (situacao == GRAVIDADE_INVALIDA) | (situacao == DISCRIMINANTE_NEGATIVO)
+    resultados = dict(
+        alcance=alcance,
+        altura_max=altura_max,
+        t_altura_max=t_altura_max,
+        t_voo=t_voo,
+        velocidade_final=velocidade_final,
+    )
+    for nome, valores in resultados.items():
+        resultados[nome] = np.where(erro, 0.0, valores)
+
+    resultados["situacao"] = situacao
+    return resultados
+
+
+def posicoes(v0, ang, g, h0, t):
+    """Posições (x, y) nos instantes t."""
+    t = np.asarray(t, dtype=float)
+    x = v0 * np.cos(ang) * t
+    y = h0 + v0 * np.sin(ang) * t - 0.5 * g * t**2
+    return x, y
+
+
+def pontos_trajetoria(v0, ang, g, h0, t_final, num=200):
+    """Pontos (x, y, t) de um lançamento, igualmente espaçados no tempo de 0 a t_final."""
+    t = np.linspace(0, t_final, num=num)
+    x, y = posicoes(v0, ang, g, h0, t)
+    return x, y, t
+
+
+def velocidades(v0, ang, g, t):
+    """Componentes (vx, vy) da velocidade nos instantes t (sem arrasto, vx é constante)."""
+    t = np.asarray(t, dtype=float)
+    vx = np.broadcast_to(v0 * np.cos(ang), t.shape).copy()
+    vy = v0 * np.sin(ang) - g * t
+    return vx, vy
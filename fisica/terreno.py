@@ -0,0 +1,330 @@
+"""
+Lançamento sobre um terreno qualquer, com quiques.
+
+O terreno é uma poligonal (rampas, degraus, muros verticais) ou um mapa de
+alturas amostrado, percorrido da esquerda para a direita: o lado livre de
+cada segmento é o da esquerda de quem percorre (acima do chão, à frente de
+um muro que sobe).
+
+A trajetória é calculada evento a evento. Entre dois contatos o movimento é
+uma parábola exata; o próximo contato é a primeira interseção da parábola
+com um segmento do terreno, resolvida como uma equação do 2º grau. Os
+segmentos ficam em um índice espacial (IndiceSegmentos, uma grade uniforme
+em x). Para cada parábola, as colunas que ela atravessa e a faixa de alturas
+dela em cada uma são calculadas de uma vez; só os segmentos das colunas em
+que essa faixa encontra o terreno são testados, todos juntos, em blocos
+crescentes na ordem em que a parábola passa. No contato, a componente normal
+da velocidade é invertida e multiplicada pelo coeficiente de restituição.
+
+Não há passo de tempo: a posição em qualquer instante sai de
+posicoes_quiques(), direto das parábolas. O laço em Python é por quique; o
+trabalho por colunas e segmentos é feito em arrays.
+"""
+import numpy as np
+
+# --- Como o movimento termina ---
+REPOUSO = 0    # velocidade normal depois do quique abaixo de v_minima (o deslizamento não é modelado)
+SAIU = 1       # o projétil passou do fim do terreno sem tocá-lo
+LIMITE = 2     # atingiu o número máximo de quiques ou t_max
+
+MENSAGENS = {
+    REPOUSO: "O projétil parou.",
+    SAIU: "O projétil saiu do terreno.",
+    LIMITE: "Atingido o limite de quiques ou de tempo.",
+}
+
+# Tempo mínimo até o próximo contato (s): evita reencontrar o segmento do quique anterior
+T_MINIMO = 1e-9
+# Folga relativa nas extremidades dos segmentos (contato exatamente em um vértice)
+FOLGA_SEGMENTO = 1e-9
+# Colunas no primeiro bloco de busca do contato (os seguintes dobram de tamanho)
+BLOCO_COLUNAS = 32
+
+
+class Terreno:
+    """Poligonal do terreno: vértices (x, y) em ordem, da esquerda para a direita."""
+
+    def __init__(self, x, y):
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        if self.x.shape != self.y.shape or self.x.size < 2:
+            raise ValueError("O terreno precisa de pelo menos dois vértices, com x e y do mesmo tamanho.")
+        # Segmentos: de (ax, ay) a (bx, by); pontos repetidos não formam segmento
+        ax, ay, bx, by = self.x[:-1], self.y[:-1], self.x[1:], self.y[1:]
+        validos = (ax != bx) | (ay != by)
+        self.ax, self.ay, self.bx, self.by = ax[validos], ay[validos], bx[validos], by[validos]
+        self.indice = IndiceSegmentos(self.ax, self.ay, self.bx, self.by)
+
+    @classmethod
+    def de_alturas(cls, x0, dx, alturas):
+        """Terreno de um mapa de alturas amostrado a cada dx a partir de x0."""
+        alturas = np.asarray(alturas, dtype=float)
+        return cls(x0 + dx * np.arange(alturas.size), alturas)
+
+    @classmethod
+    def plano(cls, altura, x0, x1):
+        return cls([x0, x1], [altura, altura])
+
+    def altura(self, x):
+        """Altura do terreno em x (em um muro vertical, a do lado de cima)."""
+        return np.interp(x, self.x, self.y)
+
+
+class IndiceSegmentos:
+    """
+    Grade uniforme em x sobre os segmentos: cada coluna guarda os segmentos
+    que a cruzam e a faixa de alturas deles.
+
+    As listas ficam em formato compacto: os segmentos da coluna c são
+    indices[inicio[c]:inicio[c + 1]].
+    """
+
+    def __init__(self, ax, ay, bx, by, n_colunas=None):
+        xmin, xmax = np.minimum(ax, bx), np.maximum(ax, bx)
+        self.ymin_segmento, self.ymax_segmento = np.minimum(ay, by), np.maximum(ay, by)
+        self.x0 = xmin.min()
+        self.x1 = xmax.max()
+        self.n_colunas = n_colunas or max(1, xmin.size)
+        self.largura = (self.x1 - self.x0) / self.n_colunas or 1.0
+
+        primeira = self.coluna(xmin)
+        contagem = self.coluna(xmax) - primeira + 1
+        segmentos = np.repeat(np.arange(xmin.size), contagem)
+        colunas = _expandir(primeira, contagem)
+
+        ordem = np.argsort(colunas, kind="stable")
+        self.indices = segmentos[ordem]
+        self.inicio = np.searchsorted(colunas[ordem], np.arange(self.n_colunas + 1))
+
+        # Faixa de alturas de cada coluna (colunas vazias nunca têm candidatos)
+        cheias = np.diff(self.inicio) > 0
+        self.ymin = np.full(self.n_colunas, np.inf)
+        self.ymax = np.full(self.n_colunas, -np.inf)
+        self.ymin[cheias] = np.minimum.reduceat(self.ymin_segmento[self.indices], self.inicio[:-1][cheias])
+        self.ymax[cheias] = np.maximum.reduceat(self.ymax_segmento[self.indices], self.inicio[:-1][cheias])
+
+    def coluna(self, x):
+        return np.clip(np.floor((np.asarray(x) - self.x0) / self.largura).astype(int), 0, self.n_colunas - 1)
+
+    def candidatos(self, colunas):
+        """Segmentos das colunas dadas e, para cada um, a posição da sua coluna em colunas."""
+        contagem = self.inicio[colunas + 1] - self.inicio[colunas]
+        posicao = np.repeat(np.arange(colunas.size), contagem)
+        return self.indices[_expandir(self.inicio[colunas], contagem)], posicao
+
+
+def _expandir(inicio, contagem):
+    """Os índices inicio[i], inicio[i] + 1, ..., inicio[i] + contagem[i] - 1 de cada i, em sequência."""
+    deslocamento = np.arange(contagem.sum()) - np.repeat(np.cumsum(contagem) - contagem, contagem)
+    return np.repeat(inicio, contagem) + deslocamento
+
+
+# --- Um trecho de parábola contra o terreno ---
+def _faixa_y(y0, vy, g, t_a, t_b):
+    """Menor e maior altura da parábola y0 + vy t - g t²/2 entre t_a e t_b (arrays)."""
+    def altura(t):
+        return y0 + vy * t - 0.5 * g * t**2
+
+    with np.errstate(invalid="ignore"):
+        y_a = altura(t_a)
+        y_b = np.where(np.isfinite(t_b), altura(t_b), -np.inf if g > 0 or vy < 0 else np.inf)
+    baixo, alto = np.minimum(y_a, y_b), np.maximum(y_a, y_b)
+    if g > 0:
+        # O ápice, se cair dentro do intervalo, é a maior altura
+        t_apice = vy / g
+        alto = np.where((t_a < t_apice) & (t_apice < t_b), altura(t_apice), alto)
+    return baixo, alto
+
+
+def _contato(terreno, segmentos, x0, y0, vx, vy, g, t_a, t_b):
+    """
+    Primeiro contato da parábola que parte de (x0, y0) com (vx, vy) com um
+    dos segmentos, vindo do lado livre; o contato com cada segmento só vale
+    entre o t_a e o t_b dele. Devolve (t, segmento) ou (inf, -1).
+    """
+    ax, ay = terreno.ax[segmentos], terreno.ay[segmentos]
+    dx, dy = terreno.bx[segmentos] - ax, terreno.by[segmentos] - ay
+    # Normal para o lado livre; f(t) = n · (P(t) - A) = c2 t² + c1 t + c0 é positiva no lado livre
+    nx, ny = -dy, dx
+    c2 = -0.5 * g * ny
+    c1 = nx * vx + ny * vy
+    c0 = nx * (x0 - ax) + ny * (y0 - ay)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        disc = c1**2 - 4 * c2 * c0
+        raiz = np.sqrt(np.where(disc >= 0, disc, np.nan))
+        q = -0.5 * (c1 + np.copysign(raiz, c1))
+        linear = np.abs(c2) <= 1e-12 * (np.abs(c1) + np.abs(c0) + 1)
+        t1 = np.where(linear, -c0 / c1, q / c2)
+        t2 = np.where(linear, np.nan, c0 / q)
+
+        melhor_t = np.inf
+        melhor_segmento = -1
+        for t in (t1, t2):
+            px = x0 + vx * t - ax
+            py = y0 + vy * t - 0.5 * g * t**2 - ay
+            s = (px * dx + py * dy) / (dx**2 + dy**2)
+            validos = (np.isfinite(t) & (t > np.maximum(t_a, T_MINIMO)) & (t <= t_b)
+                       & (s >= -FOLGA_SEGMENTO) & (s <= 1 + FOLGA_SEGMENTO)
+                       & (2 * c2 * t + c1 < 0))   # entrando no terreno (f decrescendo)
+            if validos.any():
+                k = np.argmin(np.where(validos, t, np.inf))
+                if t[k] < melhor_t:
+                    melhor_t, melhor_segmento = t[k], segmentos[k]
+    return melhor_t, melhor_segmento
+
+
+def proximo_contato(terreno, x0, y0, vx, vy, g):
+    """
+    Primeiro contato com o terreno da parábola que parte de (x0, y0) com
+    velocidade (vx, vy): (t, segmento), ou (inf, -1) se ela sai do terreno.
+
+    As colunas do índice que a parábola atravessa, até descer abaixo do
+    ponto mais baixo do terreno, são descartadas de uma vez quando a faixa de
+    alturas dela na coluna não encontra a dos segmentos. Os segmentos das
+    restantes são testados em blocos de colunas, na ordem da travessia: o
+    primeiro bloco com contato tem o primeiro contato.
+    """
+    indice = terreno.indice
+    if vx == 0:
+        if not indice.x0 <= x0 <= indice.x1:
+            return np.inf, -1
+        colunas = np.atleast_1d(indice.coluna(x0))
+        t_a, t_b = np.zeros(1), np.full(1, np.inf)
+    else:
+        # Abaixo do ponto mais baixo do terreno a parábola não encontra mais nada
+        queda = y0 - indice.ymin_segmento.min()
+        t_queda = (vy + np.sqrt(max(vy**2 + 2 * g * queda, 0.0))) / g if g > 0 else np.inf
+        c_inicio = int(indice.coluna(x0))
+        c_fim = int(indice.coluna(np.clip(x0 + vx * t_queda, indice.x0, indice.x1)))
+        passo = 1 if vx > 0 else -1
+        colunas = np.arange(c_inicio, c_fim + passo, passo)
+        x_esquerda = indice.x0 + colunas * indice.largura
+        bordas = ((x_esquerda - x0) / vx, (x_esquerda + indice.largura - x0) / vx)
+        t_a, t_b = np.maximum(np.minimum(*bordas), 0.0), np.maximum(*bordas)
+        # Folga para os contatos exatamente na borda da coluna
+        t_b = t_b + T_MINIMO * (1 + t_b)
+
+    y_baixo, y_alto = _faixa_y(y0, vy, g, t_a, t_b)
+    cruzam = (y_baixo <= indice.ymax[colunas]) & (y_alto >= indice.ymin[colunas])
+    colunas, t_a, t_b = colunas[cruzam], t_a[cruzam], t_b[cruzam]
+
+    inicio, tamanho = 0, BLOCO_COLUNAS
+    while inicio < colunas.size:
+        bloco = slice(inicio, inicio + tamanho)
+        segmentos, posicao = indice.candidatos(colunas[bloco])
+        t, segmento = _contato(terreno, segmentos, x0, y0, vx, vy, g, t_a[bloco][posicao], t_b[bloco][posicao])
+        if segmento >= 0:
+            return t, segmento
+        inicio, tamanho = inicio + tamanho, 2 * tamanho
+    return np.inf, -1
+
+
+# --- Trajetória com quiques ---
+def _decola(terreno, vx, vy):
+    """Se a velocidade, partindo do terreno em x = 0, aponta para o lado livre do segmento à frente."""
+    xmin, xmax = np.minimum(terreno.ax, terreno.bx), np.maximum(terreno.ax, terreno.bx)
+    # Segmento por onde o projétil segue: o que cobre x logo à direita (ou à esquerda) de 0
+    a_frente = (xmin <= 0) & (xmax > 0) if vx >= 0 else (xmin < 0) & (xmax >= 0)
+    if not a_frente.any():
+        return True
+    j = np.flatnonzero(a_frente)[0]
+    dx, dy = terreno.bx[j] - terreno.ax[j], terreno.by[j] - terreno.ay[j]
+    return vx * -dy + vy * dx > 1e-12 * np.hypot(vx, vy) * np.hypot(dx, dy)
+
+
+def quicar(v0, ang, g, h0, terreno, restituicao=0.7, max_quiques=100, t_max=np.inf, v_minima=0.05):
+    """
+    Lançamento de (0, altura do terreno em 0 + h0) com v0 (m/s) e ang (rad),
+    quicando no terreno com o coeficiente de restituição dado (0: para no
+    primeiro contato; 1: quiques elásticos).
+
+    Devolve um dicionário com:
+      - trechos: arrays t0, x0, y0, vx, vy do início de cada parábola;
+      - contatos: arrays t, x, y, segmento e velocidade (módulo antes do
+        contato) de cada toque no terreno;
+      - t_fim e situacao (REPOUSO, SAIU ou LIMITE).
+
+    O movimento termina quando a velocidade normal depois de um quique fica
+    abaixo de v_minima (REPOUSO; também em t = 0, quando o lançamento parte
+    da superfície, h0 = 0, rente a ela ou para dentro dela), quando o projétil sai do terreno (SAIU;
+    t_fim é então o instante em que ele passa da altura mínima do terreno) ou
+    em max_quiques ou t_max (LIMITE).
+    """
+    if g <= 0:
+        raise ValueError("A gravidade deve ser maior que zero.")
+    x, y = 0.0, float(terreno.altura(0.0) + h0)
+    vx, vy = v0 * np.cos(ang), v0 * np.sin(ang)
+    t = 0.0
+
+    trechos = []
+    contatos = []
+    situacao = LIMITE
+    if h0 <= 0 and not _decola(terreno, vx, vy):
+        # Sem voo: o projétil ficaria deslizando pelo terreno, o que não é modelado
+        trechos.append((t, x, y, vx, vy))
+        situacao = REPOUSO
+    else:
+        while True:
+            trechos.append((t, x, y, vx, vy))
+            dt, segmento = proximo_contato(terreno, x, y, vx, vy, g)
+            if not np.isfinite(dt):
+                # Sem contato: termina quando cai abaixo do ponto mais baixo do terreno
+                queda = y - terreno.y.min()
+                dt = (vy + np.sqrt(max(vy**2 + 2 * g * queda, 0.0))) / g
+                situacao = SAIU if t + dt <= t_max else LIMITE
+                t = min(t + dt, t_max)
+                break
+            if t + dt > t_max:
+                t = t_max
+                break
+
+            # Contato: posição e velocidade exatas da parábola
+            t += dt
+            x, y = x + vx * dt, y + vy * dt - 0.5 * g * dt**2
+            vy -= g * dt
+            contatos.append((t, x, y, segmento, np.hypot(vx, vy)))
+
+            # Quique: inverte a componente normal (unitária, para o lado livre) e aplica a restituição
+            dx = terreno.bx[segmento] - terreno.ax[segmento]
+            dy = terreno.by[segmento] - terreno.ay[segmento]
+            comprimento = np.hypot(dx, dy)
+            nx, ny = -dy / comprimento, dx / comprimento
+            v_normal = vx * nx + vy * ny
+            vx -= (1 + restituicao) * v_normal * nx
+            vy -= (1 + restituicao) * v_normal * ny
+            if restituicao * abs(v_normal) < v_minima:
+                situacao = REPOUSO
+                break
+            if len(contatos) >= max_quiques:
+                situacao = LIMITE
+                break
+
+    trechos = np.array(trechos, dtype=float).reshape(-1, 5)
+    contatos = np.array(contatos, dtype=float).reshape(-1, 5)
+    return dict(
+        trechos=dict(zip(("t0", "x0", "y0", "vx", "vy"), trechos.T)),
+        contatos=dict(t=contatos[:, 0], x=contatos[:, 1], y=contatos[:, 2],
+                      segmento=contatos[:, 3].astype(int), velocidade=contatos[:, 4]),
+        g=g,
+        t_fim=t,
+        situacao=situacao,
+    )
+
+
+def posicoes_quiques(resultado, t):
+    """Posições (x, y) nos instantes t (de 0 a t_fim), direto das parábolas."""
+    trechos = resultado["trechos"]
+    t = np.clip(np.asarray(t, dtype=float), 0.0, resultado["t_fim"])
+    k = np.clip(np.searchsorted(trechos["t0"], t, side="right") - 1, 0, trechos["t0"].size - 1)
+    dt = t - trechos["t0"][k]
+    x = trechos["x0"][k] + trechos["vx"][k] * dt
+    y = trechos["y0"][k] + trechos["vy"][k] * dt - 0.5 * resultado["g"] * dt**2
+    return x, y
+
+
+def pontos_quiques(resultado, num=400):
+    """Pontos (x, y, t) igualmente espaçados no tempo, com os instantes dos contatos incluídos."""
+    t = np.union1d(np.linspace(0.0, resultado["t_fim"], num), resultado["contatos"]["t"])
+    x, y = posicoes_quiques(resultado, t)
+    return x, y, t
@@ -0,0 +1,103 @@
+"""
+Varredura de parâmetros do lançamento de projéteis.
+
+Calcula alcance, altura máxima e tempo de voo sobre uma grade inteira de
+parâmetros (por exemplo, ângulo × velocidade inicial), para mapas de cores e
+curvas de nível. A grade é formada pelo broadcasting do NumPy, como em
+fisica.projetil.calcular_trajetoria_lote():
+
+    angulos = np.radians(np.linspace(0, 90, 500))
+    velocidades = np.linspace(1, 100, 400)
+    mapa = varrer(velocidades[None, :], angulos[:, None], 9.8, 0.0, 0.0)
+    mapa["alcance"].shape          # (500, 400)
+
+A grade é dividida em blocos: sem arrasto, os blocos só limitam a memória
+usada de cada vez; com arrasto (integração numérica em fisica.arrasto), os
+blocos são distribuídos entre processos.
+"""
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from fisica.arrasto import calcular_trajetoria_arrasto
+from fisica.projetil import calcular_trajetoria_lote
+
+GRANDEZAS = ("alcance", "altura_max", "t_altura_max", "t_voo", "velocidade_final", "situacao")
+
+# Células por bloco: a fórmula fechada processa milhões de células por segundo em um
+# único processo; a integração com arrasto avança cada bloco até o seu lançamento mais lento
+BLOCO_ANALITICO = 1_000_000
+BLOCO_ARRASTO = 4096
+
+
+def _calcular_bloco(modelo, parametros):
+    """Resultados de um bloco de lançamentos (uma linha de cada parâmetro)."""
+    if modelo is None:
+        return calcular_trajetoria_lote(*parametros[:5])
+    return calcular_trajetoria_arrasto(*parametros, modelo=modelo, num=0)
+
+
+def contexto_processos():
+    """
+    Contexto de multiprocessing para os processos de trabalho (varredura,
+    Monte Carlo, lote): o forkserver cria os processos a partir de um
+    servidor limpo, sem as threads do Streamlit.
+    """
+    metodos = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in metodos else "spawn")
+
+
+def varrer(v0, ang, g, h0, h_impacto, k=0.0, massa=1.0, modelo=None, bloco=None, processos=None):
+    """
+    Resultados de todos os lançamentos da grade formada pelos parâmetros.
+
+    Os parâmetros seguem calcular_trajetoria_lote() (ang em radianos), com
+    broadcasting; modelo=None usa a fórmula fechada, sem arrasto, e
+    "linear" ou "quadratico" integra com o arrasto de coeficiente k e a massa
+    dada. Devolve um dicionário com os arrays de GRANDEZAS, todos com a forma
+    da grade.
+
+    bloco é o número de células calculadas de cada vez e processos, o número
+    de processos de trabalho (None: um por CPU quando há mais de um bloco com
+    arrasto; 1: tudo no processo atual).
+    """
+    parametros = np.broadcast_arrays(*(np.asarray(p, dtype=float)
+                                       for p in (v0, ang, g, h0, h_impacto, k, massa)))
+    forma = parametros[0].shape
+    grade = forma or (1,)
+    parametros = [p.reshape(grade) for p in parametros]
+    n = math.prod(grade)
+    if bloco is None:
+        bloco = BLOCO_ANALITICO if modelo is None else BLOCO_ARRASTO
+
+    # Cada bloco recebe só as suas células: os arrays da grade inteira não são montados
+    def blocos():
+        for inicio in range(0, n, bloco):
+            indices = np.unravel_index(np.arange(inicio, min(inicio + bloco, n)), grade)
+            yield [p[indices] for p in parametros]
+
+    n_blocos = -(-n // bloco)
+    if processos is None:
+        processos = (os.cpu_count() or 1) if modelo is not None and n_blocos > 1 else 1
+    processos = max(1, min(processos, n_blocos))
+
+    if processos > 1:
+        with ProcessPoolExecutor(processos, mp_context=contexto_processos()) as executor:
+            resultados = list(executor.map(_calcular_bloco, [modelo] * n_blocos, blocos()))
+    else:
+        resultados = [_calcular_bloco(modelo, parametros_bloco) for parametros_bloco in blocos()]
+
+    if not resultados:
+        resultados = [_calcular_bloco(modelo, [p.ravel() for p in parametros])]
+    return {nome: np.concatenate([r[nome] for r in resultados]).reshape(forma) for nome in GRANDEZAS}
+
+
+def angulo_otimo(angulos, valores, eixo=0):
+    """
+    Ângulo que maximiza os valores (por exemplo, o alcance) ao longo do eixo
+    dos ângulos, para cada ponto dos outros eixos da grade.
+    """
+    return np.take(np.asarray(angulos), np.argmax(valores, axis=eixo))
@@ -0,0 +1,303 @@
+"""
+Medição de desempenho dos simuladores em produção.
+
+Cada execução do script (rerun) e cada quadro da reprodução é uma
+"execução" com as etapas medidas dentro dela: os cálculos e gráficos
+estáticos gerados (falhas dos caches de cache.py), o desenho e a codificação
+dos quadros (animacao.py e codificacao.py), a espera por um quadro ainda não renderizado
+(reproducao.py) e o intervalo real entre quadros exibidos. Também são
+contados os quadros e os bytes enviados ao navegador, e guardada a taxa de
+quadros pedida ("Velocidade da Animação").
+
+O custo é o de duas leituras do relógio e de uma trava por etapa, pequeno o
+bastante para ficar ligado o tempo todo. Os totais ficam em memória, no
+processo do servidor, e podem ser vistos:
+
+  - no painel de desempenho de cada simulador (com ?debug=1 na URL ou a
+    variável de ambiente CINEMATICA_DEBUG=1);
+  - em um log JSON-lines, uma linha por execução, no arquivo da variável
+    CINEMATICA_METRICAS_LOG;
+  - no formato de texto do Prometheus, em http://127.0.0.1:<porta>/metrics,
+    com a porta da variável CINEMATICA_METRICAS_PORTA.
+
+Uso nos simuladores:
+
+    iniciar_execucao("mu")            # no começo do script
+    with medir("montagem"):
+        ...
+    painel_desempenho()               # no fim do script
+    terminar_execucao()
+"""
+import bisect
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Limites (em segundos) das faixas dos histogramas das etapas
+FAIXAS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_execucao = contextvars.ContextVar("execucao", default=None)
+
+
+class Etapa:
+    """Contagem, soma, máximo e histograma das durações de uma etapa."""
+
+    def __init__(self):
+        self.contagem = 0
+        self.soma = 0.0
+        self.maximo = 0.0
+        self.faixas = [0] * (len(FAIXAS) + 1)
+
+    def observar(self, segundos):
+        self.contagem += 1
+        self.soma += segundos
+        self.maximo = max(self.maximo, segundos)
+        self.faixas[bisect.bisect_left(FAIXAS, segundos)] += 1
+
+
+class Instrumentacao:
+    """Totais do processo: etapas por (app, etapa), quadros, bytes e taxa de quadros pedida por app."""
+
+    def __init__(self):
+        self.etapas = {}
+        self.quadros = {}
+        self.bytes_enviados = {}
+        self.fps_pedido = {}
+        self.fontes = {}
+        self._trava = threading.Lock()
+        self._log = None
+
+    def observar(self, app, etapa, segundos):
+        with self._trava:
+            if (app, etapa) not in self.etapas:
+                self.etapas[app, etapa] = Etapa()
+            self.etapas[app, etapa].observar(segundos)
+
+    def contar_quadro(self, app, n_bytes, fps_pedido=None):
+        with self._trava:
+            self.quadros[app] = self.quadros.get(app, 0) + 1
+            self.bytes_enviados[app] = self.bytes_enviados.get(app, 0) + n_bytes
+            if fps_pedido is not None:
+                self.fps_pedido[app] = fps_pedido
+
+    def registrar_fonte(self, nome, estatisticas):
+        """Inclui nas métricas os contadores de estatisticas() (por exemplo, as dos caches)."""
+        self.fontes[nome] = estatisticas
+
+    def limpar(self):
+        with self._trava:
+            self.etapas.clear()
+            self.quadros.clear()
+            self.bytes_enviados.clear()
+            self.fps_pedido.clear()
+
+    # --- Log JSON-lines ---
+    def gravar_log(self, registro):
+        caminho = os.environ.get("CINEMATICA_METRICAS_LOG")
+        if not caminho:
+            return
+        linha = json.dumps(registro, ensure_ascii=False) + "\n"
+        with self._trava:
+            if self._log is None or self._log.name != caminho:
+                self._log = open(caminho, "a", encoding="utf-8", buffering=1)
+            self._log.write(linha)
+
+    # --- Resumo e exportação ---
+    def resumo(self):
+        """Linhas (app, etapa, contagem, média e máximo em ms) de todas as etapas medidas."""
+        with self._trava:
+            return [dict(app=app, etapa=etapa, contagem=e.contagem, media_ms=1000 * e.soma / e.contagem,
+                         maximo_ms=1000 * e.maximo, total_s=e.soma)
+                    for (app, etapa), e in sorted(self.etapas.items())]
+
+    def prometheus(self):
+        """Todas as métricas no formato de texto do Prometheus."""
+        linhas = ["# TYPE cinematica_etapa_segundos histogram"]
+        with self._trava:
+            for (app, etapa), e in sorted(self.etapas.items()):
+                rotulos = f'app="{app}",etapa="{etapa}"'
+                acumulado = 0
+                for limite, n in zip((*FAIXAS, "+Inf"), e.faixas):
+                    acumulado += n
+                    linhas.append(f'cinematica_etapa_segundos_bucket{{{rotulos},le="{limite}"}} {acumulado}')
+                linhas.append(f"cinematica_etapa_segundos_sum{{{rotulos}}} {e.soma}")
+                linhas.append(f"cinematica_etapa_segundos_count{{{rotulos}}} {e.contagem}")
+            for nome, tipo, valores in (("quadros_total", "counter", self.quadros),
+                                        ("bytes_enviados_total", "counter", self.bytes_enviados),
+                                        ("fps_pedido", "gauge", self.fps_pedido)):
+                linhas.append(f"# TYPE cinematica_{nome} {tipo}")
+                linhas += [f'cinematica_{nome}{{app="{app}"}} {valor}' for app, valor in sorted(valores.items())]
+
+        for fonte, estatisticas in self.fontes.items():
+            for nome, valor in estatisticas().items():
+                if isinstance(valor, (int, float)):
+                    linhas.append(f"cinematica_{fonte}_{nome} {valor}")
+        return "\n".join(linhas) + "\n"
+
+
+INSTRUMENTACAO = Instrumentacao()
+
+
+# --- Execuções e etapas ---
+class Execucao:
+    """Uma execução do script ou do fragmento de um quadro, com as durações das suas etapas."""
+
+    def __init__(self, app, tipo):
+        self.app = app
+        self.tipo = tipo
+        self.inicio = time.perf_counter()
+        self.etapas = {}
+        self.quadros = 0
+        self.bytes = 0
+
+    def terminar(self):
+        duracao = time.perf_counter() - self.inicio
+        INSTRUMENTACAO.observar(self.app, self.tipo, duracao)
+        INSTRUMENTACAO.gravar_log(dict(
+            ts=round(time.time(), 3), app=self.app, tipo=self.tipo, duracao_ms=round(1000 * duracao, 3),
+            etapas={etapa: round(1000 * segundos, 3) for etapa, segundos in self.etapas.items()},
+            quadros=self.quadros, bytes=self.bytes,
+        ))
+
+
+def iniciar_execucao(app, tipo="rerun"):
+    """Começa a medir uma execução de app na thread atual (uma execução anterior não terminada é descartada)."""
+    atual = Execucao(app, tipo)
+    _execucao.set(atual)
+    return atual
+
+
+def terminar_execucao():
+    """Termina a execução em andamento: registra a duração total e grava a linha do log."""
+    atual = _execucao.get()
+    if atual is not None:
+        _execucao.set(None)
+        atual.terminar()
+
+
+@contextlib.contextmanager
+def execucao(app, tipo):
+    """Execução aninhada (por exemplo, o fragmento da reprodução dentro de um rerun)."""
+    atual = Execucao(app, tipo)
+    token = _execucao.set(atual)
+    try:
+        yield atual
+    finally:
+        _execucao.reset(token)
+        atual.terminar()
+
+
+def app_atual(padrao="-"):
+    """App da execução atual, ou padrao fora de uma execução."""
+    atual = _execucao.get()
+    return atual.app if atual is not None else padrao
+
+
+def observar(etapa, segundos):
+    """Registra uma duração já medida na execução atual."""
+    atual = _execucao.get()
+    app = atual.app if atual is not None else "-"
+    INSTRUMENTACAO.observar(app, etapa, segundos)
+    if atual is not None:
+        atual.etapas[etapa] = atual.etapas.get(etapa, 0.0) + segundos
+
+
+@contextlib.contextmanager
+def medir(etapa):
+    """Mede o bloco como uma etapa da execução atual."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        observar(etapa, time.perf_counter() - inicio)
+
+
+def contar_quadro(n_bytes, fps_pedido=None):
+    """Conta um quadro enviado ao navegador na execução atual."""
+    atual = _execucao.get()
+    if atual is not None:
+        atual.quadros += 1
+        atual.bytes += n_bytes
+    INSTRUMENTACAO.contar_quadro(atual.app if atual is not None else "-", n_bytes, fps_pedido)
+
+
+# --- Endpoint do Prometheus ---
+class _Metricas(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") not in ("", "/metrics"):
+            self.send_error(404)
+            return
+        corpo = INSTRUMENTACAO.prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+_servidor = None
+_trava_servidor = threading.Lock()
+
+
+def iniciar_servidor(porta=None):
+    """
+    Serve as métricas em http://127.0.0.1:<porta>/metrics, uma vez por processo.
+
+    Sem porta, usa CINEMATICA_METRICAS_PORTA; sem as duas, não faz nada.
+    """
+    global _servidor
+    porta = porta or os.environ.get("CINEMATICA_METRICAS_PORTA")
+    with _trava_servidor:
+        if _servidor is not None or not porta:
+            return _servidor
+        try:
+            _servidor = ThreadingHTTPServer(("127.0.0.1", int(porta)), _Metricas)
+        except OSError:
+            # Outro processo do laboratório já serve as métricas nesta porta
+            return None
+        threading.Thread(target=_servidor.serve_forever, daemon=True).start()
+        return _servidor
+
+
+# --- Painel de depuração ---
+def depuracao_ativa():
+    """Painel ligado pela URL (?debug=1) ou pela variável de ambiente CINEMATICA_DEBUG."""
+    import streamlit as st
+
+    return os.environ.get("CINEMATICA_DEBUG") == "1" or st.query_params.get("debug") == "1"
+
+
+def painel_desempenho():
+    """Tabela das etapas medidas, quadros, bytes, taxa de quadros e caches (só com a depuração ativa)."""
+    if not depuracao_ativa():
+        return
+    import streamlit as st
+
+    with st.sidebar.expander("⏱️ Desempenho"):
+        st.caption("Totais deste processo do servidor, desde a partida.")
+        st.dataframe([{"App": linha["app"], "Etapa": linha["etapa"], "N": linha["contagem"],
+                       "Média (ms)": round(linha["media_ms"], 2), "Máx. (ms)": round(linha["maximo_ms"], 2)}
+                      for linha in INSTRUMENTACAO.resumo()], hide_index=True)
+
+        intervalos = {linha["app"]: linha for linha in INSTRUMENTACAO.resumo() if linha["etapa"] == "intervalo_quadro"}
+        for app, quadros in sorted(INSTRUMENTACAO.quadros.items()):
+            texto = f"**{app}**: {quadros} quadros, {INSTRUMENTACAO.bytes_enviados.get(app, 0) / 1024:.0f} kB"
+            if app in intervalos and app in INSTRUMENTACAO.fps_pedido:
+                texto += (f"; {1000 / intervalos[app]['media_ms']:.1f} quadros/s obtidos "
+                          f"de {INSTRUMENTACAO.fps_pedido[app]:.1f} pedidos")
+            st.markdown(texto)
+
+        for fonte, estatisticas in INSTRUMENTACAO.fontes.items():
+            dados = estatisticas()
+            st.markdown(f"**{fonte}**: {dados['acertos']} acertos, {dados['falhas']} falhas "
+                        f"({dados['taxa_acerto']:.0%})")
+
+
+iniciar_servidor()
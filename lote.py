@@ -0,0 +1,369 @@
+"""
+Execução em lote de cenários, sem Streamlit.
+
+Lê uma lista de cenários de um arquivo CSV, JSON ou YAML, calcula cada um
+com as mesmas fórmulas dos simuladores (o núcleo de física) e grava as
+respostas em tabelas e uma figura por cenário, em PNG e/ou SVG. Os cenários
+são distribuídos entre processos; nenhum servidor do Streamlit é iniciado.
+
+Cada cenário tem um tipo e os parâmetros do simulador correspondente, nas
+unidades dos controles (ângulo em graus):
+
+    projetil   v0, angulo, g=9.8, h0=0, h_impacto=0; com resistência do ar,
+               modelo (quadratico ou linear), massa, area e, no quadrático, cd
+    mu         s0, v, t_max
+    muv        s0, v0, a, t_max
+    encontro   s0_1, v_1, a_1=0, s0_2, v_2, a_2=0, t_max
+    bloco      massa, forca, mu, distancia, g=9.8
+
+No CSV (separado por vírgula ou ponto e vírgula), cada linha é um cenário e
+as células vazias usam o valor padrão; o JSON e o YAML são uma lista de
+objetos (ou um objeto com a lista em "cenarios"). O nome é opcional:
+
+    tipo;nome;v0;angulo;s0;v;t_max
+    projetil;Chute a gol;25;30;;;
+    mu;Carro;;;0;20;10
+
+Uso:
+    python lote.py cenarios.csv                           # resultados em ./resultados
+    python lote.py cenarios.json --saida lista-1 --formatos png svg
+    python lote.py cenarios.yaml --processos 4 --sem-figuras
+
+Na pasta de saída ficam um CSV por tipo de cenário (parâmetros e respostas),
+resultados.json com todos os cenários na ordem do arquivo e a pasta figuras.
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from fisica import dinamica, encontro, muv
+from fisica.arrasto import MODELOS, calcular_trajetoria_arrasto, coeficiente_linear, coeficiente_quadratico
+from fisica.eventos import grade_com_eventos
+from fisica.projetil import IMPACTO_INALCANCAVEL, MENSAGENS, OK, calcular_trajetoria_lote, posicoes
+from fisica.varredura import contexto_processos
+
+FORMATOS = ("png", "svg")
+
+# --- Parâmetros de cada tipo de cenário: nome -> valor padrão (None: obrigatório) ---
+PARAMETROS = {
+    "projetil": dict(v0=None, angulo=None, g=9.8, h0=0.0, h_impacto=0.0, massa=None, area=None, cd=None),
+    "mu": dict(s0=None, v=None, t_max=None),
+    "muv": dict(s0=None, v0=None, a=None, t_max=None),
+    "encontro": dict(s0_1=None, v_1=None, a_1=0.0, s0_2=None, v_2=None, a_2=0.0, t_max=None),
+    "bloco": dict(massa=None, forca=None, mu=None, distancia=None, g=dinamica.G),
+}
+
+# Parâmetros exigidos pelo modelo de arrasto do projétil
+PARAMETROS_ARRASTO = {"quadratico": ("massa", "area", "cd"), "linear": ("massa", "area")}
+
+# Faixa válida dos parâmetros: nome -> (mínimo, se o mínimo é excluído)
+LIMITES = {
+    "massa": (0.0, True), "area": (0.0, True), "cd": (0.0, False), "mu": (0.0, False),
+    "distancia": (0.0, True), "t_max": (0.0, True),
+}
+
+
+# --- Leitura dos cenários ---
+def ler_cenarios(caminho):
+    """Lista de cenários (dicionários de texto ou números) de um arquivo CSV, JSON ou YAML."""
+    extensao = os.path.splitext(caminho)[1].lower()
+    with open(caminho, encoding="utf-8-sig") as arquivo:
+        if extensao == ".csv":
+            texto = arquivo.read()
+            try:
+                dialeto = csv.Sniffer().sniff(texto.partition("\n")[0], delimiters=",;\t")
+            except csv.Error:
+                # Cabeçalho de uma coluna só: não há separador para descobrir
+                dialeto = csv.excel
+            linhas = csv.DictReader(texto.splitlines(), dialect=dialeto)
+            return [{chave.strip(): valor for chave, valor in linha.items() if chave and valor not in (None, "")}
+                    for linha in linhas]
+        if extensao == ".json":
+            dados = json.load(arquivo)
+        elif extensao in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("Arquivos YAML exigem o PyYAML (pip install pyyaml).") from None
+            dados = yaml.safe_load(arquivo)
+        else:
+            raise ValueError(f"Formato de arquivo desconhecido: {extensao} (use .csv, .json ou .yaml)")
+
+    if isinstance(dados, dict):
+        dados = dados.get("cenarios")
+    if not isinstance(dados, list) or not all(isinstance(cenario, dict) for cenario in dados):
+        raise ValueError("O arquivo deve conter uma lista de cenários (objetos com tipo e parâmetros).")
+    return dados
+
+
+def _numero(valor):
+    # Aceita a vírgula decimal das planilhas em português
+    if isinstance(valor, str):
+        valor = valor.strip().replace(",", ".")
+    return float(valor)
+
+
+def preparar(cenario, numero):
+    """
+    Cenário validado: tipo, nome e todos os parâmetros do tipo como números
+    (com os valores padrão). Levanta ValueError com o número do cenário.
+    """
+    cenario = {str(chave).strip().lower(): valor for chave, valor in cenario.items() if valor is not None}
+    tipo = str(cenario.pop("tipo", "")).strip().lower()
+    if tipo not in PARAMETROS:
+        raise ValueError(f"Cenário {numero}: tipo '{tipo}' desconhecido (use {', '.join(PARAMETROS)}).")
+    nome = str(cenario.pop("nome", "")).strip() or f"{tipo}-{numero}"
+    modelo = str(cenario.pop("modelo", "")).strip().lower() or None
+    if modelo is not None and (tipo != "projetil" or modelo not in MODELOS):
+        raise ValueError(f"Cenário {numero}: modelo de arrasto '{modelo}' inválido.")
+
+    desconhecidos = set(cenario) - set(PARAMETROS[tipo])
+    if desconhecidos:
+        raise ValueError(f"Cenário {numero}: parâmetros desconhecidos para {tipo}: {', '.join(sorted(desconhecidos))}.")
+
+    obrigatorios = {n for n, padrao in PARAMETROS[tipo].items() if padrao is None}
+    if tipo == "projetil":
+        obrigatorios = {"v0", "angulo"} | set(PARAMETROS_ARRASTO.get(modelo, ()))
+    faltando = sorted(obrigatorios - set(cenario))
+    if faltando:
+        raise ValueError(f"Cenário {numero}: faltam os parâmetros {', '.join(faltando)}.")
+
+    parametros = {}
+    for nome_parametro, padrao in PARAMETROS[tipo].items():
+        valor = cenario.get(nome_parametro, padrao)
+        try:
+            parametros[nome_parametro] = None if valor is None else _numero(valor)
+        except ValueError:
+            raise ValueError(f"Cenário {numero}: {nome_parametro} = '{valor}' não é um número.") from None
+
+        numero_lido = parametros[nome_parametro]
+        if numero_lido is not None and not np.isfinite(numero_lido):
+            raise ValueError(f"Cenário {numero}: {nome_parametro} = '{valor}' não é um número finito.")
+        if numero_lido is not None and nome_parametro in LIMITES:
+            minimo, excluido = LIMITES[nome_parametro]
+            if numero_lido < minimo or (excluido and numero_lido == minimo):
+                relacao = "maior que" if excluido else "maior ou igual a"
+                raise ValueError(f"Cenário {numero}: {nome_parametro} deve ser {relacao} {minimo:g} (recebido: {valor}).")
+    if tipo == "projetil":
+        parametros["modelo"] = modelo
+    return dict(numero=numero, tipo=tipo, nome=nome, parametros=parametros)
+
+
+# --- Cálculo de cada tipo (respostas e dados da figura) ---
+def _projetil(v0, angulo, g, h0, h_impacto, massa, area, cd, modelo):
+    ang = np.radians(angulo)
+    if modelo is None:
+        resultado = calcular_trajetoria_lote(v0, ang, g, h0, h_impacto)
+    else:
+        k = coeficiente_quadratico(cd, area) if modelo == "quadratico" else coeficiente_linear(area)
+        resultado = calcular_trajetoria_arrasto(v0, ang, g, h0, h_impacto, k, massa, modelo, num=200)
+    situacao = int(resultado["situacao"])
+
+    respostas = {nome: float(resultado[nome])
+                 for nome in ("alcance", "altura_max", "t_altura_max", "t_voo", "velocidade_final")}
+    respostas["situacao"] = MENSAGENS.get(situacao, "")
+
+    curvas = []
+    if situacao in (OK, IMPACTO_INALCANCAVEL):
+        if modelo is None:
+            # Como no simulador: a grade passa exatamente pelo ápice e termina no impacto
+            t = grade_com_eventos(0, respostas["t_voo"], 200, [respostas["t_altura_max"]])
+            x, y = posicoes(v0, ang, g, h0, t)
+        else:
+            x, y = resultado["x"], resultado["y"]
+        curvas.append(dict(x=x, y=y, label="Trajetória"))
+    figura = dict(curvas=curvas, pontos=[(respostas["alcance"], h_impacto)] if situacao == OK else [],
+                  titulo="Trajetória do Projétil", xlabel="Distância Horizontal (m)", ylabel="Altura (m)")
+    return respostas, figura
+
+
+def _mu(s0, v, t_max):
+    return _muv(s0, v, 0.0, t_max)
+
+
+def _muv(s0, v0, a, t_max):
+    t, s = muv.trajetoria(s0, v0, a, t_max)
+    respostas = dict(posicao_final=float(s[-1]), velocidade_final=float(muv.velocidade(v0, a, t_max)))
+    figura = dict(curvas=[dict(x=t, y=s, label="Posição")], pontos=[],
+                  titulo="Posição ao Longo do Tempo", xlabel="Tempo (s)", ylabel="Posição (m)")
+    return respostas, figura
+
+
+def _encontro(s0_1, v_1, a_1, s0_2, v_2, a_2, t_max):
+    tempos = encontro.tempos_encontro(s0_1, v_1, a_1, s0_2, v_2, a_2)
+    respostas = {}
+    for i in range(2):
+        t = tempos[i] if i < len(tempos) else math.nan
+        respostas[f"t_encontro_{i + 1}"] = t
+        respostas[f"posicao_encontro_{i + 1}"] = float(muv.posicao(s0_1, v_1, a_1, t))
+
+    t, pos_1, pos_2 = encontro.posicoes(s0_1, v_1, a_1, s0_2, v_2, a_2, t_max)
+    figura = dict(curvas=[dict(x=t, y=pos_1, label="Móvel 1"), dict(x=t, y=pos_2, label="Móvel 2", linestyle="--")],
+                  pontos=[(t, muv.posicao(s0_1, v_1, a_1, t)) for t in tempos if t <= t_max],
+                  titulo="Encontro dos Móveis", xlabel="Tempo (s)", ylabel="Posição (m)")
+    return respostas, figura
+
+
+def _bloco(massa, forca, mu, distancia, g):
+    resultado = dinamica.bloco_com_atrito(massa, forca, mu, distancia, g)
+    respostas = {nome: float(valor) for nome, valor in resultado.items()}
+    respostas["velocidade_final"] = respostas["aceleracao"] * respostas["t_total"]
+    respostas["situacao"] = "" if respostas["aceleracao"] > 0 else "O bloco permanece em repouso."
+
+    t = np.linspace(0, respostas["t_total"], 101)
+    posicao, _ = dinamica.estado_bloco(respostas["aceleracao"], t)
+    figura = dict(curvas=[dict(x=t, y=posicao, label="Posição do bloco")] if respostas["aceleracao"] > 0 else [],
+                  pontos=[], titulo="Bloco com Atrito", xlabel="Tempo (s)", ylabel="Posição (m)")
+    return respostas, figura
+
+
+CALCULOS = dict(projetil=_projetil, mu=_mu, muv=_muv, encontro=_encontro, bloco=_bloco)
+
+
+# --- Execução de um cenário (em um processo de trabalho) ---
+def _nome_arquivo(cenario):
+    nome = re.sub(r"[^\w-]+", "-", cenario["nome"]).strip("-") or cenario["tipo"]
+    return f"{cenario['numero']:03d}-{nome}"
+
+
+def _salvar_figura(figura, caminho_base, formatos):
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(8, 5))
+    ax = fig.add_subplot()
+    for curva in figura["curvas"]:
+        curva = dict(curva)
+        ax.plot(curva.pop("x"), curva.pop("y"), linewidth=2, **curva)
+    for x, y in figura["pontos"]:
+        ax.plot(x, y, "o", color="red", markersize=8)
+    ax.set_title(figura["titulo"])
+    ax.set_xlabel(figura["xlabel"])
+    ax.set_ylabel(figura["ylabel"])
+    ax.grid(True, linestyle="--", alpha=0.7)
+    if figura["curvas"]:
+        ax.legend()
+
+    arquivos = []
+    for formato in formatos:
+        caminho = f"{caminho_base}.{formato}"
+        fig.savefig(caminho, format=formato, dpi=120, bbox_inches="tight")
+        arquivos.append(caminho)
+    return arquivos
+
+
+def executar_cenario(cenario, pasta_figuras=None, formatos=("png",)):
+    """Respostas de um cenário preparado e, com pasta_figuras, os caminhos das figuras gravadas."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        respostas, figura = CALCULOS[cenario["tipo"]](**cenario["parametros"])
+    arquivos = []
+    if pasta_figuras is not None:
+        arquivos = _salvar_figura(figura, os.path.join(pasta_figuras, _nome_arquivo(cenario)), formatos)
+    return dict(cenario, respostas=respostas, figuras=arquivos)
+
+
+def executar_lote(cenarios, pasta_figuras=None, formatos=("png",), processos=None):
+    """
+    Executa os cenários preparados e devolve os resultados na ordem de entrada.
+
+    processos é o número de processos de trabalho (None: um por CPU; 1: tudo
+    no processo atual).
+    """
+    if processos is None:
+        processos = os.cpu_count() or 1
+    processos = max(1, min(processos, len(cenarios)))
+    argumentos = (cenarios, [pasta_figuras] * len(cenarios), [tuple(formatos)] * len(cenarios))
+
+    if processos > 1:
+        with ProcessPoolExecutor(processos, mp_context=contexto_processos()) as executor:
+            return list(executor.map(executar_cenario, *argumentos,
+                                     chunksize=math.ceil(len(cenarios) / (4 * processos))))
+    return list(map(executar_cenario, *argumentos))
+
+
+# --- Gravação dos resultados ---
+def _texto(valor):
+    if valor is None or (isinstance(valor, float) and math.isnan(valor)):
+        return ""
+    if isinstance(valor, float):
+        return f"{valor:.6g}"
+    return valor
+
+
+def _json(valor):
+    # NaN não existe em JSON: vira null
+    if isinstance(valor, float) and math.isnan(valor):
+        return None
+    return valor
+
+
+def gravar_resultados(resultados, pasta):
+    """Grava um CSV por tipo de cenário e resultados.json; devolve os caminhos dos arquivos."""
+    arquivos = []
+    for tipo in PARAMETROS:
+        linhas = [r for r in resultados if r["tipo"] == tipo]
+        if not linhas:
+            continue
+        colunas = ["nome", *linhas[0]["parametros"], *linhas[0]["respostas"], "figuras"]
+        caminho = os.path.join(pasta, f"{tipo}.csv")
+        with open(caminho, "w", newline="", encoding="utf-8") as arquivo:
+            escritor = csv.writer(arquivo)
+            escritor.writerow(colunas)
+            for r in linhas:
+                figuras = " ".join(os.path.relpath(f, pasta) for f in r["figuras"])
+                escritor.writerow([r["nome"], *map(_texto, r["parametros"].values()),
+                                   *map(_texto, r["respostas"].values()), figuras])
+        arquivos.append(caminho)
+
+    caminho = os.path.join(pasta, "resultados.json")
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump([dict(r, parametros={n: _json(v) for n, v in r["parametros"].items()},
+                        respostas={n: _json(v) for n, v in r["respostas"].items()},
+                        figuras=[os.path.relpath(f, pasta) for f in r["figuras"]]) for r in resultados],
+                  arquivo, indent=2, ensure_ascii=False)
+    arquivos.append(caminho)
+    return arquivos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calcula cenários em lote e grava respostas e figuras.")
+    parser.add_argument("cenarios", help="arquivo .csv, .json ou .yaml com os cenários")
+    parser.add_argument("--saida", default="resultados", help="pasta dos resultados (padrão: resultados)")
+    parser.add_argument("--formatos", nargs="+", choices=FORMATOS, default=["png"], help="formatos das figuras")
+    parser.add_argument("--sem-figuras", action="store_true", help="grava só as tabelas de resultados")
+    parser.add_argument("--processos", type=int, help="processos de trabalho (padrão: um por CPU)")
+    args = parser.parse_args(argv)
+
+    try:
+        cenarios = [preparar(cenario, numero) for numero, cenario in enumerate(ler_cenarios(args.cenarios), 1)]
+    except (OSError, ValueError, csv.Error) as erro:
+        print(f"Erro: {erro}", file=sys.stderr)
+        return 2
+    if not cenarios:
+        print("Nenhum cenário no arquivo.", file=sys.stderr)
+        return 2
+
+    pasta_figuras = None if args.sem_figuras else os.path.join(args.saida, "figuras")
+    os.makedirs(pasta_figuras or args.saida, exist_ok=True)
+
+    inicio = time.perf_counter()
+    resultados = executar_lote(cenarios, pasta_figuras, args.formatos, args.processos)
+    arquivos = gravar_resultados(resultados, args.saida)
+
+    print(f"{len(resultados)} cenário(s) em {time.perf_counter() - inicio:.1f} s.")
+    for caminho in arquivos:
+        print(f"  {caminho}")
+    if pasta_figuras:
+        print(f"  {pasta_figuras}{os.sep} ({sum(len(r['figuras']) for r in resultados)} figura(s))")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
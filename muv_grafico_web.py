@@ -1,7 +1,17 @@
 import streamlit as st
-import matplotlib.pyplot as plt
-import numpy as np
-import time
+
+from amostragem import amostrar_adaptativo, escala_eixos
+from animacao import CenaAnimada, TrilhaIncremental, exibir_animacao, formatos_disponiveis
+from animacao_navegador import animacao_navegador, metrica, serie
+from cache import CACHE_CALCULOS, memoizar
+from cache_disco import ARMAZEM
+from codificacao import opcoes_imagem
+from fisica import muv
+from instrumentacao import iniciar_execucao, painel_desempenho, terminar_execucao
+from reproducao import iniciar_reproducao, reproducao_atual
+
+# Tempo de cada execução e das suas etapas (instrumentacao.py)
+iniciar_execucao('muv')
 
 # --- Título da página web ---
 import streamlit as st
@@ -29,6 +39,14 @@ with st.sidebar:
     a = st.slider('Aceleração (a em m/s²)', min_value=-10.0, max_value=10.0, value=1.0, step=0.1)
     t_max = st.slider('Tempo Final (t em s)', min_value=1.0, max_value=20.0, value=10.0, step=0.5)
     velocidade_animacao = st.slider('Velocidade da Animação (segundos)', min_value=0.01, max_value=1.0, value=0.1, step=0.01)
+    modo_animacao = st.radio('Modo da Animação', ['Quadro a quadro', 'Vídeo único', 'Navegador'], horizontal=True,
+                             help='No modo vídeo único a animação é gerada uma vez no servidor e reproduzida pelo navegador. '
+                                  'No modo navegador a trajetória é enviada uma vez e o próprio navegador desenha a animação.')
+    if modo_animacao == 'Vídeo único':
+        formato_video = st.selectbox('Formato do Vídeo', formatos_disponiveis())
+
+# Resolução, formato e limite de bytes dos quadros pela tela do aluno (codificacao.py); o gráfico ocupa 4/5 da largura
+imagem_quadros, _ = opcoes_imagem(fracao=0.8, estatico=False)
 
 # --- Criação das Colunas Principais ---
 col_grafico, col_contadores = st.columns([4, 1])
@@ -44,57 +62,106 @@ with col_contadores:
     tempo_metric = st.empty()
     st.markdown("---")
 
+# Posições ao longo de todo o movimento, memorizadas entre reruns (cache.py)
+@memoizar(CACHE_CALCULOS)
+def trajetoria_muv(s0, v0, a, t_max, num):
+    return muv.trajetoria(s0, v0, a, t_max, num)
+
+
 # Botão para iniciar a animação
-if st.button('Iniciar Animação'):
-    
-    # Prepara o gráfico
-    fig, ax = plt.subplots(figsize=(4, 6))
+iniciar = st.button('Iniciar Animação')
+
+# A animação quadro a quadro fica na sessão (reproducao.py) e continua depois das reexecuções
+parametros = (s0, v0, a, t_max)
+reproducao = reproducao_atual('muv', parametros)
+
+if iniciar and modo_animacao == 'Navegador':
+    # Envia as posições uma única vez; o navegador anima o gráfico e os contadores
+    tempos, posicoes = trajetoria_muv(s0, v0, a, t_max, 101)
+    with grafico_placeholder.container():
+        animacao_navegador(
+            tempos, [serie(tempos, posicoes, cor='blue', tracejada=True, espessura=1, cor_ponto='red')],
+            xlim=(0, t_max), ylim=(posicoes.min() - 5, posicoes.max() + 5),
+            xlabel='Tempo (s)', ylabel='Posição (m)',
+            metricas=[metrica('Posição (m)', posicoes), metrica('Tempo (s)', tempos)],
+            intervalo=velocidade_animacao, altura=550,
+        )
+
+elif iniciar:
     
-    # Inicia a animação em um loop
+    # Prepara o gráfico uma única vez: eixos, limites e grade
+    dpi = imagem_quadros.dpi((4, 6))
+    cena = CenaAnimada(figsize=(4, 6), dpi=dpi)
+    ax = cena.ax
+    # ax.set_title('Movimento do Ponto ao Longo do Tempo')  # Esta linha foi removida/comentada
+    ax.set_xlabel('Tempo (s)')
+    ax.set_ylabel('Posição (m)')
+    ax.grid(True)
+    ax.set_xlim(0, t_max)
+
+    # Calcula os limites do eixo Y com base na trajetória
+    t_completo, posicoes_completas = trajetoria_muv(s0, v0, a, t_max, 101)
+    y_min = posicoes_completas.min() - 5
+    y_max = posicoes_completas.max() + 5
+    ax.set_ylim(y_min, y_max)
+
+    ax.axhline(0, color='black', linewidth=0.5)
+    ax.axvline(0, color='black', linewidth=0.5)
+
+    # Artistas móveis: linha de trajetória e ponto atual
+    linha_trajetoria = cena.linha(color='blue', linestyle='--', linewidth=1)
+    ponto_atual = cena.linha('ro', markersize=10, label='Ponto Atual')
+
+    # Trajetória inteira calculada uma vez, com mais pontos onde a parábola se curva (amostragem.py).
+    # A cada quadro a trilha só avança no buffer.
+    tempos_trajetoria = amostrar_adaptativo(lambda t: (t, muv.posicao(s0, v0, a, t)), 0, t_max, escala_eixos(ax))
+    trilha = TrilhaIncremental(linha_trajetoria, tempos_trajetoria, tempos_trajetoria,
+                               muv.posicao(s0, v0, a, tempos_trajetoria))
+
     num_steps = 100
-    progress_bar = st.progress(0)
 
-    for i in range(num_steps + 1):
+    def desenhar_quadro(i):
         t_atual = t_max * i / num_steps
         
         # --- EQUAÇÃO DO M.U.V. ---
-        posicao_atual = s0 + v0 * t_atual + 0.5 * a * t_atual**2
+        posicao_atual = muv.posicao(s0, v0, a, t_atual)
 
-        progress_bar.progress(i / num_steps)
-        
-        ax.cla()
-        
-        # Redesenha os limites e eixos
-        # ax.set_title('Movimento do Ponto ao Longo do Tempo')  # Esta linha foi removida/comentada
-        ax.set_xlabel('Tempo (s)')
-        ax.set_ylabel('Posição (m)')
-        ax.grid(True)
-        ax.set_xlim(0, t_max)
-        
-        # Calcula os limites do eixo Y com base na trajetória
-        t_completo = np.linspace(0, t_max, 100)
-        posicoes_completas = s0 + v0 * t_completo + 0.5 * a * t_completo**2
-        y_min = posicoes_completas.min() - 5
-        y_max = posicoes_completas.max() + 5
-        ax.set_ylim(y_min, y_max)
-        
-        ax.axhline(0, color='black', linewidth=0.5)
-        ax.axvline(0, color='black', linewidth=0.5)
-        
         # Desenha a linha de trajetória
-        tempos_trajetoria = np.linspace(0, t_atual, 100)
-        posicoes_trajetoria = s0 + v0 * tempos_trajetoria + 0.5 * a * tempos_trajetoria**2
-        ax.plot(tempos_trajetoria, posicoes_trajetoria, color='blue', linestyle='--', linewidth=1)
+        trilha.mostrar(t_atual, t_atual, posicao_atual)
         
         # Desenha o ponto atual
-        ax.plot(t_atual, posicao_atual, 'ro', markersize=10, label='Ponto Atual')
+        ponto_atual.set_data([t_atual], [posicao_atual])
+        return t_atual, posicao_atual
 
-        # Atualiza o gráfico e os contadores
-        posicao_metric.metric(label="Posição (m)", value=f"{posicao_atual:.2f}")
-        tempo_metric.metric(label="Tempo (s)", value=f"{t_atual:.2f}")
-        
-        grafico_placeholder.pyplot(fig)
-        
-        time.sleep(velocidade_animacao)
+    # Quadros e vídeos ficam no armazém em disco, compartilhados entre as sessões (cache_disco.py)
+    opcoes_figura = dict(figsize=(4, 6), dpi=dpi, num_steps=num_steps)
+
+    if modo_animacao == 'Vídeo único':
+        # Codifica todos os quadros uma vez e envia um único arquivo ao navegador
+        chave_video = ARMAZEM.chave('muv', parametros,
+                                    dict(opcoes_figura, formato=formato_video, intervalo=velocidade_animacao))
+        with st.spinner('Gerando a animação...'):
+            video = ARMAZEM.obter_ou_gerar(chave_video, lambda: cena.exportar(
+                desenhar_quadro, num_steps + 1, 1 / velocidade_animacao, formato_video))
+        exibir_animacao(grafico_placeholder, video, formato_video)
+
+        # Contadores com os valores finais
+        posicao_metric.metric(label="Posição (m)", value=f"{posicoes_completas[-1]:.2f}")
+        tempo_metric.metric(label="Tempo (s)", value=f"{t_max:.2f}")
+        st.success('Animação concluída!')
+    else:
+        # Gráfico e contadores de um quadro; quem chama é o fragmento da reprodução
+        def quadro(i):
+            t_atual, posicao_atual = desenhar_quadro(i)
+            chave_quadro = ARMAZEM.chave('muv', parametros, dict(opcoes_figura, quadro=i, imagem=imagem_quadros.opcoes()))
+            imagem = cena.quadro_codificado(imagem_quadros, ARMAZEM, chave_quadro)
+            return imagem, [("Posição (m)", f"{posicao_atual:.2f}"), ("Tempo (s)", f"{t_atual:.2f}")]
+
+        reproducao = iniciar_reproducao('muv', quadro, num_steps + 1, parametros)
+
+if reproducao and modo_animacao == 'Quadro a quadro':
+    reproducao.exibir(velocidade_animacao, grafico_placeholder, [posicao_metric, tempo_metric])
 
-    st.success('Animação concluída!')
\ No newline at end of file
+# Painel de desempenho (com ?debug=1 na URL) e fim da medição desta execução
+painel_desempenho()
+terminar_execucao()
@@ -0,0 +1,39 @@
+"""
+Portal do Laboratório de Física: todos os simuladores em um único app.
+
+    streamlit run portal.py
+
+Cada simulador continua sendo um script próprio (e ainda pode ser aberto
+sozinho com streamlit run) e vira uma página do st.navigation. O script de
+uma página só roda quando ela é aberta: Matplotlib, o núcleo de física e os
+módulos de animação são importados na primeira visita a um simulador, e não
+na partida do servidor. Um único processo atende o laboratório inteiro.
+"""
+import streamlit as st
+
+st.set_page_config(page_title="Laboratório de Física - Prof. Ojeda", layout="wide")
+
+
+def inicio():
+    st.title("Bem-vindo ao Laboratório Virtual de Física")
+    st.markdown("""
+    Este portal reúne os simuladores do laboratório. Escolha um deles no **menu lateral**,
+    ajuste os parâmetros nos controles e clique no botão **Iniciar** para ver a física acontecer!
+    """)
+    for pagina in SIMULADORES:
+        st.page_link(pagina)
+
+
+# --- Páginas: os scripts só são executados (e importam suas dependências) quando abertos ---
+SIMULADORES = [
+    st.Page("mu_grafico_web.py", title="Movimento Uniforme (M.U.)", icon="➡️"),
+    st.Page("muv_grafico_web.py", title="Movimento Uniformemente Variado (M.U.V.)", icon="⏩"),
+    st.Page("encontro_todos_mov_web.py", title="Encontro de Móveis", icon="🚗"),
+    st.Page("simulador_projetil_web.py", title="Lançamento de Projétil", icon="🎯"),
+    st.Page("simulador_dinamica.py", title="Dinâmica e Encontro Frontal", icon="📦"),
+]
+
+st.navigation({
+    "": [st.Page(inicio, title="Início", icon="🏠", default=True)],
+    "Simuladores": SIMULADORES,
+}).run()
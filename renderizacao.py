@@ -0,0 +1,142 @@
+"""
+Renderização antecipada dos quadros da reprodução.
+
+O fragmento da reprodução (reproducao.py) renderizava cada quadro na hora de
+mostrá-lo: desenhava, codificava o PNG, enviava e só então esperava o
+intervalo. A primeira reprodução de um cenário novo travava a cada quadro
+lento (vetores, trilhas longas, muitos móveis).
+
+Aqui threads de renderização trabalham à frente da posição exibida e deixam
+os quadros prontos em uma janela limitada (ANTECIPACAO quadros depois da
+posição atual): quando a janela está cheia, elas param e esperam a
+reprodução avançar. Buscar outra posição descarta os quadros fora da nova
+janela, e cancelar() encerra o trabalho quando os parâmetros mudam.
+
+Uma figura do Matplotlib não pode ser desenhada por duas threads ao mesmo
+tempo, então cada thread tem a sua função de quadro: a primeira usa a cena
+já montada e as demais são criadas por montar(), que monta outra cena igual.
+As threads só existem enquanto há quadros a renderizar na janela.
+
+    fila = RenderizacaoAntecipada(quadro, n_quadros, montar=montar_quadro)
+    imagem, valores = fila.obter(i, espera=0.1)  # None se o quadro i não ficou pronto a tempo
+"""
+import os
+import threading
+
+from instrumentacao import app_atual, iniciar_execucao, terminar_execucao
+
+# Quadros renderizados à frente da posição exibida
+ANTECIPACAO = 24
+
+# Threads de renderização por reprodução (só com montar(); sem ele, uma única thread)
+TRABALHADORES = min(4, os.cpu_count() or 1)
+
+
+class RenderizacaoAntecipada:
+    """
+    Quadros de uma animação renderizados em segundo plano, à frente da posição atual.
+
+    quadro(i) devolve o quadro i (na reprodução, o PNG e os contadores);
+    montar(), opcional, devolve outra função de quadro com uma cena própria,
+    para renderizar em mais de uma thread.
+    """
+
+    def __init__(self, quadro, n_quadros, montar=None, trabalhadores=None, antecipacao=ANTECIPACAO):
+        self.n_quadros = n_quadros
+        self.antecipacao = antecipacao
+        self._montar = montar
+        if trabalhadores is None:
+            trabalhadores = TRABALHADORES if montar is not None else 1
+        # Funções de quadro livres; None é uma cena ainda não montada
+        self._livres = [quadro] + [None] * (trabalhadores - 1)
+        self._prontos = {}
+        self._pendentes = set()
+        self._inicio = 0
+        self._cancelada = False
+        self._erro = None
+        self._condicao = threading.Condition()
+
+        with self._condicao:
+            self._acionar()
+
+    # --- Janela de quadros ---
+    def _janela(self):
+        return range(self._inicio, min(self._inicio + self.antecipacao, self.n_quadros))
+
+    def _proximo(self):
+        """Primeiro quadro da janela ainda não renderizado nem em renderização, ou None."""
+        for i in self._janela():
+            if i not in self._prontos and i not in self._pendentes:
+                return i
+        return None
+
+    def _acionar(self):
+        """Inicia threads (com a trava adquirida) enquanto houver funções livres e quadros a fazer."""
+        faltando = sum(1 for i in self._janela() if i not in self._prontos and i not in self._pendentes)
+        while self._livres and faltando > 0 and not self._cancelada and self._erro is None:
+            quadro = self._livres.pop()
+            threading.Thread(target=self._trabalhar, args=(quadro, app_atual()), daemon=True).start()
+            faltando -= 1
+
+    def _trabalhar(self, quadro, app):
+        # Cada thread é uma execução do app que pediu os quadros (instrumentacao.py)
+        iniciar_execucao(app, "renderizacao")
+        try:
+            if quadro is None:
+                quadro = self._montar()
+            while True:
+                with self._condicao:
+                    i = None if self._cancelada or self._erro is not None else self._proximo()
+                    if i is None:
+                        # Sem trabalho: devolve a função de quadro na mesma trava em que viu a janela completa
+                        self._livres.append(quadro)
+                        return
+                    self._pendentes.add(i)
+
+                resultado = quadro(i)
+
+                with self._condicao:
+                    self._pendentes.discard(i)
+                    if i in self._janela() and not self._cancelada:
+                        self._prontos[i] = resultado
+                    self._condicao.notify_all()
+        except Exception as erro:
+            with self._condicao:
+                self._erro = erro
+                self._condicao.notify_all()
+        finally:
+            terminar_execucao()
+
+    # --- Consumo ---
+    def posicionar(self, i):
+        """Move a janela para começar no quadro i: descarta os quadros fora dela e retoma a renderização."""
+        with self._condicao:
+            self._inicio = i
+            janela = self._janela()
+            for j in [j for j in self._prontos if j not in janela]:
+                del self._prontos[j]
+            self._acionar()
+
+    def obter(self, i, espera=None):
+        """
+        Quadro i, esperando no máximo espera segundos (None: até ficar pronto).
+
+        Um quadro fora da janela atual move a janela para ele. Devolve None se
+        o quadro não ficou pronto a tempo; um erro da renderização é
+        levantado aqui, na thread de quem pediu o quadro.
+        """
+        with self._condicao:
+            if i not in self._janela():
+                self.posicionar(i)
+            self._condicao.wait_for(lambda: i in self._prontos or self._erro is not None or self._cancelada,
+                                    timeout=espera)
+            if self._erro is not None:
+                raise self._erro
+            return self._prontos.get(i)
+
+    def cancelar(self):
+        """Encerra a renderização: as threads terminam o quadro em andamento e param."""
+        with self._condicao:
+            self._cancelada = True
+            self._prontos.clear()
+            self._condicao.notify_all()
@@ -0,0 +1,191 @@
+"""
+Reprodução quadro a quadro sem bloquear a sessão.
+
+O botão "Iniciar Animação" rodava um laço com time.sleep no script principal:
+enquanto a animação corria a sessão não respondia, e mexer em qualquer
+controle interrompia a animação e rodava o script inteiro de novo.
+
+Aqui a cena já montada (figura, artistas e trajetória calculada) fica
+guardada no st.session_state, e um fragmento (st.fragment com run_every)
+redesenha a cada intervalo apenas o gráfico, os contadores e os controles de
+reprodução: tocar/pausar, posição e velocidade. O custo de cada quadro no
+servidor é só o redesenho; mudar a posição ou a velocidade reexecuta apenas
+o fragmento.
+
+Os quadros são renderizados em segundo plano, à frente da posição exibida
+(renderizacao.py): o fragmento só pega o quadro pronto. Se o próximo quadro
+ainda não ficou pronto no intervalo, o atual é repetido em vez de travar a
+reprodução.
+
+Uso típico em qualquer um dos simuladores:
+
+    reproducao = reproducao_atual('mu', parametros)
+    if iniciar:
+        ...                                  # monta a cena uma vez
+        reproducao = iniciar_reproducao('mu', quadro, n_quadros, parametros)
+    if reproducao:
+        reproducao.exibir(intervalo, grafico_placeholder, [posicao_metric, tempo_metric])
+
+em que quadro(i) devolve a imagem do quadro i (codificacao.py) e os contadores [(rótulo, valor), ...].
+Com montar (uma função que monta outra cena igual e devolve o seu quadro),
+os quadros são renderizados em várias threads.
+"""
+import time
+
+import streamlit as st
+
+from codificacao import exibir_imagem
+from instrumentacao import app_atual, contar_quadro, execucao, medir, observar
+from renderizacao import RenderizacaoAntecipada
+
+VELOCIDADES = (0.25, 0.5, 1.0, 2.0, 4.0)
+
+
+class Reproducao:
+    """
+    Animação guardada na sessão: a função que gera os quadros, o quadro atual
+    e o estado dos controles.
+
+    A posição é fracionária para as velocidades menores que 1×: a 0,5× cada
+    quadro aparece em duas execuções seguidas do fragmento.
+    """
+
+    def __init__(self, chave, quadro, n_quadros, parametros, montar=None):
+        self.chave = chave
+        # Os quadros são medidos como execuções do app que montou a reprodução (instrumentacao.py)
+        self.app = app_atual(chave)
+        self.renderizacao = RenderizacaoAntecipada(quadro, n_quadros, montar=montar)
+        self.n_quadros = n_quadros
+        self.parametros = parametros
+        self.posicao = 0.0
+        self.velocidade = st.session_state.get(f"{chave}-velocidade", 1.0)
+        self.tocando = True
+        # Na próxima execução o quadro atual é mostrado sem avançar (início, busca, troca de velocidade)
+        self._segurar = True
+        self._com_relogio = False
+        self._intervalo = None
+        self._exibido_em = None
+
+    @property
+    def indice(self):
+        return int(self.posicao)
+
+    @property
+    def terminou(self):
+        return self.indice >= self.n_quadros - 1
+
+    # --- Controles (callbacks dos widgets) ---
+    def _alternar(self):
+        if self.terminou and not self.tocando:
+            self.posicao = 0.0
+        self.tocando = not self.tocando
+        self._segurar = True
+
+    def _buscar(self):
+        self.posicao = float(st.session_state[f"{self.chave}-quadro"])
+        self._segurar = True
+
+    def _mudar_velocidade(self):
+        self.velocidade = st.session_state[f"{self.chave}-velocidade"]
+        self._segurar = True
+
+    def cancelar(self):
+        """Interrompe a renderização dos quadros (a reprodução foi descartada)."""
+        self.renderizacao.cancelar()
+
+    # --- Exibição ---
+    def exibir(self, intervalo, grafico, metricas=()):
+        """
+        Mostra o quadro atual no placeholder do gráfico, os contadores nos
+        placeholders de metricas (na ordem devolvida por quadro(i)) e os
+        controles. Enquanto toca, o fragmento se reexecuta a cada intervalo
+        (segundos) e avança um quadro vezes a velocidade escolhida.
+        """
+        self._com_relogio = self.tocando
+        self._intervalo = intervalo
+        st.fragment(self._fragmento, run_every=intervalo if self.tocando else None)(grafico, metricas)
+
+    def _fragmento(self, grafico, metricas):
+        with execucao(self.app, "quadro"):
+            self._atualizar(grafico, metricas)
+
+    def _atualizar(self, grafico, metricas):
+        self.renderizacao.posicionar(self.indice)
+        anterior = self.indice
+        if self._segurar:
+            self._segurar = False
+        elif self.tocando:
+            proxima = min(self.posicao + self.velocidade, self.n_quadros - 1)
+            # Só avança para um quadro já renderizado; senão o atual é repetido nesta execução
+            with medir("espera_quadro"):
+                pronta = int(proxima) == self.indice or self.renderizacao.obter(int(proxima), self._intervalo)
+            if pronta is not None:
+                self.posicao = proxima
+        if self.tocando and self.terminou:
+            self.tocando = False
+
+        # O relógio do fragmento só liga ou desliga em uma execução completa
+        if self.tocando != self._com_relogio:
+            st.rerun()
+
+        with medir("espera_quadro"):
+            imagem, valores = self.renderizacao.obter(self.indice)
+        exibir_imagem(grafico, imagem)
+
+        # Quadros e bytes enviados e o intervalo real entre quadros novos, contra o pedido
+        agora = time.perf_counter()
+        if not self.tocando:
+            self._exibido_em = None
+        elif self.indice != anterior or self._exibido_em is None:
+            if self._exibido_em is not None:
+                observar("intervalo_quadro", agora - self._exibido_em)
+            self._exibido_em = agora
+        contar_quadro(len(imagem), 1 / self._intervalo if self.tocando else None)
+        for placeholder, (rotulo, valor) in zip(metricas, valores):
+            placeholder.metric(label=rotulo, value=valor)
+
+        col_tocar, col_quadro, col_velocidade = st.columns([1, 4, 2], vertical_alignment="center")
+        col_tocar.button("⏸️ Pausar" if self.tocando else "▶️ Tocar", key=f"{self.chave}-tocar",
+                         on_click=self._alternar)
+        # Com um quadro só (trajetória de um ponto) não há o que buscar: o slider não aceita mínimo = máximo
+        if self.n_quadros > 1:
+            st.session_state[f"{self.chave}-quadro"] = self.indice
+            col_quadro.slider("Quadro", 0, self.n_quadros - 1, key=f"{self.chave}-quadro",
+                              on_change=self._buscar)
+        if f"{self.chave}-velocidade" not in st.session_state:
+            st.session_state[f"{self.chave}-velocidade"] = self.velocidade
+        col_velocidade.select_slider("Velocidade", VELOCIDADES, key=f"{self.chave}-velocidade",
+                                     format_func=lambda v: f"{v:g}×".replace(".", ","),
+                                     on_change=self._mudar_velocidade)
+
+        if self.terminou:
+            st.success("Animação concluída!")
+
+
+def reproducao_atual(chave, parametros):
+    """
+    Reprodução guardada na sessão para estes parâmetros, ou None.
+
+    Uma reprodução montada com outros parâmetros é descartada: os controles
+    da barra lateral mudaram e a cena guardada não vale mais.
+    """
+    reproducao = st.session_state.get(f"{chave}-reproducao")
+    if reproducao is not None and reproducao.parametros != parametros:
+        reproducao.cancelar()
+        del st.session_state[f"{chave}-reproducao"]
+        return None
+    return reproducao
+
+
+def iniciar_reproducao(chave, quadro, n_quadros, parametros, montar=None):
+    """
+    Guarda na sessão uma nova reprodução, já tocando a partir do primeiro quadro, e a devolve.
+
+    A renderização de uma reprodução anterior com a mesma chave é cancelada.
+    """
+    anterior = st.session_state.get(f"{chave}-reproducao")
+    if anterior is not None:
+        anterior.cancelar()
+    reproducao = Reproducao(chave, quadro, n_quadros, parametros, montar)
+    st.session_state[f"{chave}-reproducao"] = reproducao
+    return reproducao
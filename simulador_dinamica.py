@@ -1,7 +1,18 @@
 import streamlit as st
-import matplotlib.pyplot as plt
 import numpy as np
-import time
+
+from matplotlib.patches import Circle, Polygon
+
+from animacao import CenaAnimada
+from cache import CACHE_CALCULOS, memoizar
+from codificacao import opcoes_imagem
+from dispersao import painel_incerteza
+from fisica import blocos, dinamica, encontro, mu
+from instrumentacao import iniciar_execucao, painel_desempenho, terminar_execucao
+from reproducao import iniciar_reproducao, reproducao_atual
+
+# Tempo de cada execução e das suas etapas (instrumentacao.py)
+iniciar_execucao("dinamica")
 
 # Configuração da página para o Laboratório do Prof. Ojeda
 st.set_page_config(page_title="Laboratório de Física - Prof. Ojeda", layout="wide")
@@ -13,6 +24,9 @@ modulo = st.sidebar.radio("Selecione o tema da aula:",
                           "🏃 Cinemática (Encontro)", 
                           "📦 Dinâmica (Força e Atrito)"])
 
+# Resolução, formato e limite de bytes dos quadros pela tela do aluno (codificacao.py)
+imagem_quadros, _ = opcoes_imagem(estatico=False)
+
 # ---------------------------------------------------------
 # TELA INICIAL
 # ---------------------------------------------------------
@@ -42,106 +56,289 @@ elif modulo == "🏃 Cinemática (Encontro)":
         dist_ini = st.slider("Distância entre eles (m)", 50, 500, 200)
         btn_cine = st.button("🏁 Iniciar Simulação")
 
-    # Cálculos
-    v_relativa = v_a - v_b
-    t_encontro = dist_ini / v_relativa
-    p_encontro = v_a * t_encontro
+    # Cálculos (fisica.encontro)
+    t_encontro, p_encontro = encontro.encontro_frontal(v_a, v_b, dist_ini)
 
     # Espaços para animação
-    met_c = st.empty()
+    c1, c2, c3 = st.columns(3)
+    met_c = [c1.empty(), c2.empty(), c3.empty()]
     graf_c = st.empty()
 
+    # A animação fica na sessão (reproducao.py) e continua depois das reexecuções
+    reproducao = reproducao_atual("dinamica-encontro", (v_a, v_b, dist_ini))
+
     if btn_cine:
+        # Figura montada uma vez; só os carros se movem
+        cena = CenaAnimada(figsize=(10, 2), dpi=imagem_quadros.dpi((10, 2)))
+        ax = cena.ax
+        ax.axhline(0, color='black', linewidth=1, linestyle='--')
+        carro_a = cena.linha('go', markersize=15, label="A")
+        carro_b = cena.linha('ro', markersize=15, label="B")
+        ax.set_xlim(-20, dist_ini + 20)
+        ax.set_ylim(-1, 1)
+        ax.axis('off')
+
         passos = 30
-        for i in range(passos + 1):
+
+        def quadro(i):
             t_atual = (i / passos) * t_encontro
-            pos_a = v_a * t_atual
-            pos_b = dist_ini + (v_b * t_atual)
-
-            with met_c.container():
-                c1, c2, c3 = st.columns(3)
-                c1.metric("Tempo", f"{t_atual:.2f} s")
-                c2.metric("Posição A", f"{pos_a:.1f} m")
-                c3.metric("Posição B", f"{pos_b:.1f} m")
-
-            fig, ax = plt.subplots(figsize=(10, 2))
-            ax.axhline(0, color='black', linewidth=1, linestyle='--')
-            ax.plot(pos_a, 0, 'go', markersize=15, label="A")
-            ax.plot(pos_b, 0, 'ro', markersize=15, label="B")
-            ax.set_xlim(-20, dist_ini + 20)
-            ax.set_ylim(-1, 1)
-            ax.axis('off')
-            
-            with graf_c.container():
-                st.pyplot(fig)
-            plt.close(fig)
-            time.sleep(0.08)
-        st.success(f"Encontro em {t_encontro:.2f}s na posição {p_encontro:.1f}m")
+            pos_a = mu.posicao(0, v_a, t_atual)
+            pos_b = mu.posicao(dist_ini, v_b, t_atual)
+
+            carro_a.set_data([pos_a], [0])
+            carro_b.set_data([pos_b], [0])
+
+            return cena.quadro_codificado(imagem_quadros), [("Tempo", f"{t_atual:.2f} s"), ("Posição A", f"{pos_a:.1f} m"),
+                                                            ("Posição B", f"{pos_b:.1f} m")]
+
+        reproducao = iniciar_reproducao("dinamica-encontro", quadro, passos + 1, (v_a, v_b, dist_ini))
+
+    if reproducao:
+        reproducao.exibir(0.08, graf_c, met_c)
+        if reproducao.terminou:
+            st.success(f"Encontro em {t_encontro:.2f}s na posição {p_encontro:.1f}m")
 
 # ---------------------------------------------------------
-# MÓDULO: DINÂMICA (ATRITO)
+# MÓDULO: DINÂMICA (FORÇA, ATRITO, RAMPAS E POLIAS)
 # ---------------------------------------------------------
 elif modulo == "📦 Dinâmica (Força e Atrito)":
     st.title("📦 Dinâmica: Leis de Newton e Atrito")
-    
+
+    # Ângulo de cada corpo (em graus) com a direção em que anda quando o sistema avança (fisica.blocos)
+    sistemas = {
+        "Bloco no plano": (0,),
+        "Bloco na rampa": ("rampa",),
+        "Bloco e corpo pendurado (polia)": (0, -90),
+        "Rampa e corpo pendurado (polia)": ("rampa", -90),
+        "Máquina de Atwood": (90, -90),
+    }
+    formas_forca = {"Constante": "constante", "Crescente": "rampa", "Pulso": "pulso"}
+
     with st.sidebar:
         st.markdown("---")
         st.header("Parâmetros")
-        m = st.slider("Massa do Bloco (kg)", 1.0, 50.0, 10.0)
-        f_ap = st.slider("Força Aplicada F (N)", 0.0, 400.0, 150.0)
-        coef_u = st.slider("Coeficiente de Atrito (µ)", 0.0, 1.0, 0.2)
+        sistema = st.selectbox("Sistema", list(sistemas))
+        atwood = sistema == "Máquina de Atwood"
+        inclinado = "rampa" in sistemas[sistema]
+        dois_corpos = len(sistemas[sistema]) == 2
+
+        m = st.slider("Massa 1 (kg)" if atwood else "Massa do Bloco (kg)", 1.0, 50.0, 10.0)
+        m2 = st.slider("Massa 2 (kg)" if atwood else "Massa do Corpo Pendurado (kg)", 1.0, 50.0, 5.0) if dois_corpos else 0.0
+        alfa = st.slider("Inclinação da Rampa (°)", 0, 60, 30) if inclinado else 0
+        f_ap = st.slider("Força Aplicada F (N)", 0.0, 400.0, 150.0 if sistema == "Bloco no plano" else 0.0,
+                         key=f"forca-{sistema}", help="Puxa o bloco no sentido do movimento (para a polia).")
+        forma_forca = st.selectbox("Forma da Força", list(formas_forca),
+                                   help="Crescente: sobe de 0 até F durante a duração. Pulso: F só durante a duração.")
+        duracao = st.slider("Duração (s)", 0.5, 10.0, 2.0, 0.5) if forma_forca != "Constante" else 0.0
+        if atwood:
+            coef_e = coef_u = 0.0
+        else:
+            coef_e = st.slider("Atrito Estático (µe)", 0.0, 1.0, 0.3)
+            coef_u = st.slider("Atrito Cinético (µc)", 0.0, 1.0, 0.2)
         d_percurso = st.slider("Distância (m)", 10.0, 400.0, 100.0)
         btn_din = st.button("🚀 Iniciar Bloco")
 
-    # Cálculos
-    g = 9.8
-    f_atrito = coef_u * m * g
-    f_res = f_ap - f_atrito
-    
-    if f_res > 0:
-        a = f_res / m
-        t_total = np.sqrt(2 * d_percurso / a)
+    if coef_u > coef_e:
+        st.warning("O atrito cinético costuma ser menor que o estático (µc ≤ µe).")
+
+    # Cálculos (fisica.blocos): o corpo pendurado não tem atrito
+    massas = (m, m2) if dois_corpos else (m,)
+    angulos = tuple(alfa if a == "rampa" else a for a in sistemas[sistema])
+    mu_e = (coef_e, 0.0)[:len(massas)]
+    mu_c = (coef_u, 0.0)[:len(massas)]
+
+    @memoizar(CACHE_CALCULOS)
+    def simular_sistema(massas, angulos, mu_e, mu_c, forma_forca, f_ap, duracao, distancia):
+        forca = blocos.forca_variavel(formas_forca[forma_forca], f_ap, duracao)
+        return blocos.simular(massas, np.radians(angulos), mu_e, mu_c, forca, distancia, t_max=60.0)
+
+    parametros_din = (massas, angulos, mu_e, mu_c, forma_forca, f_ap, duracao, d_percurso)
+    resultado = simular_sistema(*parametros_din)
+    eventos = resultado["eventos"]
+    t_chegada = float(resultado["t_chegada"])
+    if np.isfinite(t_chegada):
+        t_total = t_chegada
+    elif eventos["t"].size:
+        # Parou no meio do caminho: mostra até um segundo depois do último evento
+        t_total = min(float(eventos["t"][-1]) + 1.0, float(resultado["t"][-1]))
     else:
-        a = 0
-        t_total = 0
+        t_total = float(resultado["t"][-1])
 
-    met_d = st.empty()
+    d1, d2, d3, d4 = st.columns(4)
+    met_d = [d1.empty(), d2.empty(), d3.empty(), d4.empty()]
     graf_d = st.empty()
 
-    if btn_din and a > 0:
-        passos = 30
-        for i in range(passos + 1):
+    if eventos["t"].size:
+        st.caption("; ".join(f"t = {t:.2f} s: {blocos.EVENTOS[tipo]}"
+                             for t, tipo in zip(eventos["t"][:10], eventos["tipo"][:10])))
+    if resultado["fio_frouxo"]:
+        st.warning("Em algum momento a tração ficaria negativa: o fio afrouxaria e o modelo de fio esticado deixa de valer.")
+
+    # A animação fica na sessão (reproducao.py) e continua depois das reexecuções
+    reproducao = reproducao_atual("dinamica-bloco", parametros_din)
+
+    if btn_din and eventos["t"].size:
+        # Figura montada uma vez; blocos, fio, vetores e rótulos são os artistas móveis
+        figsize = (10, 6) if dois_corpos else (10, 4)
+        cena = CenaAnimada(figsize=figsize, dpi=imagem_quadros.dpi(figsize))
+        ax = cena.ax
+
+        # Geometria: cada corpo anda em linha reta, centro = inicio + s · direcao.
+        # A cena cobre só o trecho que o sistema percorre de fato.
+        s_min, s_max = float(resultado["posicao"].min()), float(resultado["posicao"].max())
+        percurso = max(s_max - s_min, 0.2 * d_percurso)
+        b = 0.06 * percurso           # lado dos blocos
+        c = 0.15 * percurso           # folga entre a polia e o ponto mais próximo dela
+        u_rampa = np.array([np.cos(np.radians(alfa)), np.sin(np.radians(alfa))])
+        n_rampa = np.array([-u_rampa[1], u_rampa[0]])
+        baixo = np.array([0.0, -1.0])
+        polia = None
+        if not dois_corpos:
+            inicio = [n_rampa * b / 2]
+            direcoes = [u_rampa]
+            superficie = ((s_min - c) * u_rampa, (s_max + c) * u_rampa)
+        else:
+            # O primeiro corpo se aproxima da polia quando s cresce e o segundo se afasta
+            r = 0.6 * b
+            polia = np.zeros(2)
+            saidas = [np.array([-r, 0.0]), np.array([r, 0.0])] if atwood else [r * n_rampa, np.array([r, 0.0])]
+            afastamentos = [baixo, baixo] if atwood else [-u_rampa, baixo]
+            inicio = [polia + saida + afastamento * distancia
+                      for saida, afastamento, distancia in zip(saidas, afastamentos, (c + s_max, c - s_min))]
+            direcoes = [-afastamentos[0], afastamentos[1]]
+            topo = polia + (r - b / 2) * n_rampa
+            superficie = None if atwood else (topo - u_rampa * (2 * c + s_max - s_min), topo)
+
+        pontos = [ini + d * s for ini, d in zip(inicio, direcoes) for s in (s_min, s_max)]
+        if superficie is not None:
+            a_sup, b_sup = superficie
+            base = min(a_sup[1], b_sup[1]) - b
+            ax.fill([a_sup[0], b_sup[0], b_sup[0], a_sup[0]], [a_sup[1], b_sup[1], base, base],
+                    color='burlywood', ec='saddlebrown', zorder=1)
+            pontos += [a_sup, b_sup, np.array([a_sup[0], base])]
+        if polia is not None:
+            ax.add_patch(Circle(polia, r, fc='gray', ec='black', zorder=4))
+            if atwood:
+                ax.plot([0, 0, -2 * r, 2 * r], [0, 2 * r, 2 * r, 2 * r], color='black', zorder=1)
+            pontos.append(polia + np.array([0.0, 2 * r]))
+            fio = cena.linha('k-', linewidth=1, zorder=2)
+
+        def quadrado(centro, u):
+            n = np.array([-u[1], u[0]])
+            return [centro + (du * u + dn * n) * b / 2 for du, dn in ((-1, -1), (1, -1), (1, 1), (-1, 1))]
+
+        corpos = [cena.adicionar(ax.add_patch(Polygon(quadrado(ini, d), closed=True, fc=cor, ec='black', zorder=3)))
+                  for ini, d, cor in zip(inicio, direcoes, ('tab:blue', 'tab:orange'))]
+
+        # Vetores de Força no bloco: F na frente, atrito embaixo
+        escala_forca = 0.25 * percurso / max(f_ap, m * dinamica.G, 1.0)
+        cabeca = dict(width=0.08 * b, head_width=0.4 * b, head_length=0.4 * b, length_includes_head=True)
+        seta_f = cena.adicionar(ax.arrow(0, 0, 0, 0, fc='blue', ec='blue', zorder=5, **cabeca))
+        texto_f = cena.texto(0, 0, 'F', color='blue', fontweight='bold', zorder=5)
+        seta_fat = cena.adicionar(ax.arrow(0, 0, 0, 0, fc='red', ec='red', zorder=5, **cabeca))
+        texto_fat = cena.texto(0, 0, 'Fat', color='red', fontweight='bold', zorder=5)
+
+        # Limites com a proporção da figura (eixos ocupando tudo), para a escala ficar igual em x e y
+        pontos = np.array(pontos)
+        minimo, maximo = pontos.min(axis=0) - 2 * b, pontos.max(axis=0) + 2 * b
+        meio, meia = (minimo + maximo) / 2, (maximo - minimo) / 2
+        meia = np.maximum(meia, meia[::-1] * np.array([figsize[0] / figsize[1], figsize[1] / figsize[0]]))
+        cena.fig.subplots_adjust(0, 0, 1, 1)
+        ax.set_xlim(meio[0] - meia[0], meio[0] + meia[0])
+        ax.set_ylim(meio[1] - meia[1], meio[1] + meia[1])
+        ax.axis('off')
+
+        passos = 60
+        t_amostras = resultado["t"]
+
+        def quadro(i):
             t_at = (i / passos) * t_total
-            dist_at = (a * t_at**2) / 2
-            vel_at = a * t_at
-
-            with met_d.container():
-                d1, d2, d3 = st.columns(3)
-                d1.metric("Aceleração", f"{a:.2f} m/s²")
-                d2.metric("Velocidade", f"{vel_at:.1f} m/s")
-                d3.metric("Posição", f"{dist_at:.1f} m")
-
-            fig, ax = plt.subplots(figsize=(10, 3))
-            ax.axhline(0, color='black', linewidth=2)
-            
-            # O Bloco (desenhado como um quadrado)
-            ax.plot(dist_at, 0.4, 'bs', markersize=30, zorder=3)
-            
-            # Vetores de Força
-            ax.arrow(dist_at, 0.4, 20, 0, head_width=0.1, head_length=5, fc='blue', ec='blue')
-            ax.text(dist_at + 25, 0.5, 'F', color='blue', fontweight='bold')
-            
-            ax.arrow(dist_at - 2, 0.1, -15, 0, head_width=0.1, head_length=5, fc='red', ec='red')
-            ax.text(dist_at - 25, 0.2, 'Fat', color='red', fontweight='bold')
-
-            ax.set_xlim(-40, d_percurso + 60)
-            ax.set_ylim(-0.5, 1.5)
-            ax.axis('off')
-
-            with graf_d.container():
-                st.pyplot(fig)
-            plt.close(fig)
-            time.sleep(0.08)
-        st.success("Objetivo alcançado!")
+            s_at, vel_at, a_at, f_at, fat_at = (np.interp(t_at, t_amostras, serie) for serie in (
+                resultado["posicao"], resultado["velocidade"], resultado["aceleracao"],
+                resultado["forca"], resultado["atrito"][:, 0]))
+
+            centros = [ini + d * s_at for ini, d in zip(inicio, direcoes)]
+            for corpo, centro, d in zip(corpos, centros, direcoes):
+                corpo.set_xy(quadrado(centro, d))
+            if polia is not None:
+                fio.set_data([centros[0][0], polia[0] + saidas[0][0], polia[0] + saidas[1][0], centros[1][0]],
+                              [centros[0][1], polia[1] + saidas[0][1], polia[1] + saidas[1][1], centros[1][1]])
+
+            u, n = direcoes[0], np.array([-direcoes[0][1], direcoes[0][0]])
+            frente = centros[0] + u * b / 2
+            seta_f.set_data(x=frente[0], y=frente[1], dx=u[0] * f_at * escala_forca, dy=u[1] * f_at * escala_forca)
+            texto_f.set_position(frente + u * (f_at * escala_forca + 0.3 * b) + n * 0.3 * b)
+            seta_f.set_visible(f_at > 0)
+            texto_f.set_visible(f_at > 0)
+            embaixo = centros[0] - n * b / 2
+            seta_fat.set_data(x=embaixo[0], y=embaixo[1], dx=u[0] * fat_at * escala_forca, dy=u[1] * fat_at * escala_forca)
+            texto_fat.set_position(embaixo + u * (fat_at * escala_forca - np.sign(fat_at) * 0.3 * b) - n * 0.8 * b)
+            seta_fat.set_visible(fat_at != 0)
+            texto_fat.set_visible(fat_at != 0)
+
+            if dois_corpos:
+                extra = ("Tração", f"{np.interp(t_at, t_amostras, resultado['tracao'][:, 0]):.1f} N")
+            else:
+                extra = ("Atrito", f"{abs(fat_at):.1f} N")
+            return cena.quadro_codificado(imagem_quadros), [("Aceleração", f"{a_at:.2f} m/s²"),
+                                                            ("Velocidade", f"{vel_at:.1f} m/s"),
+                                                            ("Posição", f"{s_at:.1f} m"), extra]
+
+        reproducao = iniciar_reproducao("dinamica-bloco", quadro, passos + 1, parametros_din)
     elif btn_din:
-        st.error("Força Resultante nula ou negativa! O bloco permanece em repouso.")
+        st.error("A força que move o sistema não vence o atrito estático (ou as forças se equilibram): ele permanece em repouso.")
+
+    if reproducao:
+        reproducao.exibir(0.08, graf_d, met_d)
+        if reproducao.terminou:
+            if np.isfinite(t_chegada):
+                st.success("Objetivo alcançado!")
+            else:
+                st.info(f"O sistema parou a {float(resultado['posicao'][-1]):.1f} m do início.")
+
+    # --- Estudo em lote: o mesmo sistema para muitos valores de um parâmetro ---
+    with st.expander("📊 Estudo em Lote"):
+        st.write("Simula o sistema de uma vez para 200 valores do parâmetro escolhido (os outros ficam como na barra lateral).")
+        faixas = {"Força Aplicada F (N)": (0.0, 400.0), "Massa do Bloco (kg)": (1.0, 50.0)}
+        if not atwood:
+            faixas["Atrito Cinético (µc)"] = (0.0, 1.0)
+        estudo = st.selectbox("Parâmetro", list(faixas))
+        mostrar_estudo = st.toggle("Calcular estudo")
+
+        if mostrar_estudo:
+            @memoizar(CACHE_CALCULOS)
+            def estudar(estudo, parametros):
+                massas, angulos, mu_e, mu_c, forma_forca, f_ap, duracao, distancia = parametros
+                valores = np.linspace(*faixas[estudo], 200)
+                massas, mu_e, mu_c = (np.tile(np.asarray(p, dtype=float), (valores.size, 1)) for p in (massas, mu_e, mu_c))
+                if estudo == "Massa do Bloco (kg)":
+                    massas[:, 0] = valores
+                elif estudo == "Atrito Cinético (µc)":
+                    # O estático acompanha, para continuar maior ou igual ao cinético
+                    mu_c[:, 0] = valores
+                    mu_e[:, 0] = np.maximum(mu_e[:, 0], valores)
+                else:
+                    f_ap = valores
+                forca = blocos.forca_variavel(formas_forca[forma_forca], f_ap, duracao)
+                lote = blocos.simular(massas, np.radians(angulos), mu_e, mu_c, forca, distancia, t_max=60.0)
+                return {estudo: valores, "Tempo até o Fim (s)": lote["t_chegada"],
+                        "Velocidade Final (m/s)": lote["velocidade"][-1]}
+
+            with st.spinner("Simulando o lote..."):
+                tabela = estudar(estudo, parametros_din)
+            st.line_chart(tabela, x=estudo, y=["Tempo até o Fim (s)", "Velocidade Final (m/s)"])
+            st.caption("Onde o tempo não aparece, o sistema não chega ao fim do percurso em 60 s.")
+
+    # Incerteza de medição da massa, da força e do atrito (dispersao.py), para o bloco no plano com força constante
+    if sistema == "Bloco no plano" and forma_forca == "Constante":
+        painel_incerteza(
+            "dinamica-bloco", "bloco", dict(massa=m, forca=f_ap, mu=coef_u, distancia=d_percurso, mu_estatico=coef_e),
+            incertezas={"massa": ("Desvio da Massa (kg)", 5.0, 0.5, 1.0), "forca": ("Desvio da Força (N)", 40.0, 5.0, 1.0),
+                        "mu_estatico": ("Desvio de µe", 0.1, 0.02, 1.0), "mu": ("Desvio de µc", 0.1, 0.02, 1.0)},
+            grandezas={"aceleracao": "Aceleração (m/s²)", "t_total": "Tempo (s)", "velocidade_final": "Velocidade Final (m/s)"},
+            par=("t_total", "velocidade_final"),
+        )
+
+# Painel de desempenho (com ?debug=1 na URL) e fim da medição desta execução
+painel_desempenho()
+terminar_execucao()
@@ -1,7 +1,27 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-import time
+import io
+
+from matplotlib.figure import Figure
+
+from amostragem import escala_eixos, reduzir
+from animacao import CenaAnimada, TrilhaIncremental, VetoresVelocidade, exibir_animacao, formatos_disponiveis
+from animacao_navegador import animacao_navegador, metrica, serie
+from cache import CACHE_CALCULOS, CACHE_FIGURAS, memoizar
+from cache_disco import ARMAZEM
+from codificacao import codificar_figura, exibir_imagem, opcoes_imagem
+from dispersao import painel_incerteza
+from fisica.alvo import angulos_para_alvo, envelope, velocidade_para_alvo
+from fisica.arrasto import calcular_trajetoria_arrasto, coeficiente_linear, coeficiente_quadratico
+from fisica.eventos import grade_com_eventos
+from fisica.projetil import GRAVIDADE_INVALIDA, IMPACTO_INALCANCAVEL, MENSAGENS, OK, calcular_trajetoria_lote, posicoes, velocidades
+from fisica.terreno import MENSAGENS as MENSAGENS_TERRENO, Terreno, pontos_quiques, quicar
+from fisica.varredura import angulo_otimo, varrer
+from instrumentacao import iniciar_execucao, painel_desempenho, terminar_execucao
+from reproducao import iniciar_reproducao, reproducao_atual
+
+# Tempo de cada execução e das suas etapas (instrumentacao.py)
+iniciar_execucao("projetil")
 
 # --- Configurações da Página ---
 st.set_page_config(layout="wide", page_title="Simulador de Projétil")
@@ -36,18 +56,43 @@ with col1:
     # Opções adicionais (checkboxes)
     resistencia_ar = st.checkbox(
         "Resistência do Ar", value=False,
-        help="A resistência do ar é uma funcionalidade avançada e não está implementada nesta simulação simples."
+        help="Inclui a força de arrasto do ar; a trajetória passa a ser calculada numericamente."
     )
+    if resistencia_ar:
+        modelo_arrasto = st.selectbox(
+            "Modelo de Arrasto", ["Quadrático (F = ½ρC_dAv²)", "Linear (F = 6πηrv)"],
+            help="O arrasto quadrático vale para bolas e objetos rápidos; o linear, para objetos pequenos e lentos."
+        )
+        massa = st.slider("Massa do Projétil (kg)", 0.01, 10.0, 0.145, 0.005)
+        area_secao = st.slider("Área da Seção Transversal (m²)", 0.0005, 0.1, 0.0045, 0.0005, format="%.4f")
+        if modelo_arrasto.startswith("Quadrático"):
+            coef_arrasto = st.slider("Coeficiente de Arrasto (C_d)", 0.0, 2.0, 0.47, 0.01)
     mostrar_vetores = st.checkbox("Mostrar Vetores", value=False)
     
     st.markdown("---")
 
+    # Opções da animação
+    velocidade_animacao = st.slider("Velocidade da Animação (segundos)", 0.01, 1.0, 0.01, 0.01)
+    modo_animacao = st.radio(
+        "Modo da Animação", ["Quadro a quadro", "Vídeo único", "Navegador"], horizontal=True,
+        help="No modo vídeo único a animação é gerada uma vez no servidor e reproduzida pelo navegador. "
+             "No modo navegador a trajetória é enviada uma vez e o próprio navegador desenha a animação."
+    )
+    if modo_animacao == "Vídeo único":
+        formato_video = st.selectbox("Formato do Vídeo", formatos_disponiveis())
+
+    # Resolução, formato e limite de bytes dos quadros e do gráfico estático pela tela do aluno
+    # (codificacao.py, controles na barra lateral); o gráfico ocupa 2/3 da largura
+    imagem_quadros, imagem_estatico = opcoes_imagem(fracao=2 / 3)
+
+    st.markdown("---")
+
     # Botões de controle
     btn_iniciar_animacao = st.button("Animação")
     btn_reiniciar = st.button("Reiniciar", help="Reinicia a simulação com os valores padrão ou atuais.")
     
     if btn_reiniciar:
-        st.experimental_rerun()
+        st.rerun()
 
 # --- Coluna da Direita: Trajetória e Resultados ---
 with col2:
@@ -57,163 +102,216 @@ with col2:
     angulo_rad = np.radians(angulo)
 
     # --- Funções de Cálculo (Mantendo a física básica) ---
+    # Os cálculos são memorizados (cache.py): repetir uma combinação de parâmetros custa só uma consulta
+    @memoizar(CACHE_CALCULOS)
     def calcular_trajetoria(v0, ang, g, h0, h_impacto):
         """
         Calcula os pontos da trajetória do projétil até a altura de impacto.
+        Devolve primeiro o código de situação (ver mostrar_situacao) e, ao final,
+        as componentes vx e vy da velocidade em cada ponto.
         """
-        if g <= 0:
-            st.error("A gravidade deve ser maior que zero para calcular a trajetória.")
-            return np.array([0]), np.array([h0]), 0, 0, 0, 0, np.array([0]), 0
-        
-        # O cálculo da altura máxima é o mesmo
-        altura_max = h0 + (v0 * np.sin(ang))**2 / (2 * g)
-        
-        # Verifica se a altura de impacto é alcançável
-        if h_impacto > altura_max:
-            st.warning("O projétil não alcançará a altura de impacto desejada.")
-            # Calcula o tempo e o alcance até o ponto onde a altura é máxima
-            t_to_altura_max = v0 * np.sin(ang) / g
-            x_at_max_h = v0 * np.cos(ang) * t_to_altura_max
-            t = np.linspace(0, t_to_altura_max, num=200)
-            x = v0 * np.cos(ang) * t
-            y = h0 + v0 * np.sin(ang) * t - 0.5 * g * t**2
-            # Retorna os valores para o ponto de altura máxima
-            return x, y, x_at_max_h, altura_max, t_to_altura_max, 0, t, t_to_altura_max
-        
-        # Para lançamento horizontal (angulo = 0)
-        if ang == 0:
-            t_voo = np.sqrt(2 * (h0 - h_impacto) / g)
-            # Aceleração em x é 0. O alcance é x = v_x * t_voo.
-            if h0 < h_impacto:
-                st.warning("Para ângulo zero, a altura de lançamento deve ser maior que a de impacto.")
-                return np.array([0]), np.array([h0]), 0, 0, 0, 0, np.array([0]), 0
-        else:
-            discriminante = (v0 * np.sin(ang))**2 + 2 * g * (h0 - h_impacto)
-            if discriminante < 0:
-                st.error("Erro no cálculo do tempo de voo (discriminante negativo).")
-                return np.array([0]), np.array([h0]), 0, 0, 0, 0, np.array([0]), 0
-            
-            # Utiliza a fórmula de Bhaskara para encontrar o tempo de voo
-            t_voo = (v0 * np.sin(ang) + np.sqrt(discriminante)) / g
-            if h0 < h_impacto:
-                t_voo_neg = (v0 * np.sin(ang) - np.sqrt(discriminante)) / g
-                t_voo = max(t_voo, t_voo_neg)
+        # Os resultados vêm do núcleo de física (fisica.projetil), que também resolve lotes de lançamentos
+        resultado = calcular_trajetoria_lote(v0, ang, g, h0, h_impacto)
+        situacao = int(resultado["situacao"])
 
-        t = np.linspace(0, t_voo, num=200)
+        if situacao not in (OK, IMPACTO_INALCANCAVEL):
+            return situacao, np.array([0]), np.array([h0]), 0, 0, 0, 0, np.array([0]), 0, np.array([0.0]), np.array([0.0])
 
-        x = v0 * np.cos(ang) * t
-        y = h0 + v0 * np.sin(ang) * t - 0.5 * g * t**2
-        
-        # Corrige o último ponto para que ele termine exatamente na altura de impacto
-        if len(x) > 0:
-            x[-1] = v0 * np.cos(ang) * t_voo
+        t_voo = float(resultado["t_voo"])
+
+        # Os tempos dos eventos (ponto mais alto e impacto) entram na grade (fisica.eventos):
+        # o gráfico passa exatamente pelo ápice, com qualquer número de pontos
+        t = grade_com_eventos(0, t_voo, 200, [float(resultado["t_altura_max"])])
+        x, y = posicoes(v0, ang, g, h0, t)
+
+        # O último ponto é o estado do evento de impacto: exatamente na altura de impacto
+        if situacao == OK:
+            x[-1] = float(resultado["alcance"])
             y[-1] = h_impacto
 
-        t_to_altura_max = v0 * np.sin(ang) / g
-        alcance = v0 * np.cos(ang) * t_voo
-        
-        vy_final = v0 * np.sin(ang) - g * t_voo
-        vx_final = v0 * np.cos(ang)
-        velocidade_final_mag = np.sqrt(vx_final**2 + vy_final**2)
+        # Componentes da velocidade em cada ponto (sem arrasto, vx é constante)
+        vx, vy = velocidades(v0, ang, g, t)
 
-        return x, y, alcance, altura_max, t_to_altura_max, velocidade_final_mag, t, t_voo
+        return (situacao, x, y, float(resultado["alcance"]), float(resultado["altura_max"]),
+                float(resultado["t_altura_max"]), float(resultado["velocidade_final"]), t, t_voo, vx, vy)
 
-    def draw_vectors(ax, pos_x, pos_y, vx, vy, escala_plot_x, escala_plot_y):
-        # A nova escala do vetor é uma proporção do tamanho total do gráfico
-        # Fator de 0.08 para reduzir o tamanho dos vetores, deixando a visualização mais limpa
-        vetor_length = 0.08 * max(escala_plot_x, escala_plot_y, 1)
-
-        # Vetor de velocidade resultante
-        ax.arrow(pos_x, pos_y, vx, vy,
-                 head_width=0.03 * vetor_length, head_length=0.05 * vetor_length,
-                 fc='blue', ec='blue', label='Vetor de Velocidade')
-        
-        # Componente X do vetor
-        ax.arrow(pos_x, pos_y, vx, 0,
-                 head_width=0.03 * vetor_length, head_length=0.05 * vetor_length,
-                 fc='red', ec='red', ls='--', label='Componente Vx')
-        
-        # Componente Y do vetor
-        ax.arrow(pos_x, pos_y, 0, vy,
-                 head_width=0.03 * vetor_length, head_length=0.05 * vetor_length,
-                 fc='green', ec='green', ls='--', label='Componente Vy')
+    @memoizar(CACHE_CALCULOS)
+    def calcular_trajetoria_com_arrasto(v0, ang, g, h0, h_impacto, k, massa, modelo):
+        """
+        Calcula a trajetória com resistência do ar (integração numérica em fisica.arrasto).
+        Devolve o mesmo que calcular_trajetoria.
+        """
+        resultado = calcular_trajetoria_arrasto(v0, ang, g, h0, h_impacto, k, massa, modelo, num=200)
+        situacao = int(resultado["situacao"])
+
+        if situacao not in (OK, IMPACTO_INALCANCAVEL):
+            return situacao, np.array([0]), np.array([h0]), 0, 0, 0, 0, np.array([0]), 0, np.array([0.0]), np.array([0.0])
+
+        return (situacao, resultado["x"], resultado["y"], float(resultado["alcance"]), float(resultado["altura_max"]),
+                float(resultado["t_altura_max"]), float(resultado["velocidade_final"]), resultado["t"],
+                float(resultado["t_voo"]), resultado["vx"], resultado["vy"])
 
-        # Adicionar textos para os vetores
-        ax.text(pos_x + vx, pos_y + vy, 'V', color='blue', fontsize=12)
-        ax.text(pos_x + vx, pos_y, 'Vx', color='red', fontsize=12)
-        ax.text(pos_x, pos_y + vy, 'Vy', color='green', fontsize=12)
+    def mostrar_situacao(situacao):
+        # Avisos e erros do cálculo (fora das funções memorizadas, para aparecerem a cada rerun)
+        if situacao == IMPACTO_INALCANCAVEL:
+            st.warning(MENSAGENS[situacao])
+        elif situacao != OK:
+            st.error(MENSAGENS[situacao])
+
+    def draw_vectors(ax, pos_x, pos_y, vx, vy, escala_plot_x, escala_plot_y):
+        # Vetor resultante, componentes Vx/Vy e seus rótulos (ver animacao.VetoresVelocidade)
+        VetoresVelocidade(ax, escala_plot_x, escala_plot_y).atualizar(pos_x, pos_y, vx, vy)
 
     # --- Realizar os cálculos ---
-    x, y, alcance, altura_max, t_to_altura_max, velocidade_final_mag, t, t_voo = calcular_trajetoria(
-        velocidade_inicial, angulo_rad, gravidade, altura_inicial, altura_impacto
-    )
+    if resistencia_ar:
+        if modelo_arrasto.startswith("Quadrático"):
+            k_arrasto, modelo = coeficiente_quadratico(coef_arrasto, area_secao), "quadratico"
+        else:
+            k_arrasto, modelo = coeficiente_linear(area_secao), "linear"
+        parametros = (velocidade_inicial, angulo_rad, gravidade, altura_inicial, altura_impacto,
+                      float(k_arrasto), massa, modelo)
+        resultado = calcular_trajetoria_com_arrasto(*parametros)
+    else:
+        parametros = (velocidade_inicial, angulo_rad, gravidade, altura_inicial, altura_impacto)
+        resultado = calcular_trajetoria(*parametros)
+
+    situacao, x, y, alcance, altura_max, t_to_altura_max, velocidade_final_mag, t, t_voo, vx_t, vy_t = resultado
+    mostrar_situacao(situacao)
     
     # --- Plotar o gráfico e a animação ---
     chart_placeholder = st.empty()
     metric_placeholder = st.empty()
 
-    if btn_iniciar_animacao:
-        # Loop de animação
-        for i in range(len(x)):
-            fig, ax = plt.subplots(figsize=(10, 6))
+    # A animação quadro a quadro fica na sessão (reproducao.py) e continua depois das reexecuções
+    reproducao = reproducao_atual("projetil", (parametros, mostrar_vetores))
+    reproduzindo = reproducao is not None and modo_animacao == "Quadro a quadro"
+
+    if btn_iniciar_animacao and modo_animacao == "Navegador":
+        # Envia a trajetória uma única vez; o navegador anima trilha, projétil, vetores e contadores
+        with chart_placeholder.container():
+            animacao_navegador(
+                t, [serie(x, y, cor='red', tracejada=True, alpha=0.5, espessura=1.5, cor_ponto='blue')],
+                xlim=(0, alcance * 1.1),
+                ylim=(0, max(altura_max * 1.1, altura_impacto * 1.2, altura_inicial * 1.2)),
+                titulo="Animação da Trajetória", xlabel="Distância Horizontal (m)", ylabel="Altura (m)",
+                metricas=[metrica("Tempo", t, "s"), metrica("Distância", x, "m"), metrica("Altura", y, "m")],
+                vetores=dict(vx=vx_t, vy=vy_t) if mostrar_vetores else None,
+                pontos_fixos=[dict(x=x[-1], y=y[-1], cor='red')],
+                intervalo=velocidade_animacao,
+            )
+
+    elif btn_iniciar_animacao:
+        dpi = imagem_quadros.dpi((10, 6))
+
+        def montar_cena():
+            # Monta a figura uma única vez por cena: eixos, grade, limites e elementos fixos
+            cena = CenaAnimada(figsize=(10, 6), dpi=dpi)
+            ax = cena.ax
             ax.set_title("Animação da Trajetória")
             ax.set_xlabel("Distância Horizontal (m)")
             ax.set_ylabel("Altura (m)")
             ax.grid(True, linestyle='--', alpha=0.7)
-            
+
             # Ajusta os limites para que a altura de impacto seja visível
             ax.set_xlim(left=0, right=alcance * 1.1)
             ax.set_ylim(bottom=0, top=max(altura_max * 1.1, altura_impacto * 1.2, altura_inicial * 1.2))
-            
-            # Desenha a trilha pontilhada (parte da trajetória já percorrida)
-            ax.plot(x[:i], y[:i], 'r--', alpha=0.5, label="Trajetória Completa")
-            
-            # Desenha o projétil na posição atual
-            ax.plot(x[i], y[i], 'o', color='blue', markersize=8)
-            
-            if mostrar_vetores:
-                # Componentes de velocidade no tempo atual
-                vx_atual = velocidade_inicial * np.cos(angulo_rad)
-                vy_atual = velocidade_inicial * np.sin(angulo_rad) - gravidade * t[i]
-                
-                draw_vectors(ax, x[i], y[i], vx_atual, vy_atual, ax.get_xlim()[1], ax.get_ylim()[1])
 
             # Adiciona o ponto de impacto no final
             ax.plot(x[-1], y[-1], 'o', color='red', markersize=8, label="Ponto de Impacto")
 
-            # Atualiza o gráfico no placeholder
-            chart_placeholder.pyplot(fig)
-            plt.close(fig) # Fecha a figura para evitar sobrecarga de memória
-            
-            # Adiciona um pequeno atraso para a animação
-            time.sleep(0.01)
+            # Artistas móveis: trilha pontilhada, projétil e vetores
+            trilha = cena.linha('r--', alpha=0.5, label="Trajetória Completa")
+            projetil = cena.linha('o', color='blue', markersize=8)
+            if mostrar_vetores:
+                vetores = cena.vetores(ax.get_xlim()[1], ax.get_ylim()[1])
+
+            # Buffer da trilha com os pontos que fazem diferença no tamanho do gráfico (amostragem.py)
+            k = reduzir(x, y, escala_eixos(ax))
+            trilha_incremental = TrilhaIncremental(trilha, t[k], x[k], y[k])
+
+            def desenhar_quadro(i):
+                # Desenha a trilha pontilhada (parte da trajetória já percorrida, até o ponto i - 1)
+                if i > 0:
+                    trilha_incremental.mostrar(t[i - 1], x[i - 1], y[i - 1])
+                else:
+                    # A cena é reaproveitada: o quadro 0 não pode herdar a trilha do último quadro desenhado
+                    trilha.set_data([], [])
+
+                # Desenha o projétil na posição atual
+                projetil.set_data([x[i]], [y[i]])
+
+                if mostrar_vetores:
+                    # Componentes de velocidade no tempo atual
+                    vetores.atualizar(x[i], y[i], vx_t[i], vy_t[i])
+
+            return cena, desenhar_quadro
+
+        cena, desenhar_quadro = montar_cena()
+
+        # Quadros e vídeos ficam no armazém em disco, compartilhados entre as sessões (cache_disco.py)
+        opcoes_figura = dict(figsize=(10, 6), dpi=dpi, vetores=mostrar_vetores)
+
+        if modo_animacao == "Vídeo único":
+            # Codifica todos os quadros uma vez e envia um único arquivo ao navegador
+            chave_video = ARMAZEM.chave("projetil", parametros,
+                                        dict(opcoes_figura, formato=formato_video, intervalo=velocidade_animacao))
+            with st.spinner("Gerando a animação..."):
+                video = ARMAZEM.obter_ou_gerar(chave_video, lambda: cena.exportar(
+                    desenhar_quadro, len(x), 1 / velocidade_animacao, formato_video))
+            exibir_animacao(chart_placeholder, video, formato_video)
+        else:
+            # Um quadro da animação (apenas os artistas móveis são redesenhados); quem chama é a renderização
+            # antecipada da reprodução, que monta uma cena igual para cada thread (renderizacao.py)
+            def quadro_da_cena(cena, desenhar_quadro):
+                def quadro(i):
+                    desenhar_quadro(i)
+                    chave_quadro = ARMAZEM.chave("projetil", parametros,
+                                                 dict(opcoes_figura, quadro=i, imagem=imagem_quadros.opcoes()))
+                    return cena.quadro_codificado(imagem_quadros, ARMAZEM, chave_quadro), []
+                return quadro
+
+            reproducao = iniciar_reproducao("projetil", quadro_da_cena(cena, desenhar_quadro), len(x),
+                                            (parametros, mostrar_vetores),
+                                            montar=lambda: quadro_da_cena(*montar_cena()))
+            reproduzindo = True
 
     # Plotar o gráfico estático
-    else:
-        fig, ax = plt.subplots(figsize=(10, 6))
-        ax.plot(x, y, 'o-', markersize=2, label="Trajetória do Projétil")
-        ax.set_title("Gráfico da Trajetória")
-        ax.set_xlabel("Distância Horizontal (m)")
-        ax.set_ylabel("Altura (m)")
-        ax.grid(True, linestyle='--', alpha=0.7)
-        ax.legend()
-        
-        # Ajusta os limites do gráfico dinamicamente
-        ax.set_xlim(left=0, right=alcance * 1.1)
-        ax.set_ylim(bottom=0, top=max(altura_max * 1.1, altura_impacto * 1.2, altura_inicial * 1.2))
-        
-        # Adicionar um ponto de lançamento
-        ax.plot(0, altura_inicial, 'o', color='red', markersize=8, label="Ponto de Lançamento")
-        # Adicionar a linha de impacto
-        ax.plot(x[-1], y[-1], 'o', color='red', markersize=8)
-
-        if mostrar_vetores:
-            # Vetores no ponto de lançamento
-            vx_init = velocidade_inicial * np.cos(angulo_rad)
-            vy_init = velocidade_inicial * np.sin(angulo_rad)
-            draw_vectors(ax, x[0], y[0], vx_init, vy_init, ax.get_xlim()[1], ax.get_ylim()[1])
-
-        chart_placeholder.pyplot(fig)
+    elif not reproduzindo:
+        def grafico_estatico():
+            fig = Figure(figsize=(10, 6))
+            ax = fig.add_subplot()
+            ax.plot(x, y, 'o-', markersize=2, label="Trajetória do Projétil")
+            ax.set_title("Gráfico da Trajetória")
+            ax.set_xlabel("Distância Horizontal (m)")
+            ax.set_ylabel("Altura (m)")
+            ax.grid(True, linestyle='--', alpha=0.7)
+            ax.legend()
+            
+            # Ajusta os limites do gráfico dinamicamente
+            ax.set_xlim(left=0, right=alcance * 1.1)
+            ax.set_ylim(bottom=0, top=max(altura_max * 1.1, altura_impacto * 1.2, altura_inicial * 1.2))
+            
+            # Adicionar um ponto de lançamento
+            ax.plot(0, altura_inicial, 'o', color='red', markersize=8, label="Ponto de Lançamento")
+            # Adicionar a linha de impacto
+            ax.plot(x[-1], y[-1], 'o', color='red', markersize=8)
+
+            if mostrar_vetores:
+                # Vetores no ponto de lançamento
+                draw_vectors(ax, x[0], y[0], vx_t[0], vy_t[0], ax.get_xlim()[1], ax.get_ylim()[1])
+
+            return codificar_figura(fig, imagem_estatico, bbox_inches="tight")
+
+        # A imagem fica no cache, separada dos arrays: só muda se a física ou as opções da figura mudarem.
+        # Abaixo do cache em memória, o armazém em disco a compartilha com os outros processos.
+        chave_estatico = ARMAZEM.chave("projetil-estatico", parametros, dict(
+            imagem_estatico.opcoes(), vetores=mostrar_vetores, dpi=imagem_estatico.dpi((10, 6))))
+        imagem = CACHE_FIGURAS.obter(("projetil", chave_estatico),
+                                     lambda: ARMAZEM.obter_ou_gerar(chave_estatico, grafico_estatico))
+        exibir_imagem(chart_placeholder, imagem)
+
+    if reproduzindo:
+        reproducao.exibir(velocidade_animacao, chart_placeholder)
         
     with metric_placeholder.container():
         st.subheader("Resultados Calculados")
@@ -228,5 +326,294 @@ with col2:
         st.metric(label="Alcance (até o impacto)", value=f"{alcance:.2f} m")
         st.metric(label="Tempo de Voo (até o impacto)", value=f"{t_voo:.2f} s")
 
+    # --- Varredura de parâmetros: mapas de alcance, altura máxima e tempo de voo ---
+    with st.expander("🗺️ Varredura de Parâmetros (ângulo × velocidade, gravidade ou altura)"):
+        st.write(
+            "Calcula o lançamento para todos os ângulos de 0° a 90° e uma faixa do parâmetro escolhido, "
+            "mantendo os demais valores dos controles. A linha branca marca o ângulo de maior alcance "
+            "e o ponto vermelho, o lançamento atual."
+        )
+        # Segundo eixo: (índice em parametros, faixa, rótulo do eixo, valor atual)
+        eixos_varredura = {
+            "Velocidade Inicial": (0, (1.0, 100.0), "Velocidade Inicial (m/s)", velocidade_inicial),
+            "Gravidade": (2, (0.5, 25.0), "Gravidade (m/s²)", gravidade),
+            "Altura de Lançamento": (3, (0.0, 100.0), "Altura de Lançamento (m)", altura_inicial),
+        }
+        col_eixo, col_resolucao = st.columns(2)
+        eixo_varredura = col_eixo.selectbox("Segundo eixo", list(eixos_varredura))
+        resolucao = col_resolucao.select_slider(
+            "Pontos por eixo", [50, 100, 200, 500, 1000], value=100 if resistencia_ar else 500,
+            help="Com resistência do ar cada ponto é uma integração numérica: grades grandes são divididas "
+                 "em blocos e calculadas em paralelo, mas levam mais tempo."
+        )
+        mostrar_varredura = st.toggle("Mostrar mapas")
+
+        if mostrar_varredura:
+            indice, faixa, rotulo_eixo, valor_atual = eixos_varredura[eixo_varredura]
+
+            def grafico_varredura_png():
+                # Grade: ângulos nas colunas, o segundo parâmetro nas linhas (fisica.varredura)
+                angulos = np.linspace(0, 90, resolucao)
+                valores = np.linspace(*faixa, resolucao)
+                grade = list(parametros)
+                grade[1] = np.radians(angulos)[None, :]
+                grade[indice] = valores[:, None]
+                if resistencia_ar:
+                    mapa = varrer(*grade[:7], modelo=grade[7])
+                else:
+                    mapa = varrer(*grade)
+
+                # Lançamentos que não chegam à altura de impacto ficam em branco
+                fora = mapa["situacao"] != OK
+                otimo = np.degrees(angulo_otimo(np.radians(angulos), np.where(fora, -np.inf, mapa["alcance"]), eixo=1))
+
+                fig = Figure(figsize=(15, 4.8))
+                eixos = fig.subplots(1, 3)
+                for ax, (nome, titulo) in zip(eixos, [("alcance", "Alcance (m)"), ("altura_max", "Altura Máxima (m)"),
+                                                       ("t_voo", "Tempo de Voo (s)")]):
+                    dados = np.ma.masked_where(fora, mapa[nome])
+                    malha = ax.pcolormesh(angulos, valores, dados, shading="auto", cmap="viridis")
+                    fig.colorbar(malha, ax=ax)
+                    if dados.count() and np.ptp(dados.compressed()) > 0:
+                        curvas = ax.contour(angulos, valores, dados, levels=8, colors="black", linewidths=0.6)
+                        ax.clabel(curvas, fontsize=7, fmt="%.3g")
+                    ax.plot(otimo, valores, color="white", linestyle="--", linewidth=1.5)
+                    ax.plot(angulo, valor_atual, 'o', color='red', markersize=6)
+                    ax.set_title(titulo)
+                    ax.set_xlabel("Ângulo de Lançamento (°)")
+                    ax.set_ylabel(rotulo_eixo)
+                fig.tight_layout()
+
+                buffer = io.BytesIO()
+                fig.savefig(buffer, format="png", dpi=100)
+                return buffer.getvalue()
+
+            # Mesmo esquema do gráfico estático: cache em memória sobre o armazém em disco
+            with st.spinner("Calculando a varredura..."):
+                png = CACHE_FIGURAS.obter(("projetil-varredura", parametros, eixo_varredura, resolucao), lambda: ARMAZEM.obter_ou_gerar(
+                    ARMAZEM.chave("projetil-varredura", parametros, dict(eixo=eixo_varredura, resolucao=resolucao)),
+                    grafico_varredura_png))
+            st.image(png, width="stretch")
+
+    # --- Problema inverso: ângulo ou velocidade que acertam alvos dados ---
+    with st.expander("🎯 Acertar um Alvo (ângulos ou velocidade para um ou vários alvos)"):
+        st.write(
+            "Informe um ou mais alvos (distância horizontal e altura, em m). Com a velocidade dos controles, "
+            "calcula os dois ângulos que acertam cada alvo (arco baixo e arco alto); com o ângulo dos controles, "
+            "a velocidade necessária. A linha tracejada é o envelope dos alvos alcançáveis com a velocidade atual."
+        )
+        incognita = st.radio("Calcular", ["Ângulos (velocidade atual)", "Velocidade (ângulo atual)"], horizontal=True)
+        tabela_alvos = st.data_editor(
+            {"x (m)": [100.0, 150.0], "y (m)": [0.0, 20.0]},
+            num_rows="dynamic", key="alvos",
+        )
+        x_alvos = np.asarray(tabela_alvos["x (m)"], dtype=float)
+        y_alvos = np.asarray(tabela_alvos["y (m)"], dtype=float)
+        validos = np.isfinite(x_alvos) & np.isfinite(y_alvos) & (x_alvos > 0)
+        alvos = (tuple(x_alvos[validos]), tuple(y_alvos[validos]))
+
+        @memoizar(CACHE_CALCULOS)
+        def resolver_alvos(alvos, incognita, parametros):
+            # Todos os alvos de uma vez (fisica.alvo); sem arrasto por fórmula fechada
+            v0, ang, g, h0 = parametros[:4]
+            arrasto = dict(k=parametros[5], massa=parametros[6], modelo=parametros[7]) if len(parametros) > 5 else {}
+            if incognita.startswith("Ângulos"):
+                r = angulos_para_alvo(*alvos, v0, g, h0, **arrasto)
+                return dict(
+                    ang_baixo=np.degrees(r["angulo_baixo"]), t_baixo=r["t_baixo"],
+                    ang_alto=np.degrees(r["angulo_alto"]), t_alto=r["t_alto"],
+                )
+            r = velocidade_para_alvo(*alvos, ang, g, h0, **arrasto)
+            return dict(v0=r["v0"], t=r["t"])
+
+        if not alvos[0]:
+            st.info("Inclua ao menos um alvo com distância horizontal positiva.")
+        elif gravidade <= 0:
+            st.error(MENSAGENS[GRAVIDADE_INVALIDA])
+        else:
+            with st.spinner("Resolvendo..."):
+                solucao = resolver_alvos(alvos, incognita, parametros)
+
+            # Gabarito: uma linha por alvo (vazio onde o alvo não é alcançável)
+            colunas = {"x (m)": alvos[0], "y (m)": alvos[1]}
+            if incognita.startswith("Ângulos"):
+                colunas.update({"θ baixo (°)": solucao["ang_baixo"], "t baixo (s)": solucao["t_baixo"],
+                                "θ alto (°)": solucao["ang_alto"], "t alto (s)": solucao["t_alto"]})
+                lancamentos = [(velocidade_inicial, np.radians(solucao[nome])) for nome in ("ang_baixo", "ang_alto")]
+            else:
+                colunas.update({"v₀ (m/s)": solucao["v0"], "t (s)": solucao["t"]})
+                lancamentos = [(solucao["v0"], angulo_rad)]
+            gabarito = {nome: np.round(valores, 3) for nome, valores in colunas.items()}
+            st.dataframe(gabarito, hide_index=True)
+            csv = "\n".join([",".join(gabarito)] + [",".join("" if np.isnan(v) else f"{v:g}" for v in linha)
+                                                     for linha in zip(*gabarito.values())])
+            st.download_button("Baixar gabarito (CSV)", csv, file_name="gabarito_alvos.csv", mime="text/csv")
+            if np.isnan(next(iter(solucao.values()))).any():
+                st.warning("Alguns alvos não podem ser acertados com esses parâmetros (valores em branco).")
+
+            # Trajetórias das soluções até cada alvo (as 20 primeiras)
+            fig = Figure(figsize=(10, 5))
+            ax = fig.add_subplot()
+            for v0_alvo, ang_alvo in lancamentos:
+                v0_alvo, ang_alvo = np.broadcast_arrays(v0_alvo, ang_alvo)
+                for v0_i, ang_i, x_i, y_i in list(zip(v0_alvo, ang_alvo, *alvos))[:20]:
+                    if np.isnan(v0_i) or np.isnan(ang_i):
+                        continue
+                    if resistencia_ar:
+                        trajetoria = calcular_trajetoria_arrasto(v0_i, ang_i, gravidade, altura_inicial, y_i,
+                                                                 *parametros[5:], num=200)
+                        ate_alvo = trajetoria["x"] <= x_i
+                        ax.plot(trajetoria["x"][ate_alvo], trajetoria["y"][ate_alvo], linewidth=1, alpha=0.8)
+                    else:
+                        tempos = np.linspace(0, x_i / (v0_i * np.cos(ang_i)), 100)
+                        ax.plot(*posicoes(v0_i, ang_i, gravidade, altura_inicial, tempos), linewidth=1, alpha=0.8)
+            x_envelope = np.linspace(0, max(alvos[0]) * 1.1, 200)
+            if not resistencia_ar and velocidade_inicial > 0:
+                ax.plot(x_envelope, envelope(x_envelope, velocidade_inicial, gravidade, altura_inicial),
+                        'k--', linewidth=1, label="Envelope (velocidade atual)")
+            ax.plot(*alvos, 'X', color='red', markersize=9, label="Alvos")
+            ax.plot(0, altura_inicial, 'o', color='black', markersize=6)
+            ax.set_xlim(0, x_envelope[-1])
+            ax.set_ylim(bottom=min(0, min(alvos[1]) - 1), top=max(max(alvos[1]), altura_inicial) * 1.3 + 1)
+            ax.set_xlabel("Distância Horizontal (m)")
+            ax.set_ylabel("Altura (m)")
+            ax.grid(True, linestyle='--', alpha=0.7)
+            ax.legend()
+
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format="png", dpi=100, bbox_inches="tight")
+            st.image(buffer.getvalue(), width="stretch")
+
+    # --- Terreno qualquer e quiques, calculados contato a contato (fisica.terreno) ---
+    with st.expander("⛰️ Terreno e Quiques (rampas, degraus, muros e colinas)"):
+        st.write(
+            "Lança o projétil dos controles (sem resistência do ar) sobre um terreno e o deixa quicar. "
+            "Entre dois contatos a trajetória é uma parábola exata; em cada contato a velocidade normal ao "
+            "terreno é invertida e multiplicada pelo coeficiente de restituição. A altura de lançamento é "
+            "medida a partir do terreno."
+        )
+        col_terreno, col_restituicao = st.columns(2)
+        tipo_terreno = col_terreno.selectbox("Terreno", ["Plano", "Rampa", "Degraus", "Muro", "Colinas"])
+        restituicao = col_restituicao.slider("Coeficiente de Restituição (e)", 0.0, 1.0, 0.7, 0.05)
+        col_forma, col_quiques = st.columns(2)
+        if tipo_terreno == "Rampa":
+            forma = col_forma.slider("Inclinação da Rampa (°)", -30, 30, 10)
+        elif tipo_terreno == "Degraus":
+            forma = col_forma.slider("Altura de cada Degrau (m)", 0.5, 10.0, 2.0, 0.5)
+        elif tipo_terreno == "Muro":
+            forma = col_forma.slider("Altura do Muro (m)", 1.0, 100.0, 10.0, 1.0)
+        elif tipo_terreno == "Colinas":
+            forma = col_forma.select_slider("Pontos do Mapa de Alturas", [100, 1000, 10000, 100000], value=10000)
+        else:
+            forma = 0
+        max_quiques = col_quiques.slider("Máximo de Quiques", 1, 200, 50)
+        mostrar_terreno = st.toggle("Mostrar terreno e quiques")
+
+        if mostrar_terreno:
+            # Comprimento do terreno: algumas vezes o alcance no plano, para caberem os quiques
+            comprimento = float(max(50.0, 4 * calcular_trajetoria_lote(velocidade_inicial, angulo_rad, max(gravidade, 1e-9),
+                                                                         altura_inicial, 0.0)["alcance"]))
+
+            @memoizar(CACHE_CALCULOS)
+            def calcular_quiques(tipo_terreno, forma, comprimento, lancamento, restituicao, max_quiques):
+                inicio = -0.05 * comprimento
+                if tipo_terreno == "Rampa":
+                    pe = 0.2 * comprimento
+                    terreno = Terreno([inicio, pe, comprimento], [0.0, 0.0, (comprimento - pe) * np.tan(np.radians(forma))])
+                elif tipo_terreno == "Degraus":
+                    # Escada descendo: 10 degraus, cada um com 1/10 do comprimento
+                    bordas = np.linspace(0.1 * comprimento, comprimento, 10)
+                    alturas = -forma * np.arange(bordas.size)
+                    terreno = Terreno(np.r_[inicio, np.column_stack([bordas, bordas]).ravel()[:-1]],
+                                      np.r_[0.0, np.column_stack([alturas, alturas - forma]).ravel()[:-1]])
+                elif tipo_terreno == "Muro":
+                    muro = 0.3 * comprimento
+                    terreno = Terreno([inicio, muro, muro, comprimento], [0.0, 0.0, forma, forma])
+                elif tipo_terreno == "Colinas":
+                    # Soma de senoides com fases sorteadas (semente fixa): suave com qualquer número de pontos
+                    x = np.linspace(0.0, 1.0, forma)
+                    fases = np.random.default_rng(0).uniform(0, 2 * np.pi, 6)
+                    alturas = sum(np.sin(2 * np.pi * k * x + fases[k - 1]) / k for k in range(1, 7))
+                    alturas *= 0.05 * comprimento / np.ptp(alturas)
+                    terreno = Terreno.de_alturas(inicio, (comprimento - inicio) / (forma - 1), alturas - alturas[0])
+                else:
+                    terreno = Terreno.plano(0.0, inicio, comprimento)
+                v0, ang, g, h0 = lancamento
+                voo = quicar(v0, ang, g, h0, terreno, restituicao, max_quiques=max_quiques)
+                x_voo, y_voo, _ = pontos_quiques(voo, num=2000)
+                return dict(voo, terreno_x=terreno.x, terreno_y=terreno.y, x=x_voo, y=y_voo)
+
+            if gravidade <= 0:
+                st.error(MENSAGENS[GRAVIDADE_INVALIDA])
+            else:
+                if resistencia_ar:
+                    st.info("Os quiques são calculados sem a resistência do ar.")
+                lancamento = (float(velocidade_inicial), float(angulo_rad), float(gravidade), float(altura_inicial))
+                with st.spinner("Calculando os quiques..."):
+                    quiques = calcular_quiques(tipo_terreno, forma, comprimento, lancamento, restituicao, max_quiques)
+                contatos = quiques["contatos"]
+
+                col_q1, col_q2, col_q3 = st.columns(3)
+                col_q1.metric("Quiques", len(contatos["t"]))
+                col_q2.metric("Tempo Total", f"{quiques['t_fim']:.2f} s")
+                col_q3.metric("Posição Final", f"{quiques['x'][-1]:.1f} m")
+                st.caption(MENSAGENS_TERRENO[quiques["situacao"]])
+                if quiques["t_fim"] == 0:
+                    st.info("Lançado do chão rente a ele (ou para dentro dele), o projétil deslizaria pelo terreno, "
+                            "o que não é modelado. Aumente o ângulo ou a altura de lançamento.")
+
+                def grafico_terreno():
+                    fig = Figure(figsize=(10, 5))
+                    ax = fig.add_subplot()
+                    fundo = min(quiques["terreno_y"].min(), quiques["y"].min()) - 1
+                    ax.fill_between(quiques["terreno_x"], quiques["terreno_y"], fundo, color="tan", alpha=0.6,
+                                    label="Terreno")
+                    ax.plot(quiques["terreno_x"], quiques["terreno_y"], color="saddlebrown", linewidth=1)
+                    ax.plot(quiques["x"], quiques["y"], color="blue", linewidth=1, label="Trajetória")
+                    ax.plot(contatos["x"], contatos["y"], 'o', color="red", markersize=4, label="Contatos")
+                    ax.set_xlim(quiques["terreno_x"][0], max(quiques["terreno_x"][-1], quiques["x"].max()))
+                    ax.set_ylim(bottom=fundo)
+                    ax.set_xlabel("Distância Horizontal (m)")
+                    ax.set_ylabel("Altura (m)")
+                    ax.grid(True, linestyle='--', alpha=0.7)
+                    ax.legend()
+                    return codificar_figura(fig, imagem_estatico, bbox_inches="tight")
+
+                # Mesmo esquema do gráfico estático: cache em memória sobre o armazém em disco
+                chave_terreno = ARMAZEM.chave("projetil-terreno", (tipo_terreno, forma, comprimento, lancamento),
+                                              dict(imagem_estatico.opcoes(), restituicao=restituicao,
+                                                   max_quiques=max_quiques, dpi=imagem_estatico.dpi((10, 5))))
+                imagem = CACHE_FIGURAS.obter(("projetil-terreno", chave_terreno),
+                                             lambda: ARMAZEM.obter_ou_gerar(chave_terreno, grafico_terreno))
+                exibir_imagem(st, imagem)
+
+                limite = 200
+                st.dataframe({
+                    "t (s)": contatos["t"][:limite].round(3),
+                    "x (m)": contatos["x"][:limite].round(2),
+                    "y (m)": contatos["y"][:limite].round(2),
+                    "Velocidade no Contato (m/s)": contatos["velocidade"][:limite].round(2),
+                }, hide_index=True)
+
+    # --- Incerteza de medição: dispersão dos resultados por Monte Carlo (dispersao.py) ---
+    incertezas = {
+        "v0": ("Desvio de vᵢ (m/s)", 5.0, 1.0, 1.0),
+        "ang": ("Desvio de θ (°)", 5.0, 1.0, np.radians(1)),
+        "g": ("Desvio de g (m/s²)", 0.5, 0.0, 1.0),
+    }
+    centrais = dict(zip(("v0", "ang", "g", "h0", "h_impacto"), parametros[:5]))
+    if resistencia_ar:
+        incertezas["massa"] = ("Desvio da Massa (kg)", 0.05, 0.005, 1.0)
+        centrais.update(k=parametros[5], massa=parametros[6], modelo=parametros[7])
+    painel_incerteza(
+        "projetil", "projetil", centrais, incertezas,
+        grandezas={"alcance": "Alcance (m)", "altura_max": "Altura Máxima (m)", "t_voo": "Tempo de Voo (s)"},
+        par=("alcance", "t_voo"), amostras_max=10**5 if resistencia_ar else 10**7,
+    )
+
     st.markdown("---")
     st.markdown("Autor: Prof. Ojeda")
+
+# Painel de desempenho (com ?debug=1 na URL) e fim da medição desta execução
+painel_desempenho()
+terminar_execucao()